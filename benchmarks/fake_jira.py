@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""本地JIRA REST替身，用于离线性能基准.
+
+提供基准所需的REST v2接口子集：问题、搜索、字段、项目、创建/更新问题和
+附件下载（支持Range）。数据按参数合成，也可以加载录制的问题JSON；每个
+请求可以附加固定延迟和随机抖动来模拟真实JIRA的网络和处理耗时。
+
+用法:
+    python benchmarks/fake_jira.py --port 8089 --issues 500 --payload-kb 4 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+API = "/rest/api/2"
+
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+ISSUE_TYPES = ["Bug", "Task", "Story"]
+PRIORITIES = ["High", "Medium", "Low"]
+USERS = ["alice", "bob", "carol", "dave"]
+
+# 合成描述文本的素材，包含中文以覆盖多字节编码
+_WORDS = "登录 失败 页面 超时 接口 数据 同步 error timeout retry cache search index".split()
+
+
+@dataclass
+class FakeJiraConfig:
+    """替身服务器配置."""
+    projects: List[str]
+    issues_per_project: int = 500
+    payload_kb: float = 2.0
+    comments: int = 3
+    custom_fields: int = 20
+    attachments_per_issue: int = 1
+    attachment_kb: int = 256
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    fixtures: Optional[str] = None
+    # /myself 返回的用户时区
+    time_zone: str = "UTC"
+
+
+def _user(name: str) -> Dict[str, Any]:
+    return {"name": name, "displayName": name.title(), "emailAddress": f"{name}@example.com"}
+
+
+def _text(rng: random.Random, size: int) -> str:
+    words: List[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word.encode("utf-8")) + 1
+    return " ".join(words)
+
+
+class FakeJira:
+    """内存中的问题库."""
+
+    def __init__(self, config: FakeJiraConfig, base_url: str):
+        self.config = config
+        self.base_url = base_url
+        self.issues: Dict[str, Dict[str, Any]] = {}
+        self.attachments: Dict[str, Dict[str, Any]] = {}
+        # 每个请求的Basic认证用户名，未认证的请求记为None
+        self.auth_users: List[Optional[str]] = []
+        self.next_id = 10000
+        for project in config.projects:
+            for number in range(1, config.issues_per_project + 1):
+                self._add(self._synthesize(project, number))
+        if config.fixtures:
+            with open(config.fixtures, encoding="utf-8") as f:
+                for issue in json.load(f):
+                    self._add(issue)
+
+    def _add(self, issue: Dict[str, Any]) -> None:
+        self.issues[issue["key"].upper()] = issue
+        for attachment in (issue.get("fields") or {}).get("attachment") or []:
+            self.attachments[str(attachment["id"])] = attachment
+
+    def _synthesize(self, project: str, number: int) -> Dict[str, Any]:
+        cfg = self.config
+        key = f"{project}-{number}"
+        rng = random.Random(key)
+        self.next_id += 1
+        issue_id = str(self.next_id)
+        day = 1 + number % 28
+        fields: Dict[str, Any] = {
+            "summary": f"{key} {_text(rng, 60)}",
+            "description": _text(rng, int(cfg.payload_kb * 1024)),
+            "status": {"id": "1", "name": rng.choice(STATUSES)},
+            "issuetype": {"id": "1", "name": rng.choice(ISSUE_TYPES)},
+            "priority": {"id": "3", "name": rng.choice(PRIORITIES)},
+            "assignee": _user(rng.choice(USERS)),
+            "reporter": _user(rng.choice(USERS)),
+            "project": {"id": "1", "key": project, "name": f"{project} project"},
+            "labels": rng.sample(["backend", "frontend", "perf", "ops"], 2),
+            "components": [{"id": "1", "name": "core"}],
+            "created": f"2024-01-{day:02d}T08:00:00.000+0000",
+            "updated": f"2024-02-{day:02d}T08:00:00.000+0000",
+            "comment": {
+                "total": cfg.comments,
+                "comments": [
+                    {
+                        "id": str(i),
+                        "author": _user(rng.choice(USERS)),
+                        "body": _text(rng, 200),
+                        "created": f"2024-01-{day:02d}T09:00:00.000+0000",
+                    }
+                    for i in range(cfg.comments)
+                ],
+            },
+            "attachment": [],
+        }
+        for i in range(cfg.custom_fields):
+            fields[f"customfield_{10000 + i}"] = {"value": f"option {rng.randint(1, 5)}"}
+        for i in range(cfg.attachments_per_issue):
+            attachment_id = f"{issue_id}{i}"
+            filename = f"log-{i}.txt"
+            fields["attachment"].append({
+                "id": attachment_id,
+                "filename": filename,
+                "size": cfg.attachment_kb * 1024,
+                "mimeType": "text/plain",
+                "created": fields["created"],
+                "author": _user(rng.choice(USERS)),
+                "content": f"{self.base_url}/secure/attachment/{attachment_id}/{filename}",
+            })
+        return {
+            "id": issue_id,
+            "key": key,
+            "self": f"{self.base_url}{API}/issue/{issue_id}",
+            "fields": fields,
+        }
+
+    def project_fields(
+        self, issue: Dict[str, Any], fields: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        """按请求的字段列表裁剪问题."""
+        if not fields or "*all" in fields:
+            return issue
+        source = issue.get("fields") or {}
+        return dict(issue, fields={name: source[name] for name in fields if name in source})
+
+    def search(self, jql: str) -> List[Dict[str, Any]]:
+        """支持 ``key in (...)`` 和 ``project = X`` 两种JQL，其他条件返回全部问题."""
+        match = re.search(r"key\s+in\s*\(([^)]*)\)", jql, re.I)
+        if match:
+            keys = [k.strip().strip('"').upper() for k in match.group(1).split(",")]
+            return [self.issues[k] for k in keys if k in self.issues]
+        match = re.search(r'project\s*=\s*"?([A-Za-z0-9_]+)"?', jql, re.I)
+        if match:
+            project = match.group(1).upper()
+            return [i for i in self.issues.values() if i["key"].startswith(project + "-")]
+        return list(self.issues.values())
+
+    def attachment_bytes(self, attachment_id: str) -> bytes:
+        attachment = self.attachments[attachment_id]
+        seed = hashlib.sha256(attachment_id.encode()).hexdigest().encode()
+        line = seed + b"\n"
+        size = attachment["size"]
+        return (line * (size // len(line) + 1))[:size]
+
+
+def _basic_user(authorization: Optional[str]) -> Optional[str]:
+    if not authorization or not authorization.lower().startswith("basic "):
+        return None
+    try:
+        return base64.b64decode(authorization[6:]).decode("utf-8").split(":", 1)[0]
+    except ValueError:
+        return None
+
+
+class _AuthRecorder:
+    """记录每个请求使用的JIRA用户."""
+
+    def __init__(self, app: ASGIApp, jira: FakeJira):
+        self.app = app
+        self.jira = jira
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            self.jira.auth_users.append(_basic_user(Headers(scope=scope).get("authorization")))
+        await self.app(scope, receive, send)
+
+
+def create_app(config: FakeJiraConfig, base_url: str) -> Starlette:
+    """创建替身服务器的ASGI应用，问题库通过 ``app.state.jira`` 访问."""
+    jira = FakeJira(config, base_url)
+
+    async def delay() -> None:
+        latency = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def not_found(message: str) -> JSONResponse:
+        return JSONResponse({"errorMessages": [message], "errors": {}}, status_code=404)
+
+    def split(value: Optional[str]) -> Optional[List[str]]:
+        return [v for v in value.split(",") if v] if value else None
+
+    async def server_info(request: Request) -> Response:
+        await delay()
+        return JSONResponse({"baseUrl": base_url, "version": "9.4.0", "deploymentType": "Server"})
+
+    async def myself(request: Request) -> Response:
+        await delay()
+        name = _basic_user(request.headers.get("authorization")) or "anonymous"
+        return JSONResponse(dict(_user(name), timeZone=config.time_zone))
+
+    async def field_list(request: Request) -> Response:
+        await delay()
+        system = ["summary", "description", "status", "issuetype", "priority", "assignee",
+                  "reporter", "project", "labels", "components", "created", "updated",
+                  "comment", "attachment"]
+        result = [{"id": name, "name": name.title(), "custom": False, "schema": {"type": "any"}}
+                  for name in system]
+        result.extend(
+            {
+                "id": f"customfield_{10000 + i}",
+                "name": f"Custom {i}",
+                "custom": True,
+                "schema": {"type": "option", "custom": "select"},
+            }
+            for i in range(config.custom_fields)
+        )
+        return JSONResponse(result)
+
+    async def get_issue(request: Request) -> Response:
+        await delay()
+        key = request.path_params["key"].upper()
+        issue = jira.issues.get(key)
+        if issue is None:
+            return not_found("Issue Does Not Exist")
+        return JSONResponse(jira.project_fields(issue, split(request.query_params.get("fields"))))
+
+    async def update_issue(request: Request) -> Response:
+        await delay()
+        key = request.path_params["key"].upper()
+        issue = jira.issues.get(key)
+        if issue is None:
+            return not_found("Issue Does Not Exist")
+        body = await request.json()
+        issue["fields"].update(body.get("fields") or {})
+        issue["fields"]["updated"] = "2024-03-01T08:00:00.000+0000"
+        if request.query_params.get("returnIssue") == "true":
+            return JSONResponse(issue)
+        return Response(status_code=204)
+
+    def create_one(fields: Dict[str, Any]) -> Dict[str, Any]:
+        project = (fields.get("project") or {}).get("key", config.projects[0])
+        number = sum(1 for k in jira.issues if k.startswith(project + "-")) + 1
+        issue = jira._synthesize(project, number)
+        issue["fields"].update(fields)
+        jira._add(issue)
+        return {"id": issue["id"], "key": issue["key"], "self": issue["self"]}
+
+    async def create_issue(request: Request) -> Response:
+        await delay()
+        body = await request.json()
+        return JSONResponse(create_one(body.get("fields") or {}), status_code=201)
+
+    async def create_bulk(request: Request) -> Response:
+        await delay()
+        body = await request.json()
+        issues = [create_one(u.get("fields") or {}) for u in body.get("issueUpdates", [])]
+        return JSONResponse({"issues": issues, "errors": []}, status_code=201)
+
+    async def search(request: Request) -> Response:
+        await delay()
+        body = await request.json()
+        matches = jira.search(body.get("jql", ""))
+        start = int(body.get("startAt", 0))
+        count = int(body.get("maxResults", 50))
+        fields = body.get("fields")
+        page = [jira.project_fields(i, fields) for i in matches[start:start + count]]
+        return JSONResponse({
+            "startAt": start,
+            "maxResults": count,
+            "total": len(matches),
+            "issues": page,
+        })
+
+    async def projects(request: Request) -> Response:
+        await delay()
+        expand = split(request.query_params.get("expand")) or []
+        result = []
+        for i, key in enumerate(config.projects, start=1):
+            project = {"id": str(i), "key": key, "name": f"{key} project", "projectTypeKey": "software"}
+            if "lead" in expand:
+                project["lead"] = _user(USERS[0])
+            if "description" in expand:
+                project["description"] = f"{key} project description"
+            result.append(project)
+        return JSONResponse(result)
+
+    async def project(request: Request) -> Response:
+        await delay()
+        key = request.path_params["key"].upper()
+        if key not in config.projects:
+            return not_found("No project could be found")
+        return JSONResponse({
+            "id": str(config.projects.index(key) + 1),
+            "key": key,
+            "name": f"{key} project",
+            "lead": _user(USERS[0]),
+            "projectTypeKey": "software",
+        })
+
+    async def attachment_content(request: Request) -> Response:
+        await delay()
+        attachment_id = request.path_params["attachment_id"]
+        if attachment_id not in jira.attachments:
+            return not_found("Attachment not found")
+        content = jira.attachment_bytes(attachment_id)
+        match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(content) - 1
+            end = min(end, len(content) - 1)
+            return Response(
+                content[start:end + 1],
+                status_code=206,
+                media_type="application/octet-stream",
+                headers={"Content-Range": f"bytes {start}-{end}/{len(content)}"},
+            )
+        return Response(content, media_type="application/octet-stream")
+
+    routes = [
+        Route(f"{API}/serverInfo", server_info),
+        Route(f"{API}/myself", myself),
+        Route(f"{API}/field", field_list),
+        Route(f"{API}/search", search, methods=["POST"]),
+        Route(f"{API}/issue/bulk", create_bulk, methods=["POST"]),
+        Route(f"{API}/issue", create_issue, methods=["POST"]),
+        Route(f"{API}/issue/{{key}}", get_issue, methods=["GET"]),
+        Route(f"{API}/issue/{{key}}", update_issue, methods=["PUT"]),
+        Route(f"{API}/project", projects),
+        Route(f"{API}/project/{{key}}", project),
+        Route("/secure/attachment/{attachment_id}/{filename}", attachment_content),
+    ]
+    app = Starlette(routes=routes, middleware=[Middleware(_AuthRecorder, jira=jira)])
+    app.state.jira = jira
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地JIRA REST替身服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--projects", default="BENCH", help="逗号分隔的项目键")
+    parser.add_argument("--issues", type=int, default=500, help="每个项目的问题数")
+    parser.add_argument("--payload-kb", type=float, default=2.0, help="问题描述的大小(KB)")
+    parser.add_argument("--comments", type=int, default=3, help="每个问题的评论数")
+    parser.add_argument("--custom-fields", type=int, default=20, help="自定义字段数")
+    parser.add_argument("--attachments", type=int, default=1, help="每个问题的附件数")
+    parser.add_argument("--attachment-kb", type=int, default=256, help="附件大小(KB)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="每个请求的固定延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="每个请求的随机附加延迟")
+    parser.add_argument("--fixtures", help="录制的问题JSON文件（原始问题列表）")
+    args = parser.parse_args()
+
+    config = FakeJiraConfig(
+        projects=[p.strip().upper() for p in args.projects.split(",") if p.strip()],
+        issues_per_project=args.issues,
+        payload_kb=args.payload_kb,
+        comments=args.comments,
+        custom_fields=args.custom_fields,
+        attachments_per_issue=args.attachments,
+        attachment_kb=args.attachment_kb,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        fixtures=args.fixtures,
+    )
+    app = create_app(config, f"http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
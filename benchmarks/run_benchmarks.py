@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""JIRA MCP服务器性能基准.
+
+启动本地JIRA替身(fake_jira.py)和MCP服务器子进程，分别通过stdio和SSE
+调用MCP工具，统计每个场景的p50/p99延迟、吞吐、每次调用返回的字节数，
+以及服务器进程的峰值内存。全程离线运行，结果可以保存为JSON并与上一次
+的结果对比，用于跟踪版本间的性能变化。
+
+用法:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --transport stdio --iterations 500 --concurrency 8
+    python benchmarks/run_benchmarks.py --latency-ms 30 --json results.json --baseline last.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+PROJECT = "BENCH"
+
+
+@dataclass
+class Scenario:
+    """一个基准场景：工具名和按序号生成参数的函数."""
+    name: str
+    tool: str
+    arguments: Callable[[int], Dict[str, Any]]
+    iterations: Optional[int] = None
+
+
+@dataclass
+class ScenarioResult:
+    transport: str
+    scenario: str
+    calls: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    throughput_rps: float
+    bytes_per_call: float
+
+
+def build_scenarios(issues: int, iterations: int) -> List[Scenario]:
+    def key(i: int) -> str:
+        return f"{PROJECT}-{i % issues + 1}"
+
+    return [
+        Scenario("get_issue", "get_issue", lambda i: {"issue_key": key(i)}),
+        Scenario(
+            "get_issue_minimal",
+            "get_issue",
+            lambda i: {"issue_key": key(i), "fields": "minimal"},
+        ),
+        Scenario(
+            "search_issues",
+            "search_issues",
+            lambda i: {
+                "jql": f"project = {PROJECT}",
+                "max_results": 50,
+                "start_at": (i * 50) % issues,
+            },
+        ),
+        Scenario(
+            "search_all_issues",
+            "search_all_issues",
+            lambda i: {"jql": f"project = {PROJECT}", "max_total": 500, "fields": "triage"},
+            iterations=max(1, iterations // 20),
+        ),
+        Scenario(
+            "get_issues",
+            "get_issues",
+            lambda i: {"issue_keys": [key(i * 20 + n) for n in range(20)], "fields": "triage"},
+        ),
+        Scenario(
+            "get_issue_attachment",
+            "get_attachment_by_filename",
+            lambda i: {
+                "issue_key": key(i),
+                "filename": "log-0.txt",
+                "save_to_disk": False,
+                "length": 64 * 1024,
+            },
+        ),
+        Scenario("get_projects", "get_projects", lambda i: {}),
+        Scenario("get_project", "get_project", lambda i: {"project_key": "BENCH"}),
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def wait_http(url: str, timeout: float = 30.0) -> None:
+    """等待HTTP服务可用."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"等待 {url} 超时")
+                await asyncio.sleep(0.1)
+
+
+def server_env(args: argparse.Namespace, jira_url: str, home: str) -> Dict[str, str]:
+    """MCP服务器子进程的环境变量."""
+    env = dict(os.environ)
+    env.update({
+        "HOME": home,
+        "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")])),
+        "JIRA_SERVER_URL": jira_url,
+        "JIRA_USERNAME": "bench",
+        "JIRA_PASSWORD": "bench",
+        # 基准测量的是服务器本身，关闭客户端限速
+        "JIRA_RATE_LIMIT": "0",
+        "JIRA_MIRROR_PROJECTS": "",
+    })
+    if not args.with_cache:
+        env["JIRA_ISSUE_CACHE_SIZE"] = "0"
+    return env
+
+
+@asynccontextmanager
+async def stdio_session(env: Dict[str, str]) -> AsyncIterator[ClientSession]:
+    params = StdioServerParameters(
+        command=sys.executable, args=["-m", "jira_mcp", "-t", "stdio"], env=env
+    )
+    async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+@asynccontextmanager
+async def sse_session(env: Dict[str, str]) -> AsyncIterator[ClientSession]:
+    port = free_port()
+    env = dict(env, MCP_SERVER_PORT=str(port))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "jira_mcp", "-t", "sse"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_http(f"http://127.0.0.1:{port}/metrics")
+        async with sse_client(f"http://127.0.0.1:{port}/sse") as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+async def call(session: ClientSession, tool: str, arguments: Dict[str, Any]) -> tuple:
+    """调用一次工具，返回 (是否出错, 返回字节数)."""
+    result = await session.call_tool(tool, arguments)
+    text = "".join(getattr(c, "text", "") for c in result.content)
+    error = bool(result.isError)
+    if not error:
+        try:
+            data = json.loads(text)
+            error = isinstance(data, dict) and "error" in data
+        except ValueError:
+            pass
+    return error, len(text.encode("utf-8"))
+
+
+async def run_scenario(
+    session: ClientSession, transport: str, scenario: Scenario, iterations: int, concurrency: int
+) -> ScenarioResult:
+    total = scenario.iterations or iterations
+    latencies: List[float] = []
+    errors = 0
+    received = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors, received
+        for i in counter:
+            start = time.perf_counter()
+            error, size = await call(session, scenario.tool, scenario.arguments(i))
+            latencies.append(time.perf_counter() - start)
+            errors += error
+            received += size
+
+    # 预热一次，避免把连接建立和字段索引加载计入结果
+    await call(session, scenario.tool, scenario.arguments(0))
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return ScenarioResult(
+        transport=transport,
+        scenario=scenario.name,
+        calls=total,
+        errors=errors,
+        p50_ms=round(percentile(latencies, 0.5) * 1000, 2),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 2),
+        throughput_rps=round(total / elapsed, 1) if elapsed else 0.0,
+        bytes_per_call=round(received / total, 1),
+    )
+
+
+async def peak_rss(session: ClientSession) -> Optional[int]:
+    """从 server_stats 读取服务器进程的峰值内存."""
+    result = await session.call_tool("server_stats", {})
+    try:
+        data = json.loads(result.content[0].text)
+    except (ValueError, IndexError, AttributeError):
+        return None
+    return data.get("gauges", {}).get("process_peak_rss_bytes")
+
+
+async def run_transport(
+    args: argparse.Namespace, transport: str, jira_url: str, scenarios: List[Scenario]
+) -> tuple:
+    env = server_env(args, jira_url, tempfile.mkdtemp(prefix="jira-mcp-bench-"))
+    open_session = stdio_session if transport == "stdio" else sse_session
+    results = []
+    async with open_session(env) as session:
+        for scenario in scenarios:
+            result = await run_scenario(
+                session, transport, scenario, args.iterations, args.concurrency
+            )
+            print_row(result)
+            results.append(result)
+        rss = await peak_rss(session)
+    return results, rss
+
+
+def print_header() -> None:
+    print(f"{'transport':<10}{'scenario':<22}{'calls':>7}{'errors':>7}"
+          f"{'p50 ms':>10}{'p99 ms':>10}{'req/s':>9}{'bytes/call':>12}")
+
+
+def print_row(r: ScenarioResult) -> None:
+    print(f"{r.transport:<10}{r.scenario:<22}{r.calls:>7}{r.errors:>7}"
+          f"{r.p50_ms:>10.2f}{r.p99_ms:>10.2f}{r.throughput_rps:>9.1f}{r.bytes_per_call:>12.0f}")
+
+
+def compare(results: List[ScenarioResult], baseline_path: str) -> None:
+    """与基线结果对比，输出延迟和吞吐的变化百分比."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (r["transport"], r["scenario"]): r for r in json.load(f).get("results", [])
+        }
+
+    def delta(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\n与基线 {baseline_path} 对比:")
+    print(f"{'transport':<10}{'scenario':<22}{'p50':>10}{'p99':>10}{'req/s':>10}")
+    for r in results:
+        old = baseline.get((r.transport, r.scenario))
+        if old is None:
+            continue
+        print(f"{r.transport:<10}{r.scenario:<22}"
+              f"{delta(r.p50_ms, old['p50_ms']):>10}{delta(r.p99_ms, old['p99_ms']):>10}"
+              f"{delta(r.throughput_rps, old['throughput_rps']):>10}")
+
+
+async def _run(args: argparse.Namespace) -> int:
+    jira_port = free_port()
+    jira_url = f"http://127.0.0.1:{jira_port}"
+    fake = subprocess.Popen(
+        [
+            sys.executable, os.path.join(BENCH_DIR, "fake_jira.py"),
+            "--port", str(jira_port),
+            "--projects", PROJECT,
+            "--issues", str(args.issues),
+            "--payload-kb", str(args.payload_kb),
+            "--attachment-kb", str(args.attachment_kb),
+            "--latency-ms", str(args.latency_ms),
+            "--jitter-ms", str(args.jitter_ms),
+        ] + (["--fixtures", args.fixtures] if args.fixtures else []),
+    )
+    try:
+        await wait_http(f"{jira_url}/rest/api/2/serverInfo")
+        scenarios = build_scenarios(args.issues, args.iterations)
+        if args.scenarios:
+            wanted = set(args.scenarios.split(","))
+            scenarios = [s for s in scenarios if s.name in wanted]
+
+        results: List[ScenarioResult] = []
+        rss: Dict[str, Optional[int]] = {}
+        print_header()
+        for transport in args.transport.split(","):
+            transport_results, rss[transport] = await run_transport(
+                args, transport, jira_url, scenarios
+            )
+            results.extend(transport_results)
+        for transport, value in rss.items():
+            if value:
+                print(f"{transport} 服务器峰值内存: {value / 1024 / 1024:.1f} MiB")
+    finally:
+        fake.terminate()
+        fake.wait(timeout=10)
+
+    if args.json:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "iterations": args.iterations,
+                "concurrency": args.concurrency,
+                "issues": args.issues,
+                "payload_kb": args.payload_kb,
+                "latency_ms": args.latency_ms,
+                "with_cache": args.with_cache,
+            },
+            "results": [asdict(r) for r in results],
+            "peak_rss_bytes": rss,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到: {args.json}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JIRA MCP服务器性能基准")
+    parser.add_argument("--transport", default="stdio,sse", help="逗号分隔: stdio,sse")
+    parser.add_argument("--scenarios", help="只运行指定场景（逗号分隔）")
+    parser.add_argument("--iterations", type=int, default=200, help="每个场景的调用次数")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发调用数")
+    parser.add_argument("--issues", type=int, default=500, help="替身服务器的问题数")
+    parser.add_argument("--payload-kb", type=float, default=2.0, help="问题描述大小(KB)")
+    parser.add_argument("--attachment-kb", type=int, default=256, help="附件大小(KB)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="替身服务器每个请求的延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="替身服务器的随机附加延迟")
+    parser.add_argument("--fixtures", help="录制的问题JSON文件")
+    parser.add_argument("--with-cache", action="store_true", help="启用问题缓存（默认关闭）")
+    parser.add_argument("--json", help="把结果保存为JSON")
+    parser.add_argument("--baseline", help="与之前保存的JSON结果对比")
+    args = parser.parse_args()
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
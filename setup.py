@@ -14,7 +14,7 @@ setup(
     install_requires=[
         "fastapi",
         "uvicorn",
-        "jira",
+        "httpx",
         "pydantic",
         "python-dotenv",
     ],
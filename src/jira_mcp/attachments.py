@@ -0,0 +1,176 @@
+"""附件元数据索引与本地附件缓存索引."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attachments (
+    id TEXT PRIMARY KEY,
+    issue_key TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created TEXT,
+    sha256 TEXT,
+    local_path TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attachments_access ON attachments(last_access);
+"""
+
+
+class IssueAttachments:
+    """单个问题的附件元数据索引，按附件ID和文件名查找."""
+
+    def __init__(self, issue: Dict[str, Any]):
+        fields = issue.get("fields") or {}
+        self.updated: Optional[str] = fields.get("updated")
+        self.attachments: List[Dict[str, Any]] = fields.get("attachment") or []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_filename: Dict[str, Dict[str, Any]] = {}
+        for attachment in self.attachments:
+            self.by_id[str(attachment.get("id"))] = attachment
+            # 同名附件以第一个为准
+            self.by_filename.setdefault(attachment.get("filename"), attachment)
+
+    def find(
+        self, attachment_id: Optional[str] = None, filename: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        if attachment_id is not None:
+            return self.by_id.get(str(attachment_id))
+        return self.by_filename.get(filename)
+
+
+class AttachmentIndex:
+    """记录已下载附件的SQLite索引，按附件ID查找有效的本地副本.
+
+    JIRA附件内容不可变，附件ID、大小和创建时间与记录一致且本地文件完整时，
+    可以直接使用本地副本。索引总大小超过上限时按最近访问时间淘汰。
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 2 * 1024 ** 3):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            # 多个worker进程可能同时读写索引
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def lookup(self, attachment: Dict[str, Any]) -> Optional[str]:
+        """查找附件的有效本地副本.
+
+        Args:
+            attachment: JIRA返回的附件元数据
+
+        Returns:
+            Optional[str]: 本地文件路径，不存在或已失效时返回None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM attachments WHERE id = ?", (str(attachment["id"]),)
+            ).fetchone()
+            if row is None:
+                return None
+
+            local_path = row["local_path"]
+            expected_size = attachment.get("size", row["size"])
+            valid = (
+                row["size"] == expected_size
+                and row["created"] == attachment.get("created", row["created"])
+                and os.path.isfile(local_path)
+                and os.path.getsize(local_path) == row["size"]
+            )
+            if not valid:
+                self.conn.execute("DELETE FROM attachments WHERE id = ?", (row["id"],))
+                self.conn.commit()
+                return None
+
+            self.conn.execute(
+                "UPDATE attachments SET last_access = ? WHERE id = ?",
+                (time.time(), row["id"]),
+            )
+            self.conn.commit()
+            return local_path
+
+    def record(
+        self,
+        issue_key: str,
+        attachment: Dict[str, Any],
+        local_path: str,
+        size: int,
+        sha256: Optional[str] = None,
+    ) -> None:
+        """记录一个已下载的附件，并在超出容量时淘汰旧附件."""
+        with self._lock:
+            # 同一路径只对应一个附件
+            self.conn.execute(
+                "DELETE FROM attachments WHERE local_path = ? AND id != ?",
+                (local_path, str(attachment["id"])),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO attachments "
+                "(id, issue_key, filename, size, created, sha256, local_path, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(attachment["id"]),
+                    issue_key,
+                    attachment["filename"],
+                    size,
+                    attachment.get("created"),
+                    sha256,
+                    local_path,
+                    time.time(),
+                ),
+            )
+            self.conn.commit()
+            self._evict(keep_id=str(attachment["id"]))
+
+    def _evict(self, keep_id: str) -> None:
+        """按最近访问时间淘汰附件，直到总大小不超过上限."""
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM attachments"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.conn.execute(
+            "SELECT id, size, local_path FROM attachments "
+            "WHERE id != ? ORDER BY last_access",
+            (keep_id,),
+        ).fetchall()
+        for row in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(row["local_path"])
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"删除缓存附件 {row['local_path']} 失败: {str(e)}")
+                continue
+            self.conn.execute("DELETE FROM attachments WHERE id = ?", (row["id"],))
+            total -= row["size"]
+            logger.info(f"淘汰缓存附件: {row['local_path']}")
+        self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存的附件数和总大小."""
+        with self._lock:
+            count, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM attachments"
+            ).fetchone()
+        return {"count": count, "bytes": total, "max_bytes": self.max_bytes}
@@ -0,0 +1,165 @@
+"""问题输出的精简模式与响应大小预算."""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# 长文本截断的下限（字符数），低于该长度不再继续截断
+MIN_TEXT_CHARS = 200
+
+# 为裁剪报告和外层结构预留的token数
+REPORT_RESERVE = 128
+
+# 超出预算时首先去掉的低价值字段
+LOW_VALUE_FIELDS = ("self", "id")
+
+# 依次整体去掉的字段
+DROPPABLE_FIELDS = ("custom_fields", "attachments", "components", "labels")
+
+_USER_FIELDS = ("assignee", "reporter")
+_NAMED_FIELDS = ("status", "issue_type", "priority")
+
+
+def estimate_tokens(value: Any) -> int:
+    """按序列化后的UTF-8字节数估算token数（约4字节一个token）."""
+    return (len(json.dumps(value, ensure_ascii=False).encode("utf-8")) + 3) // 4
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def compact_issue(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """把格式化后的问题精简为扁平结构.
+
+    用户、状态、类型、优先级等嵌套对象只保留名称，项目只保留键，组件只保留
+    名称列表，附件只保留ID、文件名和大小；去掉空值和 ``self``。
+    """
+    result: Dict[str, Any] = {}
+    for name, value in issue.items():
+        if name == "self" or _is_empty(value):
+            continue
+        if name in _USER_FIELDS:
+            value = value.get("display_name") or value.get("name")
+        elif name in _NAMED_FIELDS:
+            value = value.get("name")
+        elif name == "project":
+            value = value.get("key")
+        elif name == "components":
+            value = [c.get("name") for c in value]
+        elif name == "attachments":
+            value = [
+                {"id": a.get("id"), "filename": a.get("filename"), "size": a.get("size")}
+                for a in value
+            ]
+        elif name == "custom_fields":
+            value = {k: v for k, v in value.items() if not _is_empty(v)}
+            if not value:
+                continue
+        result[name] = value
+    return result
+
+
+def _text_fields(issue: Dict[str, Any]) -> List[Tuple[Optional[str], str, str]]:
+    """返回问题中可截断的长文本 ``(容器, 字段名, 原文)``."""
+    texts = []
+    if isinstance(issue.get("description"), str):
+        texts.append((None, "description", issue["description"]))
+    custom = issue.get("custom_fields")
+    if isinstance(custom, dict):
+        for name, value in custom.items():
+            if isinstance(value, str):
+                texts.append(("custom_fields", name, value))
+    return texts
+
+
+def fit_to_budget(
+    issues: List[Dict[str, Any]], max_tokens: int
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """把问题列表确定性地裁剪到token预算内.
+
+    依次执行，直到估算大小不超过预算：
+    1. 去掉空值和 ``self``、``id`` 等低价值字段；
+    2. 逐步减半长文本（描述和文本型自定义字段）的保留长度，最短 MIN_TEXT_CHARS；
+    3. 按 DROPPABLE_FIELDS 的顺序整体去掉字段；
+    4. 从列表末尾丢弃问题（至少保留一个）。
+
+    Args:
+        issues: 格式化后的问题列表，不会被修改
+        max_tokens: token预算
+
+    Returns:
+        Tuple: 裁剪后的问题列表，以及裁剪报告（未裁剪时为None）
+    """
+    if estimate_tokens(issues) <= max_tokens:
+        return issues, None
+    report: Dict[str, Any] = {"max_tokens": max_tokens}
+    # 裁剪时为报告本身预留空间
+    max_tokens = max(1, max_tokens - REPORT_RESERVE)
+
+    issues = [dict(issue) for issue in issues]
+    for issue in issues:
+        if isinstance(issue.get("custom_fields"), dict):
+            issue["custom_fields"] = dict(issue["custom_fields"])
+    dropped: List[str] = []
+
+    def over() -> bool:
+        return estimate_tokens(issues) > max_tokens
+
+    # 1. 空值和低价值字段
+    for issue in issues:
+        for name in [n for n, v in issue.items() if n in LOW_VALUE_FIELDS or _is_empty(v)]:
+            del issue[name]
+            if name not in dropped:
+                dropped.append(name)
+
+    # 2. 长文本按原文截断，避免重复截断时叠加标记
+    originals = [_text_fields(issue) for issue in issues]
+    longest = max((len(text) for texts in originals for _, _, text in texts), default=0)
+    cap = longest
+    while over() and cap > MIN_TEXT_CHARS:
+        cap = max(MIN_TEXT_CHARS, cap // 2)
+        for issue, texts in zip(issues, originals):
+            for container, name, text in texts:
+                target = issue[container] if container else issue
+                if len(text) > cap and name in target:
+                    target[name] = text[:cap] + "…"
+
+    # 3. 整体去掉次要字段
+    for name in DROPPABLE_FIELDS:
+        if not over():
+            break
+        removed = False
+        for issue in issues:
+            if name in issue:
+                if name == "attachments":
+                    issue["attachment_count"] = len(issue["attachments"])
+                del issue[name]
+                removed = True
+        if removed:
+            dropped.append(name)
+
+    # 4. 从末尾丢弃问题
+    sizes = [estimate_tokens(issue) + 1 for issue in issues]
+    total = estimate_tokens(issues)
+    omitted = 0
+    while len(issues) > 1 and total > max_tokens:
+        issues.pop()
+        total -= sizes.pop()
+        omitted += 1
+
+    # 每个字段被截断的问题数（只统计保留下来的问题）
+    truncated: Dict[str, int] = {}
+    for issue, texts in zip(issues, originals):
+        for container, name, text in texts:
+            if len(text) > cap and (container is None or container in issue):
+                truncated[name] = truncated.get(name, 0) + 1
+    if truncated:
+        report["text_truncated_to"] = cap
+        report["truncated_text"] = truncated
+    if dropped:
+        report["dropped_fields"] = dropped
+    if omitted:
+        report["omitted_issues"] = omitted
+    report["estimated_tokens"] = estimate_tokens(issues)
+    report["over_budget"] = report["estimated_tokens"] > max_tokens
+    return issues, report
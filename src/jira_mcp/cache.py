@@ -0,0 +1,290 @@
+"""JIRA问题的进程内缓存."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .encoding import EncodedJSON
+from .shared import SharedCache
+
+CacheKey = Tuple[str, Tuple[str, ...], Tuple[str, ...]]
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目，保存原始问题JSON."""
+    issue: Dict[str, Any]
+    stored_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def updated(self) -> Optional[str]:
+        return (self.issue.get("fields") or {}).get("updated")
+
+
+def _covered(field_set: Iterable[str], fields: Dict[str, Any]) -> bool:
+    """字段集是否完全包含在更新后的字段（含 ``updated``）中."""
+    field_set = set(field_set)
+    return bool(field_set) and "updated" in fields and field_set <= set(fields)
+
+
+def _patched(issue: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """返回写入了更新字段的问题副本."""
+    return dict(issue, fields=dict(issue.get("fields") or {}, **fields))
+
+
+class IssueCache:
+    """按问题键和字段集缓存问题，带容量上限(LRU)和TTL.
+
+    过期条目不会立即丢弃，调用方可以用 ``updated`` 时间戳做轻量校验，
+    未变化时通过 :meth:`touch` 续期。
+
+    配置 ``shared`` 时作为多进程共享缓存之上的本地一级缓存：本地未命中时
+    从共享缓存读取，写入、续期和失效同时作用于两层。其他进程的写入在本地
+    条目过期校验后可见。共享缓存的读写在线程中执行，不阻塞事件循环。
+    """
+
+    # 共享缓存中的默认命名空间，多租户时每个租户使用独立的命名空间
+    NAMESPACE = "issue"
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        ttl: float = 60.0,
+        shared: Optional[SharedCache] = None,
+        namespace: str = NAMESPACE,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self.namespace = namespace
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        issue_key: str,
+        fields: Optional[Iterable[str]] = None,
+        expand: Optional[Iterable[str]] = None,
+    ) -> CacheKey:
+        """生成缓存键."""
+        return (
+            issue_key.upper(),
+            tuple(sorted(fields or ())),
+            tuple(sorted(expand or ())),
+        )
+
+    @staticmethod
+    def _shared_key(key: CacheKey) -> str:
+        return json.dumps(key)
+
+    def _from_shared(
+        self, key: CacheKey, found: Tuple[Dict[str, Any], float]
+    ) -> CacheEntry:
+        issue, stored_at = found
+        # 共享缓存使用墙上时钟，换算为本进程的monotonic时间
+        age = max(0.0, time.time() - stored_at)
+        entry = CacheEntry(issue, stored_at=time.monotonic() - age)
+        self._store(key, entry)
+        return entry
+
+    async def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """获取条目（可能已过期），并更新LRU顺序."""
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: List[CacheKey]) -> Dict[CacheKey, CacheEntry]:
+        """批量获取条目，本地未命中的键在一次共享缓存查询中查找."""
+        found: Dict[CacheKey, CacheEntry] = {}
+        missing = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                found[key] = entry
+            else:
+                missing.append(key)
+        if missing and self.shared is not None and self.max_size > 0:
+            shared_keys = {self._shared_key(key): key for key in missing}
+            rows = await asyncio.to_thread(
+                self.shared.get_many, self.namespace, list(shared_keys)
+            )
+            for shared_key, row in rows.items():
+                key = shared_keys[shared_key]
+                # 等待期间本地可能已写入更新的条目
+                entry = self._entries.get(key)
+                found[key] = entry if entry is not None else self._from_shared(key, row)
+        return found
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    async def touch(self, key: CacheKey) -> None:
+        """校验通过后续期条目."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.stored_at = time.monotonic()
+            self.revalidated += 1
+            if self.shared is not None:
+                await asyncio.to_thread(
+                    self.shared.touch, self.namespace, self._shared_key(key)
+                )
+
+    def _store(self, key: CacheKey, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def put(self, key: CacheKey, issue: Dict[str, Any]) -> None:
+        """写入条目，超出容量时淘汰最久未使用的条目."""
+        await self.put_many([(key, issue)])
+
+    async def put_many(self, items: List[Tuple[CacheKey, Dict[str, Any]]]) -> None:
+        """写入多个条目，共享缓存中在一个事务内写入."""
+        if self.max_size <= 0 or not items:
+            return
+        for key, issue in items:
+            self._store(key, CacheEntry(issue))
+        if self.shared is not None:
+            await asyncio.to_thread(
+                self.shared.set_many,
+                self.namespace,
+                [(self._shared_key(key), issue, key[0]) for key, issue in items],
+            )
+
+    async def discard(self, key: CacheKey) -> None:
+        """删除单个条目."""
+        self._entries.pop(key, None)
+        if self.shared is not None:
+            await asyncio.to_thread(
+                self.shared.delete, self.namespace, self._shared_key(key)
+            )
+
+    async def patch(self, issue_key: str, fields: Dict[str, Any]) -> None:
+        """把更新后的字段写回该问题的缓存条目.
+
+        ``fields`` 为服务端返回的已修改字段和新的 ``updated``。只有字段集完全
+        包含在其中的条目会被更新；其他条目（如 ``*all``）中可能有随之变化的
+        字段（工作流状态、自动化维护的自定义字段等），而写回新的 ``updated``
+        会让过期校验认为它们仍然有效，因此直接删除。带expand的条目同样删除。
+        """
+        issue_key = issue_key.upper()
+        for key in [k for k in self._entries if k[0] == issue_key]:
+            _, field_set, expand = key
+            if expand or not _covered(field_set, fields):
+                del self._entries[key]
+                continue
+            entry = self._entries[key]
+            entry.issue = _patched(entry.issue, fields)
+            entry.stored_at = time.monotonic()
+
+        if self.shared is not None:
+            await asyncio.to_thread(self._patch_shared, issue_key, fields)
+
+    def _patch_shared(self, issue_key: str, fields: Dict[str, Any]) -> None:
+        updates = []
+        for shared_key, issue in self.shared.tagged(self.namespace, issue_key):
+            _, field_set, expand = json.loads(shared_key)
+            if expand or not _covered(field_set, fields):
+                self.shared.delete(self.namespace, shared_key)
+                continue
+            updates.append((shared_key, _patched(issue, fields), issue_key))
+        self.shared.set_many(self.namespace, updates)
+
+    async def invalidate(self, issue_key: str) -> None:
+        """删除某个问题的所有字段集条目."""
+        issue_key = issue_key.upper()
+        for key in [k for k in self._entries if k[0] == issue_key]:
+            del self._entries[key]
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.delete_tag, self.namespace, issue_key)
+
+    async def clear(self) -> None:
+        """清空本地条目和共享缓存中的问题条目."""
+        self._entries.clear()
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.clear, self.namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+
+class RenderedIssueCache:
+    """按问题版本缓存格式化后的问题及其编码结果.
+
+    键包含问题键、``updated`` 时间戳、字段集、expand和字段索引的加载时间，
+    问题或字段元数据变化后自然失效；没有 ``updated`` 的问题不缓存。JIRA
+    按用户权限返回内容（如邮箱地址），同一版本的问题对不同用户可能不同，
+    因此键中还包含调用方的租户标识。
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, EncodedJSON]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        issue: Dict[str, Any],
+        fields: Optional[Iterable[str]],
+        expand: Optional[Iterable[str]],
+        version: float,
+        owner: str = "",
+    ) -> Optional[Tuple]:
+        updated = (issue.get("fields") or {}).get("updated")
+        if not updated or not issue.get("key"):
+            return None
+        return (
+            owner,
+            issue["key"].upper(),
+            updated,
+            tuple(sorted(fields or ())),
+            tuple(sorted(expand or ())),
+            version,
+        )
+
+    def get(self, key: Tuple) -> Optional[EncodedJSON]:
+        rendered = self._entries.get(key)
+        if rendered is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return rendered
+
+    def put(self, key: Tuple, rendered: EncodedJSON) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = rendered
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
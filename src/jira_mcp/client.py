@@ -0,0 +1,376 @@
+"""JIRA异步REST客户端."""
+
+import importlib.util
+import logging
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import tzinfo
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import httpx
+
+from .metrics import registry as metrics
+from .ratelimit import RequestScheduler, endpoint_class
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# REST API路径前缀
+API_PREFIX = "/rest/api/2"
+
+
+class JiraError(Exception):
+    """JIRA REST请求失败."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _error_message(response: httpx.Response) -> str:
+    """从JIRA错误响应中提取可读的错误信息."""
+    try:
+        data = response.json()
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+
+    messages = list(data.get("errorMessages") or [])
+    messages.extend(f"{k}: {v}" for k, v in (data.get("errors") or {}).items())
+    return "; ".join(messages) or f"HTTP {response.status_code}"
+
+
+class AsyncJiraClient:
+    """基于httpx连接池的JIRA异步客户端.
+
+    所有请求共享同一个 ``httpx.AsyncClient``，并发的工具调用可以复用
+    已建立的连接，网络等待相互重叠而不会阻塞事件循环。所有请求都经过
+    :class:`RequestScheduler` 做限速、限流重试和并发控制。只读请求（GET和
+    搜索）按规范化的请求参数做并发合并，相同的请求同一时刻只发送一次。
+
+    连接池大小应不小于调度器的最大并发数，否则并发请求会在连接池上排队。
+    空闲连接保留 ``keepalive_expiry`` 秒，后续请求可以复用已完成TLS握手的
+    连接。响应默认接受gzip/deflate压缩。
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        auth: Tuple[str, str],
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout: float = 30.0,
+        scheduler: Optional[RequestScheduler] = None,
+        connect_timeout: float = 10.0,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+    ):
+        self.server_url = server_url.rstrip("/")
+        self.scheduler = scheduler or RequestScheduler()
+        self.flights = SingleFlight()
+        self._timezone: Optional[tzinfo] = None
+        self._timezone_loaded = False
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("未安装h2，HTTP/2不可用，使用HTTP/1.1 (pip install 'httpx[http2]')")
+            http2 = False
+        self.http2 = http2
+        self._http = httpx.AsyncClient(
+            base_url=self.server_url,
+            auth=auth,
+            # httpx默认发送 Accept-Encoding: gzip, deflate 并自动解压
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            follow_redirects=True,
+            http2=http2,
+        )
+
+    async def send(
+        self, method: str, url: str, stream: bool = False, **kwargs
+    ) -> httpx.Response:
+        """通过请求调度器发送请求，不检查状态码.
+
+        ``stream=True`` 时响应体未读取，调用方负责 ``aclose()``。
+        """
+        request = self._http.build_request(method, url, **kwargs)
+        idempotent = method in ("GET", "HEAD", "PUT", "DELETE") or "/search" in url
+        endpoint = endpoint_class(url)
+
+        async def attempt() -> httpx.Response:
+            start = time.perf_counter()
+            try:
+                response = await self._http.send(request, stream=stream)
+            except httpx.TransportError:
+                metrics.inc("jira_requests_total", endpoint=endpoint, method=method, status="error")
+                raise
+            finally:
+                metrics.observe(
+                    "jira_request_duration_seconds",
+                    time.perf_counter() - start,
+                    endpoint=endpoint,
+                    method=method,
+                )
+            metrics.inc(
+                "jira_requests_total",
+                endpoint=endpoint,
+                method=method,
+                status=response.status_code,
+            )
+            if not stream:
+                received = response.num_bytes_downloaded or len(response.content)
+                metrics.inc("jira_response_bytes_total", received, endpoint=endpoint)
+            return response
+
+        return await self.scheduler.send(url, attempt, idempotent=idempotent)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """发送请求，非2xx响应抛出JiraError.
+
+        Args:
+            method: HTTP方法
+            url: 以 ``/`` 开头的相对路径或完整URL
+
+        Returns:
+            httpx.Response: 响应对象
+        """
+        response = await self.send(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise JiraError(response.status_code, _error_message(response))
+        return response
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET一个REST API路径并返回JSON，相同的并发请求会合并."""
+        async def fetch() -> Any:
+            response = await self.request("GET", f"{API_PREFIX}{path}", params=params)
+            return response.json()
+
+        key = ("GET", path, tuple(sorted((params or {}).items())))
+        return await self.flights.do(key, fetch)
+
+    async def issue(
+        self,
+        issue_key: str,
+        fields: Optional[List[str]] = None,
+        expand: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """获取单个问题的原始JSON.
+
+        Args:
+            issue_key: 问题键
+            fields: 需要返回的字段，None表示全部
+            expand: 需要展开的内容，如 renderedFields、changelog
+        """
+        # 字段顺序不影响结果，排序后相同字段集的请求可以合并
+        params = {}
+        if fields:
+            params["fields"] = ",".join(sorted(fields))
+        if expand:
+            params["expand"] = ",".join(sorted(expand))
+        return await self.get_json(f"/issue/{issue_key.upper()}", params=params or None)
+
+    async def search_issues(
+        self,
+        jql: str,
+        start_at: int = 0,
+        max_results: int = 50,
+        fields: Optional[List[str]] = None,
+        expand: Optional[List[str]] = None,
+        validate_query: bool = True,
+    ) -> Dict[str, Any]:
+        """执行JQL搜索，返回包含 ``total`` 和 ``issues`` 的原始JSON.
+
+        ``validate_query=False`` 时JIRA会忽略不存在的问题键而不是返回400。
+        """
+        body: Dict[str, Any] = {"jql": jql, "startAt": start_at, "maxResults": max_results}
+        if not validate_query:
+            body["validateQuery"] = False
+        if fields:
+            body["fields"] = fields
+        if expand:
+            body["expand"] = expand
+
+        async def fetch() -> Dict[str, Any]:
+            response = await self.request("POST", f"{API_PREFIX}/search", json=body)
+            return response.json()
+
+        key = (
+            "search",
+            jql.strip(),
+            start_at,
+            max_results,
+            tuple(fields or ()),
+            tuple(sorted(expand or ())),
+            validate_query,
+        )
+        return await self.flights.do(key, fetch)
+
+    async def create_issue(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """创建问题，返回 ``{"id", "key", "self"}``."""
+        response = await self.request(
+            "POST", f"{API_PREFIX}/issue", json={"fields": fields}
+        )
+        return response.json()
+
+    async def create_issues_bulk(self, fields_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """批量创建问题，返回包含 ``issues`` 和 ``errors`` 的原始JSON.
+
+        部分失败时JIRA返回400，但响应体中仍包含成功创建的问题。
+        """
+        response = await self.send(
+            "POST",
+            f"{API_PREFIX}/issue/bulk",
+            json={"issueUpdates": [{"fields": fields} for fields in fields_list]},
+        )
+        if response.status_code >= 400:
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            if not isinstance(data, dict) or "errors" not in data:
+                raise JiraError(response.status_code, _error_message(response))
+            return data
+        return response.json()
+
+    async def update_issue(
+        self, issue_key: str, fields: Dict[str, Any], return_issue: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """更新问题字段.
+
+        ``return_issue=True`` 时请求JIRA在响应中返回更新后的问题（JIRA Cloud支持，
+        JIRA Server会忽略该参数并返回204），不支持时返回None。
+        """
+        params = {"returnIssue": "true"} if return_issue else None
+        response = await self.request(
+            "PUT", f"{API_PREFIX}/issue/{issue_key}", params=params, json={"fields": fields}
+        )
+        if return_issue and response.status_code == 200 and response.content:
+            return response.json()
+        return None
+
+    async def projects(self, expand: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """获取所有可见项目.
+
+        Args:
+            expand: 需要展开的内容，如 description、lead
+        """
+        params = {"expand": ",".join(sorted(expand))} if expand else None
+        return await self.get_json("/project", params=params)
+
+    async def project(self, project_key: str) -> Dict[str, Any]:
+        """获取项目详情."""
+        return await self.get_json(f"/project/{project_key}")
+
+    async def user_timezone(self) -> Optional[tzinfo]:
+        """当前用户在JIRA中设置的时区，JQL中不带时区的时间按该时区解释.
+
+        结果缓存在客户端中；JIRA没有返回时区或时区无法识别时返回None，
+        请求失败时返回None且不缓存。
+        """
+        if self._timezone_loaded:
+            return self._timezone
+        try:
+            name = (await self.get_json("/myself")).get("timeZone")
+        except (JiraError, httpx.HTTPError) as e:
+            logger.warning(f"获取JIRA用户时区失败: {str(e)}")
+            return None
+        try:
+            self._timezone = ZoneInfo(name) if name else None
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"无法识别JIRA用户时区 {name}")
+        self._timezone_loaded = True
+        return self._timezone
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """以流的方式发送GET请求，非2xx响应抛出JiraError.
+
+        读取的字节数和读取耗时记入附件下载指标。
+        """
+        start = time.perf_counter()
+        response = await self.send("GET", url, stream=True, headers=headers)
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                raise JiraError(response.status_code, _error_message(response))
+            yield response
+        finally:
+            await response.aclose()
+            received = response.num_bytes_downloaded
+            metrics.inc("jira_response_bytes_total", received, endpoint=endpoint_class(url))
+            metrics.inc("attachment_download_bytes_total", received)
+            metrics.inc("attachment_download_seconds_total", time.perf_counter() - start)
+
+    async def download_range(self, url: str, offset: int, length: int) -> bytes:
+        """用HTTP Range请求下载附件的一段内容.
+
+        服务端不支持Range时按流读取，跳过偏移之前的内容，读够后立即停止。
+        """
+        if length <= 0:
+            return b""
+        headers = {"Range": f"bytes={offset}-{offset + length - 1}"}
+        async with self.stream(url, headers=headers) as response:
+            if response.status_code == 206:
+                return (await response.aread())[:length]
+
+            buf = bytearray()
+            pos = 0
+            async for chunk in response.aiter_bytes():
+                end = pos + len(chunk)
+                if end > offset:
+                    buf += chunk[max(0, offset - pos):]
+                    if len(buf) >= length:
+                        break
+                pos = end
+            return bytes(buf[:length])
+
+    async def download_to_file(
+        self,
+        url: str,
+        path: str,
+        chunk_size: int = 1024 * 1024,
+        digest: Optional[Any] = None,
+    ) -> int:
+        """流式下载附件到文件.
+
+        内容分块写入同目录下的临时文件，下载完成后再重命名到目标路径，
+        内存占用与文件大小无关，失败时不会留下不完整的文件。
+
+        Args:
+            url: 附件URL
+            path: 目标文件路径
+            chunk_size: 每次读取的字节数
+            digest: 可选的hashlib对象，写入时同步计算内容摘要
+
+        Returns:
+            int: 写入的字节数
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".", prefix=".", suffix=".part"
+        )
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async with self.stream(url) as response:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        f.write(chunk)
+                        size += len(chunk)
+                        if digest is not None:
+                            digest.update(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return size
+
+    async def aclose(self) -> None:
+        """关闭连接池."""
+        await self._http.aclose()
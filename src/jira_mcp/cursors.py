@@ -0,0 +1,104 @@
+"""增量查询的游标，持久化在本地SQLite中."""
+
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    id TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    watermark TEXT,
+    seen TEXT NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cursors_used ON cursors(used_at);
+"""
+
+
+@dataclass
+class Cursor:
+    """增量查询的位置.
+
+    JQL的时间条件只精确到分钟，``watermark`` 为已返回的最新问题所在的分钟，
+    ``seen`` 记录该分钟内已返回的问题及其 ``updated``，下次查询时跳过。
+    """
+    scope: str
+    owner: str
+    watermark: Optional[str] = None
+    seen: Dict[str, str] = field(default_factory=dict)
+
+
+class CursorStore:
+    """保存增量查询游标.
+
+    游标一经创建不再修改，有新变化时生成新游标：调用方没有收到响应时，
+    用旧游标重试会得到相同的结果。超过 ``ttl`` 秒未使用的游标会被清理。
+    """
+
+    def __init__(self, db_path: str, ttl: float = 30 * 86400):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, cursor_id: str) -> Optional[Cursor]:
+        """读取游标并记录使用时间，不存在或已过期时返回None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT scope, owner, watermark, seen FROM cursors WHERE id = ?", (cursor_id,)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE cursors SET used_at = ? WHERE id = ?", (time.time(), cursor_id)
+                )
+                self.conn.commit()
+        if row is None:
+            return None
+        return Cursor(
+            scope=row["scope"],
+            owner=row["owner"],
+            watermark=row["watermark"],
+            seen=json.loads(row["seen"]),
+        )
+
+    def create(self, cursor: Cursor) -> str:
+        """保存游标并返回其ID，同时清理过期游标."""
+        cursor_id = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO cursors (id, scope, owner, watermark, seen, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    cursor_id,
+                    cursor.scope,
+                    cursor.owner,
+                    cursor.watermark,
+                    json.dumps(cursor.seen),
+                    now,
+                ),
+            )
+            self.conn.execute("DELETE FROM cursors WHERE used_at < ?", (now - self.ttl,))
+            self.conn.commit()
+        return cursor_id
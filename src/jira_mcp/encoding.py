@@ -0,0 +1,78 @@
+"""工具结果的JSON序列化.
+
+安装了 orjson 时使用 orjson 编码，否则使用 MCP SDK 依赖的 pydantic_core。
+输出为紧凑格式（不缩进）。
+"""
+
+from typing import Any
+
+import pydantic_core
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+# 当前使用的编码后端
+BACKEND = "orjson" if orjson is not None else "pydantic_core"
+
+
+def _encode(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except orjson.JSONEncodeError:
+            # 超过64位的整数等orjson不支持的值
+            pass
+    return pydantic_core.to_json(value, fallback=str).decode()
+
+
+class EncodedJSON(dict):
+    """缓存了编码结果的字典.
+
+    首次序列化时保存编码后的文本，之后再次出现在工具结果中时直接复用。
+    实例会被缓存共享，因此是只读的；需要修改时先用 ``dict(...)`` 复制。
+    """
+
+    __slots__ = ("_text",)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._text = None
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("EncodedJSON 是只读的")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = _encode(self)
+        return self._text
+
+
+def _has_encoded(value: Any) -> bool:
+    if isinstance(value, EncodedJSON):
+        return True
+    if isinstance(value, list):
+        return any(isinstance(item, EncodedJSON) for item in value)
+    return False
+
+
+def dumps(value: Any) -> str:
+    """把工具结果编码为JSON文本.
+
+    外层字典和列表中的 :class:`EncodedJSON` 直接拼接已编码的文本，
+    其余部分整体交给编码后端。
+    """
+    if isinstance(value, EncodedJSON):
+        return value.text
+    if isinstance(value, dict) and any(_has_encoded(v) for v in value.values()):
+        return "{" + ",".join(
+            f"{_encode(str(k))}:{dumps(v)}" for k, v in value.items()
+        ) + "}"
+    if isinstance(value, list) and any(isinstance(item, EncodedJSON) for item in value):
+        return "[" + ",".join(dumps(item) for item in value) + "]"
+    return _encode(value)
@@ -0,0 +1,221 @@
+"""JIRA字段投影预设与字段元数据索引."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .shared import SharedCache
+
+logger = logging.getLogger(__name__)
+
+# 字段预设，直接下推到REST请求的 fields 参数
+FIELD_PRESETS: Dict[str, List[str]] = {
+    "minimal": ["summary", "status", "issuetype", "updated"],
+    "triage": [
+        "summary",
+        "status",
+        "issuetype",
+        "priority",
+        "assignee",
+        "reporter",
+        "project",
+        "labels",
+        "components",
+        "created",
+        "updated",
+    ],
+    "full": ["*all"],
+}
+
+DEFAULT_PRESET = "full"
+
+
+def resolve_fields(fields: Optional[str]) -> List[str]:
+    """把预设名或逗号分隔的字段列表解析为REST请求的字段列表.
+
+    Args:
+        fields: 预设名（minimal/triage/full）或逗号分隔的字段ID
+
+    Returns:
+        List[str]: 字段ID列表
+    """
+    if not fields:
+        fields = DEFAULT_PRESET
+    preset = FIELD_PRESETS.get(fields.strip().lower())
+    if preset is not None:
+        return list(preset)
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
+def resolve_expand(expand: Optional[str]) -> Optional[List[str]]:
+    """把逗号分隔的expand参数解析为列表."""
+    if not expand:
+        return None
+    return [e.strip() for e in expand.split(",") if e.strip()]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _named(value: Any) -> Any:
+    """对象型字段取其可读名称."""
+    if isinstance(value, dict):
+        for key in ("displayName", "name", "value", "key"):
+            if key in value:
+                return value[key]
+    return value
+
+
+def _option(value: Any) -> Any:
+    """选项字段取其值，级联选项拼接子选项."""
+    if not isinstance(value, dict):
+        return value
+    text = value.get("value", value.get("name"))
+    child = value.get("child")
+    if isinstance(child, dict) and child.get("value"):
+        return f"{text} - {child['value']}"
+    return text
+
+
+# 按schema类型预编译的转换函数
+_TYPE_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "string": _identity,
+    "number": _identity,
+    "date": _identity,
+    "datetime": _identity,
+    "any": _named,
+    "option": _option,
+    "option-with-child": _option,
+    "user": _named,
+    "group": _named,
+    "project": _named,
+    "version": _named,
+    "component": _named,
+    "priority": _named,
+    "status": _named,
+    "issuetype": _named,
+    "resolution": _named,
+    "securitylevel": _named,
+}
+
+
+def build_converter(schema: Optional[Dict[str, Any]]) -> Callable[[Any], Any]:
+    """根据字段schema生成值转换函数."""
+    schema = schema or {}
+    field_type = schema.get("type", "any")
+    if field_type == "array":
+        item_converter = _TYPE_CONVERTERS.get(schema.get("items", "any"), _named)
+        return lambda values: [item_converter(v) for v in values or []]
+    return _TYPE_CONVERTERS.get(field_type, _named)
+
+
+@dataclass
+class FieldInfo:
+    """字段元数据."""
+    id: str
+    name: str
+    type: str
+    convert: Callable[[Any], Any]
+
+
+class FieldIndex:
+    """由 ``/rest/api/2/field`` 构建的自定义字段索引.
+
+    索引在首次使用时加载，过期后在后台刷新，刷新期间继续使用旧索引。
+    配置 ``shared`` 时字段元数据保存在多进程共享缓存中，其他进程已加载且
+    未过期时直接复用，不再请求JIRA。
+    """
+
+    # 共享缓存中的命名空间
+    NAMESPACE = "field"
+
+    def __init__(self, ttl: float = 3600.0, shared: Optional[SharedCache] = None):
+        self.ttl = ttl
+        self.shared = shared
+        self.custom: Dict[str, FieldInfo] = {}
+        self.loaded_at = 0.0
+        self._retry_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at > 0
+
+    def load(self, field_list: List[Dict[str, Any]], age: float = 0.0) -> None:
+        """用字段元数据列表重建索引，``age`` 为元数据已存在的秒数."""
+        custom = {}
+        for field in field_list:
+            if not field.get("custom"):
+                continue
+            schema = field.get("schema") or {}
+            custom[field["id"]] = FieldInfo(
+                id=field["id"],
+                name=field.get("name") or field["id"],
+                type=schema.get("type", "any"),
+                convert=build_converter(schema),
+            )
+        self.custom = custom
+        self.loaded_at = time.monotonic() - age
+
+    async def refresh(self, client) -> None:
+        """重新加载字段元数据，优先使用共享缓存中未过期的副本."""
+        if self.shared is not None:
+            found = await asyncio.to_thread(self.shared.get, self.NAMESPACE, "all")
+            if found is not None:
+                field_list, stored_at = found
+                age = max(0.0, time.time() - stored_at)
+                if age < self.ttl:
+                    self.load(field_list, age=age)
+                    logger.info(f"字段索引已从共享缓存加载: {len(self.custom)} 个自定义字段")
+                    return
+
+        field_list = await client.get_json("/field")
+        self.load(field_list)
+        if self.shared is not None:
+            await asyncio.to_thread(
+                self.shared.set, self.NAMESPACE, "all", field_list
+            )
+        logger.info(f"字段索引已刷新: {len(self.custom)} 个自定义字段")
+
+    async def ensure(self, client) -> None:
+        """确保索引可用；过期时在后台刷新."""
+        if not self.loaded:
+            # 首次加载失败后等待一段时间再重试，避免每次调用都请求
+            if time.monotonic() < self._retry_at:
+                return
+            try:
+                await self.refresh(client)
+            except Exception:
+                self._retry_at = time.monotonic() + 60
+                raise
+            return
+        if time.monotonic() - self.loaded_at < self.ttl:
+            return
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._background_refresh(client))
+
+    async def _background_refresh(self, client) -> None:
+        try:
+            await self.refresh(client)
+        except Exception as e:
+            logger.warning(f"刷新字段索引失败: {str(e)}")
+
+    def format_custom_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """把问题中的自定义字段转换为 ``{字段名: 可读值}``."""
+        result = {}
+        custom = self.custom
+        for field_id, value in fields.items():
+            if value is None:
+                continue
+            info = custom.get(field_id)
+            if info is None:
+                # 索引未加载或字段刚创建时，保留原始ID和值
+                if field_id.startswith("customfield_"):
+                    result[field_id] = value
+                continue
+            name = info.name if info.name not in result else f"{info.name} ({field_id})"
+            result[name] = info.convert(value)
+        return result
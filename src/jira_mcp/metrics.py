@@ -0,0 +1,250 @@
+"""进程内指标：计数器、延迟直方图和Prometheus文本格式输出."""
+
+import functools
+import logging
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# 指标名前缀
+PREFIX = "jira_mcp_"
+
+# 默认延迟分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _label_str(labels: Labels) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in labels)
+
+
+def _series(name: str, label_str: str) -> str:
+    return f"{PREFIX}{name}{{{label_str}}}" if label_str else f"{PREFIX}{name}"
+
+
+class Histogram:
+    """固定分桶的直方图."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # 最后一个计数对应 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按分桶上界估算分位数，落在 +Inf 桶时返回最大的有限上界."""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "count": self.count,
+            "avg_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+class MetricsRegistry:
+    """指标注册表.
+
+    计数器和直方图在首次使用时创建；缓存命中率等已有统计通过
+    :meth:`add_collector` 注册的回调在读取时采集为gauge。所有更新都在
+    事件循环线程中进行，不加锁。
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        # 第一次工具调用完成的时间(perf_counter)，用于启动耗时报告
+        self.first_call_at: Optional[float] = None
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        series = self._counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        series = self._histograms.setdefault(name, {})
+        key = _labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """记录代码块的耗时."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]]) -> None:
+        """注册gauge采集回调，回调返回 ``{指标名: 数值}``."""
+        self._collectors.append(collector)
+
+    def _gauges(self) -> Dict[str, float]:
+        gauges: Dict[str, float] = {}
+        for collector in self._collectors:
+            try:
+                gauges.update(collector())
+            except Exception as e:
+                logger.warning(f"采集指标失败: {str(e)}")
+        return gauges
+
+    def snapshot(self) -> Dict[str, Any]:
+        """以字典形式返回所有指标，数值与Prometheus输出一致."""
+        counters = {
+            name: {_label_str(k) or "total": v for k, v in series.items()}
+            for name, series in self._counters.items()
+        }
+        histograms = {
+            name: {_label_str(k) or "total": h.summary() for k, h in series.items()}
+            for name, series in self._histograms.items()
+        }
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "counters": counters,
+            "histograms": histograms,
+            "gauges": self._gauges(),
+        }
+
+    def render_prometheus(self) -> str:
+        """输出Prometheus文本格式."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {PREFIX}{name} {self._help[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for name, series in sorted(self._counters.items()):
+            header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{_series(name, _label_str(labels))} {value}")
+
+        for name, series in sorted(self._histograms.items()):
+            header(name, "histogram")
+            for labels, histogram in series.items():
+                base = _label_str(labels)
+                sep = "," if base else ""
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{PREFIX}{name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}{name}_bucket{{{base}{sep}le="+Inf"}} {histogram.count}')
+                lines.append(f"{_series(name + '_sum', base)} {histogram.sum}")
+                lines.append(f"{_series(name + '_count', base)} {histogram.count}")
+
+        for name, value in sorted(self._gauges().items()):
+            header(name, "gauge")
+            lines.append(f"{PREFIX}{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def process_gauges() -> Dict[str, float]:
+    """当前进程的资源占用."""
+    if resource is None:
+        return {}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # Linux上ru_maxrss单位为KB，macOS上为字节
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "process_peak_rss_bytes": usage.ru_maxrss * scale,
+        "process_cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+    }
+
+
+# 全局注册表
+registry = MetricsRegistry()
+registry.add_collector(process_gauges)
+registry.describe("tool_calls_total", "MCP tool calls by result")
+registry.describe("tool_duration_seconds", "MCP tool latency")
+registry.describe("jira_requests_total", "JIRA HTTP requests by endpoint and status")
+registry.describe("jira_request_duration_seconds", "JIRA HTTP request latency per attempt")
+registry.describe("jira_response_bytes_total", "Bytes received from JIRA")
+registry.describe("stage_duration_seconds", "Latency of local processing stages")
+
+
+def timed(name: str, **labels: Any) -> Callable[[Callable], Callable]:
+    """记录同步函数耗时的装饰器."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start, **labels)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """记录MCP工具的调用次数、耗时和错误.
+
+    工具通常返回 ``{"error": ...}`` 而不是抛出异常，返回值中带有
+    ``error`` 键的调用同样计为失败。
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            if not (isinstance(result, dict) and "error" in result):
+                status = "ok"
+            return result
+        finally:
+            registry.observe(
+                "tool_duration_seconds", time.perf_counter() - start, tool=fn.__name__
+            )
+            registry.inc("tool_calls_total", tool=fn.__name__, status=status)
+            if registry.first_call_at is None:
+                registry.first_call_at = time.perf_counter()
+
+    return wrapper
@@ -0,0 +1,353 @@
+"""选定项目的本地SQLite镜像."""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, tzinfo
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 镜像中保存的字段
+MIRROR_FIELDS = [
+    "summary",
+    "description",
+    "status",
+    "issuetype",
+    "priority",
+    "assignee",
+    "reporter",
+    "project",
+    "labels",
+    "components",
+    "created",
+    "updated",
+]
+
+# 表结构版本，与数据库中的 user_version 不一致时重建镜像
+SCHEMA_VERSION = 2
+
+# id 为显式的整数主键，VACUUM 不会改变，外部内容全文索引以它作为rowid
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    project TEXT NOT NULL,
+    summary TEXT,
+    description TEXT,
+    status TEXT,
+    issue_type TEXT,
+    priority TEXT,
+    assignee TEXT,
+    labels TEXT,
+    updated TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_issues_project ON issues(project, updated);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_sync REAL
+);
+"""
+
+# 全文索引以 issues 为外部内容，由触发器按rowid同步，更新问题时不需要扫描索引
+_FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS issues_fts_insert AFTER INSERT ON issues BEGIN
+    INSERT INTO issues_fts (rowid, summary, description)
+    VALUES (new.id, new.summary, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS issues_fts_delete AFTER DELETE ON issues BEGIN
+    INSERT INTO issues_fts (issues_fts, rowid, summary, description)
+    VALUES ('delete', old.id, old.summary, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS issues_fts_update AFTER UPDATE OF summary, description ON issues BEGIN
+    INSERT INTO issues_fts (issues_fts, rowid, summary, description)
+    VALUES ('delete', old.id, old.summary, old.description);
+    INSERT INTO issues_fts (rowid, summary, description)
+    VALUES (new.id, new.summary, new.description);
+END;
+"""
+
+# 旧版本镜像的表，结构升级时删除后重新完整同步
+_DROP_ALL = """
+DROP TABLE IF EXISTS issues_fts;
+DROP TABLE IF EXISTS issues;
+DROP TABLE IF EXISTS sync_state;
+"""
+
+
+def _name(value: Optional[Dict[str, Any]], key: str = "name") -> Optional[str]:
+    return value.get(key) if isinstance(value, dict) else None
+
+
+def parse_jira_time(value: str) -> datetime:
+    """解析JIRA返回的带时区偏移的时间，如 ``2024-01-02T03:04:05.000+0800``."""
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的JIRA时间 {value}")
+
+
+def jql_timestamp(updated: str, tz: Optional[tzinfo] = None) -> str:
+    """把JIRA时间转换为JQL可用的分钟精度时间.
+
+    JQL中的时间按JIRA用户的时区解释，``tz`` 应为该时区（见
+    :meth:`AsyncJiraClient.user_timezone`）；未指定时沿用原时间的偏移，
+    只有在该偏移与用户时区一致时才准确。
+    """
+    moment = parse_jira_time(updated)
+    if tz is not None:
+        moment = moment.astimezone(tz)
+    # 2024-01-02T03:04:05.000+0800 -> 2024/01/02 03:04
+    return moment.strftime("%Y/%m/%d %H:%M")
+
+
+class IssueMirror:
+    """选定项目问题的本地镜像，支持全文检索和简单过滤.
+
+    同步按 ``updated >= 水位`` 增量拉取，只会新增或更新问题，不会感知
+    JIRA中已删除或移出项目的问题。
+    """
+
+    def __init__(self, db_path: str, projects: List[str]):
+        self.db_path = db_path
+        self.projects = [p.strip().upper() for p in projects if p.strip()]
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.fts_tokenizer: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.projects)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                if version:
+                    logger.info("镜像表结构已升级，将重新完整同步")
+                conn.executescript(_DROP_ALL)
+            conn.executescript(_SCHEMA)
+            # trigram分词支持中文子串检索，旧版本SQLite退回unicode61
+            for tokenizer in ("trigram", "unicode61"):
+                try:
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5("
+                        "summary, description, content='issues', content_rowid='id', "
+                        f"tokenize='{tokenizer}')"
+                    )
+                    conn.executescript(_FTS_TRIGGERS)
+                    self.fts_tokenizer = tokenizer
+                    break
+                except sqlite3.OperationalError:
+                    continue
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def watermark(self, project: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT watermark FROM sync_state WHERE project = ?", (project,)
+            ).fetchone()
+        return row["watermark"] if row else None
+
+    def upsert(self, issues: List[Dict[str, Any]]) -> None:
+        """写入或更新一批原始问题JSON.
+
+        使用 ``ON CONFLICT DO UPDATE`` 而不是 ``INSERT OR REPLACE``：REPLACE
+        删除旧行时不会触发删除触发器，全文索引中会留下旧内容。
+        """
+        rows = []
+        for issue in issues:
+            fields = issue.get("fields") or {}
+            key = issue["key"]
+            rows.append((
+                key,
+                _name(fields.get("project"), "key") or key.split("-")[0],
+                fields.get("summary") or "",
+                fields.get("description") or "",
+                _name(fields.get("status")),
+                _name(fields.get("issuetype")),
+                _name(fields.get("priority")),
+                _name(fields.get("assignee"), "displayName"),
+                " ".join(fields.get("labels") or []),
+                fields.get("updated"),
+                json.dumps(issue, ensure_ascii=False),
+            ))
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO issues (key, project, summary, description, status, "
+                "issue_type, priority, assignee, labels, updated, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET project = excluded.project, "
+                "summary = excluded.summary, description = excluded.description, "
+                "status = excluded.status, issue_type = excluded.issue_type, "
+                "priority = excluded.priority, assignee = excluded.assignee, "
+                "labels = excluded.labels, updated = excluded.updated, data = excluded.data",
+                rows,
+            )
+            self.conn.commit()
+
+    def mark_synced(self, project: str, watermark: Optional[str]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (project, watermark, last_sync) "
+                "VALUES (?, ?, ?)",
+                (project, watermark, time.time()),
+            )
+            self.conn.commit()
+
+    async def sync_project(self, client, project: str, page_size: int = 100) -> int:
+        """增量同步一个项目，返回写入的问题数.
+
+        每一页都从当前水位重新查询，而不是按 ``startAt`` 翻页：同步期间有
+        问题更新时，它会移到结果末尾，按偏移翻页会漏掉随之前移的问题，而
+        这些问题早于新水位，之后的同步也不会再取到。水位只精确到分钟，水位
+        所在分钟内已写入的问题会被跳过。SQLite读写在线程中执行，写入期间
+        不阻塞事件循环。
+        """
+        latest = await asyncio.to_thread(self.watermark, project)
+        tz = await client.user_timezone()
+
+        count = 0
+        # 水位所在分钟内已写入的问题
+        seen: Dict[str, str] = {}
+        start_at = 0
+        while True:
+            jql = f'project = "{project}"'
+            if latest:
+                jql += f' AND updated >= "{latest}"'
+            jql += " ORDER BY updated ASC, key ASC"
+            data = await client.search_issues(
+                jql, start_at=start_at, max_results=page_size, fields=MIRROR_FIELDS
+            )
+            issues = data.get("issues") or []
+            last_page = start_at + len(issues) >= data.get("total", 0)
+            fresh = [
+                issue for issue in issues
+                if seen.get(issue["key"]) != (issue.get("fields") or {}).get("updated")
+            ]
+            if not fresh:
+                # 同一分钟内的问题超过一页时，按偏移跳过已写入的问题
+                if not issues or last_page:
+                    break
+                start_at += len(issues)
+                continue
+
+            await asyncio.to_thread(self.upsert, fresh)
+            count += len(fresh)
+            updated = (fresh[-1].get("fields") or {}).get("updated")
+            if updated and jql_timestamp(updated, tz) != latest:
+                latest = jql_timestamp(updated, tz)
+                seen = {}
+            for issue in fresh:
+                issue_updated = (issue.get("fields") or {}).get("updated")
+                if not issue_updated or jql_timestamp(issue_updated, tz) == latest:
+                    seen[issue["key"]] = issue_updated
+            if last_page:
+                break
+            start_at = 0
+
+        await asyncio.to_thread(self.mark_synced, project, latest)
+        logger.info(f"镜像同步完成: project={project}, 更新 {count} 个问题")
+        return count
+
+    async def sync(self, client) -> Dict[str, Any]:
+        """同步所有配置的项目."""
+        result = {}
+        for project in self.projects:
+            try:
+                result[project] = {"synced": await self.sync_project(client, project)}
+            except Exception as e:
+                logger.error(f"镜像同步项目 {project} 失败: {str(e)}")
+                result[project] = {"error": str(e)}
+        return result
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        project: Optional[str] = None,
+        status: Optional[str] = None,
+        assignee: Optional[str] = None,
+        issue_type: Optional[str] = None,
+        label: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """在镜像中检索问题，返回原始问题JSON列表（按updated倒序）."""
+        clauses = []
+        params: List[Any] = []
+        for column, value in (
+            ("project", project.upper() if project else None),
+            ("status", status),
+            ("assignee", assignee),
+            ("issue_type", issue_type),
+        ):
+            if value:
+                clauses.append(f"i.{column} = ? COLLATE NOCASE")
+                params.append(value)
+        if label:
+            clauses.append("(' ' || i.labels || ' ') LIKE ?")
+            params.append(f"% {label} %")
+
+        if text:
+            terms = text.split()
+            # trigram分词无法匹配少于3个字符的词，改用LIKE
+            min_len = 3 if self.fts_tokenizer == "trigram" else 1
+            fts_terms = [t for t in terms if len(t) >= min_len]
+            for term in terms:
+                if len(term) < min_len:
+                    clauses.append("(i.summary LIKE ? OR i.description LIKE ?)")
+                    params.extend([f"%{term}%", f"%{term}%"])
+            if fts_terms and self.fts_tokenizer:
+                clauses.append(
+                    "i.id IN (SELECT rowid FROM issues_fts WHERE issues_fts MATCH ?)"
+                )
+                params.append(" ".join('"' + t.replace('"', '""') + '"' for t in fts_terms))
+            elif fts_terms:
+                for term in fts_terms:
+                    clauses.append("(i.summary LIKE ? OR i.description LIKE ?)")
+                    params.extend([f"%{term}%", f"%{term}%"])
+
+        sql = "SELECT i.data FROM issues i"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY i.updated DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def status(self) -> Dict[str, Any]:
+        """返回各项目的同步水位和数据陈旧程度."""
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT s.project, s.watermark, s.last_sync, "
+                "(SELECT COUNT(*) FROM issues i WHERE i.project = s.project) AS issues "
+                "FROM sync_state s"
+            ).fetchall()
+        synced = {row["project"]: row for row in rows}
+        result = {}
+        for project in self.projects:
+            row = synced.get(project)
+            result[project] = {
+                "issues": row["issues"] if row else 0,
+                "watermark": row["watermark"] if row else None,
+                "stale_seconds": round(now - row["last_sync"], 1) if row else None,
+            }
+        return result
@@ -0,0 +1,227 @@
+"""JIRA项目目录缓存与名称检索."""
+
+import asyncio
+import bisect
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .shared import SharedCache
+
+logger = logging.getLogger(__name__)
+
+# 请求项目列表时展开的内容，使 get_project 可以直接使用目录中的数据
+PROJECT_EXPAND = ["description", "lead"]
+
+# 模糊匹配的最低相似度（bigram的Jaccard系数）
+FUZZY_THRESHOLD = 0.3
+
+_WORD = re.compile(r"\w+")
+
+
+def _bigrams(text: str) -> Set[str]:
+    text = " ".join(_WORD.findall(text.lower()))
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+@dataclass
+class ProjectInfo:
+    """目录中的项目."""
+    id: str
+    key: str
+    name: str
+    raw: Dict[str, Any]
+
+    @property
+    def detailed(self) -> bool:
+        """是否包含 get_project 需要的展开内容."""
+        return "lead" in self.raw
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "key": self.key,
+            "name": self.name,
+            "lead": (self.raw.get("lead") or {}).get("displayName", ""),
+        }
+
+    def detail(self) -> Dict[str, Any]:
+        return dict(
+            self.summary(),
+            description=self.raw.get("description", ""),
+            url=self.raw.get("self"),
+        )
+
+
+class ProjectCatalog:
+    """缓存所有可见项目，并建立按键和名称检索的内存索引.
+
+    目录过期后继续使用旧数据，同时在后台刷新。检索依次按键的完全匹配、
+    键前缀、名称或名称中单词的前缀、名称子串和名称的bigram相似度排序。
+    配置 ``shared`` 时优先从多进程共享缓存加载。
+    """
+
+    # 共享缓存中的默认命名空间，多租户时每个租户使用独立的命名空间
+    NAMESPACE = "project"
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        shared: Optional[SharedCache] = None,
+        namespace: str = NAMESPACE,
+    ):
+        self.ttl = ttl
+        self.shared = shared
+        self.namespace = namespace
+        self.projects: List[ProjectInfo] = []
+        self.loaded_at = 0.0
+        self._by_key: Dict[str, ProjectInfo] = {}
+        # (小写词, 项目下标)，按词排序后用二分查找做前缀匹配
+        self._prefixes: List[Tuple[str, int]] = []
+        self._bigrams: Dict[str, Set[int]] = {}
+        self._name_bigrams: List[Set[str]] = []
+        self._refreshing: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at > 0
+
+    def load(self, project_list: List[Dict[str, Any]], age: float = 0.0) -> None:
+        """用项目列表重建目录和索引，``age`` 为数据已存在的秒数."""
+        projects = sorted(
+            (
+                ProjectInfo(
+                    id=str(p.get("id")),
+                    key=p.get("key", ""),
+                    name=p.get("name") or p.get("key", ""),
+                    raw=p,
+                )
+                for p in project_list
+                if p.get("key")
+            ),
+            key=lambda p: p.key,
+        )
+        prefixes = []
+        bigrams: Dict[str, Set[int]] = {}
+        name_bigrams = []
+        for index, project in enumerate(projects):
+            for word in {project.key.lower(), *_WORD.findall(project.name.lower())}:
+                prefixes.append((word, index))
+            grams = _bigrams(project.name)
+            name_bigrams.append(grams)
+            for gram in grams:
+                bigrams.setdefault(gram, set()).add(index)
+        prefixes.sort()
+
+        self.projects = projects
+        self._by_key = {p.key.upper(): p for p in projects}
+        self._prefixes = prefixes
+        self._bigrams = bigrams
+        self._name_bigrams = name_bigrams
+        self.loaded_at = time.monotonic() - age
+
+    async def refresh(self, client) -> None:
+        """重新加载项目列表，优先使用共享缓存中未过期的副本."""
+        if self.shared is not None:
+            found = await asyncio.to_thread(self.shared.get, self.namespace, "all")
+            if found is not None:
+                project_list, stored_at = found
+                age = max(0.0, time.time() - stored_at)
+                if age < self.ttl:
+                    self.load(project_list, age=age)
+                    logger.info(f"项目目录已从共享缓存加载: {len(self.projects)} 个项目")
+                    return
+
+        project_list = await client.projects(expand=PROJECT_EXPAND)
+        self.load(project_list)
+        if self.shared is not None:
+            await asyncio.to_thread(
+                self.shared.set, self.namespace, "all", project_list
+            )
+        logger.info(f"项目目录已刷新: {len(self.projects)} 个项目")
+
+    async def ensure(self, client, force: bool = False) -> None:
+        """确保目录可用；过期时在后台刷新，``force`` 时立即重新加载."""
+        if force or not self.loaded:
+            await self.refresh(client)
+            return
+        if time.monotonic() - self.loaded_at < self.ttl:
+            return
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._background_refresh(client))
+
+    async def _background_refresh(self, client) -> None:
+        try:
+            await self.refresh(client)
+        except Exception as e:
+            logger.warning(f"刷新项目目录失败: {str(e)}")
+
+    def get(self, project_key: str) -> Optional[ProjectInfo]:
+        return self._by_key.get(project_key.upper())
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        matches = set()
+        start = bisect.bisect_left(self._prefixes, (prefix,))
+        for word, index in self._prefixes[start:]:
+            if not word.startswith(prefix):
+                break
+            matches.add(index)
+        return matches
+
+    def search(self, query: Optional[str] = None) -> List[ProjectInfo]:
+        """按相关度返回匹配的项目，未指定查询时按键排序返回全部项目."""
+        query = (query or "").strip()
+        if not query:
+            return list(self.projects)
+        lowered = query.lower()
+
+        # 分数越小越靠前
+        scores: Dict[int, float] = {}
+
+        def score(index: int, value: float) -> None:
+            if value < scores.get(index, float("inf")):
+                scores[index] = value
+
+        exact = self._by_key.get(query.upper())
+        words = _WORD.findall(lowered)
+        for index, project in enumerate(self.projects):
+            if project is exact:
+                score(index, 0)
+            elif project.key.lower().startswith(lowered):
+                score(index, 1)
+            elif project.name.lower().startswith(lowered):
+                score(index, 2)
+            elif lowered in project.name.lower():
+                score(index, 4)
+        # 每个查询词都匹配到名称中某个词的前缀
+        if words:
+            matched = self._prefix_matches(words[0])
+            for word in words[1:]:
+                matched &= self._prefix_matches(word)
+            for index in matched:
+                score(index, 3)
+
+        grams = _bigrams(query)
+        if grams:
+            candidates: Set[int] = set()
+            for gram in grams:
+                candidates |= self._bigrams.get(gram, set())
+            for index in candidates - scores.keys():
+                name_grams = self._name_bigrams[index]
+                similarity = len(grams & name_grams) / len(grams | name_grams)
+                if similarity >= FUZZY_THRESHOLD:
+                    score(index, 5 - similarity)
+
+        ranked = sorted(scores, key=lambda i: (scores[i], self.projects[i].key))
+        return [self.projects[i] for i in ranked]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "projects": len(self.projects),
+            "ttl": self.ttl,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded else None,
+        }
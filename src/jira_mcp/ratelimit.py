@@ -0,0 +1,223 @@
+"""JIRA请求调度：令牌桶限速、Retry-After重试和AIMD自适应并发."""
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 需要重试的状态码：限流和服务暂时不可用
+RETRY_STATUS = {429, 503}
+
+ENDPOINT_CLASSES = ("search", "issue", "attachment")
+
+
+def endpoint_class(url: str) -> str:
+    """按URL划分请求类别，不同类别分别做并发控制."""
+    if "/search" in url:
+        return "search"
+    if "/attachment" in url:
+        return "attachment"
+    return "issue"
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After头，支持秒数和HTTP日期两种格式."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """解析X-RateLimit-Reset头（ISO 8601时间），返回距离重置的秒数."""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """令牌桶限速器，rate<=0 表示不限速."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """在服务端要求等待时暂停发放令牌."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveLimiter:
+    """AIMD并发限制：成功时加性增加，被限流时乘性减半."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2)
+
+
+class RequestScheduler:
+    """所有JIRA请求的统一调度入口.
+
+    每个请求先从全局令牌桶取令牌，再占用所属类别的并发槽位。收到429/503时
+    按 ``Retry-After`` 或带抖动的指数退避重试，并把该类别的并发上限减半；
+    ``X-RateLimit-Remaining`` 为0时暂停发放令牌直到 ``X-RateLimit-Reset``。
+    """
+
+    def __init__(
+        self,
+        rate: float = 20.0,
+        burst: int = 40,
+        max_retries: int = 4,
+        initial_concurrency: int = 8,
+        max_concurrency: int = 32,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.limiters = {
+            name: AdaptiveLimiter(initial_concurrency, maximum=max_concurrency)
+            for name in ENDPOINT_CLASSES
+        }
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self.throttled = 0
+
+    def _backoff(self, attempt: int) -> float:
+        """带full jitter的指数退避."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _observe_headers(self, response: httpx.Response) -> None:
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = _parse_reset(response.headers.get("X-RateLimit-Reset"))
+            if reset:
+                self.bucket.pause(reset)
+
+    async def send(
+        self,
+        url: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        idempotent: bool = True,
+    ) -> httpx.Response:
+        """调度并发送一个请求.
+
+        Args:
+            url: 请求URL，用于判断请求类别
+            send: 实际发送请求的协程函数
+            idempotent: 网络错误时是否可以安全重试
+
+        Returns:
+            httpx.Response: 最终响应（重试耗尽时返回最后一次的限流响应）
+        """
+        limiter = self.limiters[endpoint_class(url)]
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                async with limiter.slot():
+                    response = await send()
+            except httpx.TransportError as e:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"JIRA请求网络错误，{delay:.1f}秒后重试: {str(e)}")
+            else:
+                self._observe_headers(response)
+                if response.status_code not in RETRY_STATUS:
+                    limiter.on_success()
+                    return response
+
+                self.throttled += 1
+                limiter.on_throttle()
+                if attempt >= self.max_retries:
+                    return response
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    # 在服务端要求的时间上加少量抖动，避免所有请求同时恢复
+                    delay = retry_after + random.uniform(0, self.backoff_base)
+                    self.bucket.pause(retry_after)
+                else:
+                    delay = self._backoff(attempt)
+                await response.aclose()
+                logger.warning(
+                    f"JIRA返回 {response.status_code}，{delay:.1f}秒后重试 ({attempt + 1}/{self.max_retries})"
+                )
+
+            self.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "concurrency_limits": {
+                name: round(limiter.limit, 2) for name, limiter in self.limiters.items()
+            },
+        }
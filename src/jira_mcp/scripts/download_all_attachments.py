@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """JIRA附件下载工具."""
 import json
+import asyncio
 import argparse
-from src.server import download_all_attachments, get_issue_attachments
+from jira_mcp.server import download_all_attachments, get_issue_attachments
 
 def main():
     """命令行入口函数."""
+    return asyncio.run(_run())
+
+
+async def _run():
+    """异步执行附件列表/下载."""
     parser = argparse.ArgumentParser(description="管理JIRA问题的附件")
     parser.add_argument("issue_key", help="JIRA问题键")
     parser.add_argument("--list-only", "-l", action="store_true", help="仅列出附件，不下载")
@@ -15,7 +21,7 @@ def main():
     
     # 无论是否下载，都需要先获取附件列表
     print(f"获取问题 {args.issue_key} 的附件列表...")
-    result = get_issue_attachments(args.issue_key)
+    result = await get_issue_attachments(args.issue_key)
     
     if "error" in result:
         print(f"错误: {result['error']}")
@@ -43,7 +49,7 @@ def main():
     
     # 否则下载附件
     print(f"正在下载问题 {args.issue_key} 的所有附件...")
-    result = download_all_attachments(args.issue_key)
+    result = await download_all_attachments(args.issue_key)
     
     if "error" in result:
         print(f"错误: {result['error']}")
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 import base64
+import asyncio
 import argparse
 import os
-from src.server import get_attachment_by_filename
+import shutil
+from jira_mcp.server import get_attachment_by_filename
 
 def main():
+    return asyncio.run(_run())
+
+
+async def _run():
     parser = argparse.ArgumentParser(description="提取JIRA问题的附件")
     parser.add_argument("issue_key", help="JIRA问题键")
     parser.add_argument("filename", help="附件文件名")
@@ -14,7 +20,7 @@ def main():
     args = parser.parse_args()
     
     print(f"获取问题 {args.issue_key} 的附件 {args.filename}...")
-    result = get_attachment_by_filename(args.issue_key, args.filename, save_to_disk=not args.no_save)
+    result = await get_attachment_by_filename(args.issue_key, args.filename, save_to_disk=not args.no_save)
     
     if "error" in result:
         print(f"错误: {result['error']}")
@@ -25,9 +31,22 @@ def main():
     
     if args.output:
         # 如果指定了输出文件，再次保存一份
-        content = base64.b64decode(result["content"]) if result["encoding"] == "base64" else result["content"].encode('utf-8')
-        with open(args.output, "wb") as f:
-            f.write(content)
+        if result.get("local_path"):
+            shutil.copyfile(result["local_path"], args.output)
+        else:
+            # 未保存到本地时按分段读取完整内容
+            with open(args.output, "wb") as f:
+                while True:
+                    content = base64.b64decode(result["content"]) if result["encoding"] == "base64" else result["content"].encode('utf-8')
+                    f.write(content)
+                    if result.get("next_offset") is None:
+                        break
+                    result = await get_attachment_by_filename(
+                        args.issue_key, args.filename, save_to_disk=False, offset=result["next_offset"]
+                    )
+                    if "error" in result:
+                        print(f"错误: {result['error']}")
+                        return 1
         print(f"附件已另存为: {args.output}")
     
     print(f"文件类型: {result['content_type']}")
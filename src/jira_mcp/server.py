@@ -1,14 +1,47 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import logging
 import os
 import base64
+import codecs
+import contextvars
+import hashlib
+import mmap
 import pathlib
-from typing import Dict, List, Any, Optional
+import re
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime, tzinfo
+from typing import Dict, List, Any, Optional, Tuple
+
+# 启动耗时以开始导入MCP SDK之前为起点
+_IMPORT_STARTED = time.perf_counter()
 
-from jira import JIRA
 from mcp.server.fastmcp import FastMCP
+# JiraFastMCP.call_tool 沿用 1.9.x 的签名和结果转换函数，依赖中限定 mcp<1.10
+from mcp.server.fastmcp.server import _convert_to_content
+from mcp.types import TextContent
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from .attachments import AttachmentIndex, IssueAttachments
+from .budget import compact_issue, fit_to_budget
+from .cache import IssueCache, RenderedIssueCache
+from .client import AsyncJiraClient
 from .config import get_jira_auth, jira_settings
+from .cursors import Cursor, CursorStore
+from .encoding import BACKEND as JSON_BACKEND, EncodedJSON, dumps as encode_json
+from .fields import DEFAULT_PRESET, FieldIndex, resolve_expand, resolve_fields
+from .metrics import instrument_tool, registry as metrics, timed
+from .mirror import IssueMirror, jql_timestamp
+from .projects import ProjectCatalog
+from .ratelimit import RequestScheduler
+from .shared import SharedCache
+from .tenants import Credentials, Tenant, TenantPool
+from .workers import run_sse_workers
 
 # 配置日志
 logging.basicConfig(
@@ -17,137 +50,724 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 后台任务，跨会话共享
+_background_tasks: Dict[str, asyncio.Task] = {}
+
+
+def start_background_task(name: str, coro_factory) -> None:
+    """启动一个后台任务，已在运行时不重复启动."""
+    task = _background_tasks.get(name)
+    if task is None or task.done():
+        _background_tasks[name] = asyncio.create_task(coro_factory())
+
+
+# 启动各阶段耗时（秒，相对于开始导入）
+startup_timings: Dict[str, float] = {}
+
+
+def _record_startup(name: str) -> None:
+    startup_timings.setdefault(name, round(time.perf_counter() - _IMPORT_STARTED, 3))
+
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP):
+    """MCP会话生命周期：会话建立后启动后台任务."""
+    _record_startup("ready_seconds")
+    # 预热只在进程内执行一次，SSE模式下后续会话不再重复
+    # 要求调用方提供凭据时没有可用于预热的服务器凭据
+    if WARMUP_ENABLED and not REQUIRE_USER_CREDENTIALS and "warmup" not in _background_tasks:
+        start_background_task("warmup", _warm_up)
+    # 多worker模式下只由第一个worker同步镜像
+    if issue_mirror.enabled and worker_index in (None, 0):
+        start_background_task("mirror_sync", _mirror_sync_loop)
+    yield {}
+
+
 # 创建MCP服务器
-mcp = FastMCP("JIRA MCP Server", port=int(os.getenv("MCP_SERVER_PORT", "8000")))
+class JiraFastMCP(FastMCP):
+    """按调用方凭据选择租户，并使用 :mod:`jira_mcp.encoding` 序列化工具结果."""
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        context = self.get_context()
+        try:
+            # 在MCP请求之外直接调用时没有请求上下文
+            request_context = context.request_context
+        except ValueError:
+            request_context = None
+        try:
+            tenant = resolve_tenant(request_context)
+        except ValueError as e:
+            return [TextContent(type="text", text=encode_json({"error": str(e)}))]
+        token = _current_tenant.set(tenant)
+        try:
+            result = await self._tool_manager.call_tool(name, arguments, context=context)
+        finally:
+            _current_tenant.reset(token)
+        if isinstance(result, (dict, list)):
+            with metrics.timer("stage_duration_seconds", stage="encode_json"):
+                text = encode_json(result)
+            return [TextContent(type="text", text=text)]
+        return _convert_to_content(result)
+
 
-# JIRA客户端
+mcp = JiraFastMCP(
+    "JIRA MCP Server",
+    port=int(os.getenv("MCP_SERVER_PORT", "8000")),
+    lifespan=server_lifespan,
+)
+
+# JIRA客户端（使用服务器配置的凭据）
 jira_client = None
+_jira_client_lock = threading.Lock()
+
+# 当前工具调用所属的租户，使用服务器凭据时为None
+_current_tenant: contextvars.ContextVar[Optional[Tenant]] = contextvars.ContextVar(
+    "jira_tenant", default=None
+)
+
+# 会话首次提供的凭据，之后同一会话的请求未带凭据时沿用
+_session_credentials: "weakref.WeakKeyDictionary[Any, Credentials]" = weakref.WeakKeyDictionary()
+
+# 是否要求每个调用方提供自己的JIRA凭据（不使用服务器配置的凭据）
+REQUIRE_USER_CREDENTIALS = os.getenv("JIRA_REQUIRE_USER_CREDENTIALS", "0") == "1"
+
+# 多worker模式下的worker编号，单进程运行时为None
+worker_index: Optional[int] = None
 
-# JIRA附件保存目录
+# JIRA附件保存目录，在首次写入时创建
 ATTACHMENTS_DIR = os.path.expanduser("~/.jira_mcp")
-os.makedirs(ATTACHMENTS_DIR, exist_ok=True)
+
+# 多进程共享缓存层，多worker模式下自动启用
+shared_cache = (
+    SharedCache(
+        os.path.join(ATTACHMENTS_DIR, "shared_cache.db"),
+        max_entries=int(os.getenv("JIRA_SHARED_CACHE_SIZE", "5000")),
+    )
+    if os.getenv("JIRA_SHARED_CACHE", "0") == "1"
+    else None
+)
+
+# 问题缓存
+issue_cache = IssueCache(
+    max_size=int(os.getenv("JIRA_ISSUE_CACHE_SIZE", "500")),
+    ttl=float(os.getenv("JIRA_ISSUE_CACHE_TTL", "60")),
+    shared=shared_cache,
+)
+
+# 格式化并编码后的问题缓存，按问题的 updated 时间戳区分版本
+rendered_cache = RenderedIssueCache(
+    max_size=int(os.getenv("JIRA_RENDERED_CACHE_SIZE", "1000")),
+)
+
+# 自定义字段元数据索引
+field_index = FieldIndex(
+    ttl=float(os.getenv("JIRA_FIELD_INDEX_TTL", "3600")), shared=shared_cache
+)
+
+# 项目目录缓存
+project_catalog = ProjectCatalog(
+    ttl=float(os.getenv("JIRA_PROJECT_CACHE_TTL", "600")), shared=shared_cache
+)
+
+# 多租户：缓存的租户数上限和空闲回收时间（秒）
+TENANT_POOL_SIZE = int(os.getenv("JIRA_TENANT_POOL_SIZE", "200"))
+TENANT_IDLE_TTL = float(os.getenv("JIRA_TENANT_IDLE_TTL", "900"))
+
+# 每个租户的连接池大小和问题缓存条目数
+TENANT_HTTP_POOL_SIZE = int(os.getenv("JIRA_TENANT_HTTP_POOL_SIZE", "8"))
+TENANT_ISSUE_CACHE_SIZE = int(os.getenv("JIRA_TENANT_ISSUE_CACHE_SIZE", "100"))
+
+# 自动分页搜索时并行请求的页数
+SEARCH_CONCURRENCY = int(os.getenv("JIRA_SEARCH_CONCURRENCY", "4"))
+
+# 批量获取问题时每个 key in (...) 请求包含的问题数
+BATCH_CHUNK_SIZE = int(os.getenv("JIRA_BATCH_CHUNK_SIZE", "100"))
+
+# 同时下载的附件数
+ATTACHMENT_CONCURRENCY = int(os.getenv("JIRA_ATTACHMENT_CONCURRENCY", "4"))
+
+# 附件工具单次内联返回的最大字节数
+MAX_INLINE_BYTES = int(os.getenv("JIRA_MAX_INLINE_BYTES", str(1024 * 1024)))
+
+# 批量创建时每个请求包含的问题数（JIRA默认上限为50）
+BULK_CREATE_CHUNK_SIZE = int(os.getenv("JIRA_BULK_CREATE_CHUNK_SIZE", "50"))
+
+# 批量更新时并发执行的请求数
+UPDATE_CONCURRENCY = int(os.getenv("JIRA_UPDATE_CONCURRENCY", "8"))
+
+# 已下载附件的本地索引
+attachment_index = AttachmentIndex(
+    os.path.join(ATTACHMENTS_DIR, "attachments.db"),
+    max_bytes=int(os.getenv("JIRA_ATTACHMENT_CACHE_MAX_BYTES", str(2 * 1024 ** 3))),
+)
 
 
-def get_attachment_path(issue_key: str, filename: str) -> str:
-    """获取附件在本地文件系统中的保存路径."""
+def get_attachment_path(issue_key: str, attachment: Dict[str, Any]) -> str:
+    """获取附件在本地文件系统中的保存路径.
+    
+    文件名以附件ID开头（``<问题键>/<附件ID>_<文件名>``），同一问题中的同名附件
+    不会互相覆盖。
+    """
     # 创建问题专属目录
     issue_dir = os.path.join(ATTACHMENTS_DIR, issue_key)
     os.makedirs(issue_dir, exist_ok=True)
-    return os.path.join(issue_dir, filename)
+    filename = os.path.basename(attachment["filename"])
+    return os.path.join(issue_dir, f"{attachment['id']}_{filename}")
+
+
+# 本地问题镜像，JIRA_MIRROR_PROJECTS 为空时不启用
+issue_mirror = IssueMirror(
+    os.path.join(ATTACHMENTS_DIR, "mirror.db"),
+    os.getenv("JIRA_MIRROR_PROJECTS", "").split(","),
+)
+
+# 增量查询游标，超过该天数未使用的游标会被清理
+cursor_store = CursorStore(
+    os.path.join(ATTACHMENTS_DIR, "cursors.db"),
+    ttl=float(os.getenv("JIRA_CURSOR_TTL_DAYS", "30")) * 86400,
+)
+
+# 问题类工具默认的响应token预算，0表示不限制
+RESPONSE_MAX_TOKENS = int(os.getenv("JIRA_RESPONSE_MAX_TOKENS", "0"))
+
+# 是否在启动后于后台预热客户端（建立连接、校验认证、加载字段索引）
+WARMUP_ENABLED = os.getenv("JIRA_WARMUP", "1") != "0"
+
+# 镜像同步间隔（秒）
+MIRROR_SYNC_INTERVAL = float(os.getenv("JIRA_MIRROR_SYNC_INTERVAL", "300"))
+
+
+async def _mirror_sync_loop() -> None:
+    """定期增量同步本地镜像."""
+    while True:
+        try:
+            await issue_mirror.sync(get_jira_client())
+        except Exception as e:
+            logger.error(f"镜像同步失败: {str(e)}")
+        await asyncio.sleep(MIRROR_SYNC_INTERVAL)
+
 
+def _read_file_range(path: str, offset: int, length: int) -> bytes:
+    """通过内存映射读取本地文件的一段内容."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if length <= 0 or offset >= size:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[offset:offset + length]
 
-def get_jira_client() -> JIRA:
-    """获取JIRA客户端实例."""
+
+@timed("stage_duration_seconds", stage="base64")
+def _encode_base64(content: bytes) -> str:
+    return base64.b64encode(content).decode('utf-8')
+
+
+async def read_attachment_slice(
+    client: AsyncJiraClient,
+    attachment: Dict[str, Any],
+    local_path: Optional[str],
+    offset: int = 0,
+    length: Optional[int] = None,
+) -> Dict[str, Any]:
+    """读取附件的一段内容并编码为JSON友好格式.
+    
+    有本地副本时通过内存映射读取，否则使用HTTP Range请求。单次返回不超过
+    MAX_INLINE_BYTES 字节，超出部分通过 ``next_offset`` 分段读取。
+    """
+    total = os.path.getsize(local_path) if local_path else int(attachment.get("size") or 0)
+    offset = max(0, offset)
+    available = max(0, total - offset)
+    requested = available if length is None else min(max(0, length), available)
+    count = min(requested, MAX_INLINE_BYTES)
+    
+    if local_path:
+        with metrics.timer("stage_duration_seconds", stage="read_local"):
+            content = _read_file_range(local_path, offset, count)
+    else:
+        content = await client.download_range(attachment["content"], offset, count)
+    
+    result: Dict[str, Any] = {}
+    mime_type = attachment.get("mimeType") or "application/octet-stream"
+    if mime_type.startswith("text/"):
+        # 对于文本文件，直接返回文本内容；片段末尾不完整的多字节字符留到下一段
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            text = decoder.decode(content, final=offset + len(content) >= total)
+            pending = len(decoder.getstate()[0])
+            content = content[:len(content) - pending]
+            result["content"] = text
+            result["encoding"] = "text"
+        except UnicodeDecodeError:
+            # 如果解码失败，回退到Base64
+            result["content"] = _encode_base64(content)
+            result["encoding"] = "base64"
+    else:
+        # 对于图片和其他类型，返回Base64编码
+        result["content"] = _encode_base64(content)
+        result["encoding"] = "base64"
+    
+    end = offset + len(content)
+    result.update({
+        "offset": offset,
+        "length": len(content),
+        "total_size": total,
+        "truncated": end < offset + requested,
+        "next_offset": end if end < total else None,
+    })
+    if result["truncated"]:
+        result["message"] = (
+            f"内容超过单次返回上限 {MAX_INLINE_BYTES} 字节，已截断，"
+            f"请使用 offset={end} 和 length 参数继续分段读取"
+        )
+    return result
+
+
+async def ensure_local_attachment(
+    client: AsyncJiraClient, issue_key: str, attachment: Dict[str, Any]
+) -> Tuple[str, bool]:
+    """获取附件的本地副本，本地没有有效副本时才下载.
+    
+    Returns:
+        Tuple[str, bool]: 本地路径，以及是否命中本地缓存
+    """
+    local_path = attachment_index.lookup(attachment)
+    if local_path:
+        return local_path, True
+    
+    file_path = get_attachment_path(issue_key, attachment)
+    digest = hashlib.sha256()
+    size = await client.download_to_file(attachment["content"], file_path, digest=digest)
+    attachment_index.record(issue_key, attachment, file_path, size, digest.hexdigest())
+    return file_path, False
+
+
+def build_jira_client(auth: Tuple[str, str], pool_size: Optional[int] = None) -> AsyncJiraClient:
+    """按环境变量配置创建JIRA客户端，连接池默认与调度器的最大并发数一致."""
+    max_concurrency = int(os.getenv("JIRA_MAX_CONCURRENCY", "32"))
+    scheduler = RequestScheduler(
+        rate=float(os.getenv("JIRA_RATE_LIMIT", "20")),
+        burst=int(os.getenv("JIRA_RATE_BURST", "40")),
+        max_retries=int(os.getenv("JIRA_MAX_RETRIES", "4")),
+        initial_concurrency=int(os.getenv("JIRA_INITIAL_CONCURRENCY", "8")),
+        max_concurrency=max_concurrency,
+    )
+    if pool_size is None:
+        pool_size = int(os.getenv("JIRA_HTTP_POOL_SIZE", str(max_concurrency)))
+    return AsyncJiraClient(
+        jira_settings.server_url,
+        auth,
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        timeout=float(os.getenv("JIRA_READ_TIMEOUT", "30")),
+        scheduler=scheduler,
+        connect_timeout=float(os.getenv("JIRA_CONNECT_TIMEOUT", "10")),
+        keepalive_expiry=float(os.getenv("JIRA_KEEPALIVE_EXPIRY", "60")),
+        http2=os.getenv("JIRA_HTTP2", "0") == "1",
+    )
+
+
+def _create_tenant(credentials: Credentials) -> Tenant:
+    """为一组调用方凭据创建独立的客户端和缓存."""
+    if not jira_settings.server_url:
+        raise ValueError("未设置 JIRA_SERVER_URL")
+    tenant_id = credentials.tenant_id
+    return Tenant(
+        tenant_id=tenant_id,
+        client=build_jira_client(
+            (credentials.username, credentials.secret), pool_size=TENANT_HTTP_POOL_SIZE
+        ),
+        issue_cache=IssueCache(
+            max_size=TENANT_ISSUE_CACHE_SIZE,
+            ttl=issue_cache.ttl,
+            shared=shared_cache,
+            namespace=f"{IssueCache.NAMESPACE}:{tenant_id}",
+        ),
+        project_catalog=ProjectCatalog(
+            ttl=project_catalog.ttl,
+            shared=shared_cache,
+            namespace=f"{ProjectCatalog.NAMESPACE}:{tenant_id}",
+        ),
+    )
+
+
+# 按调用方凭据缓存的租户
+tenant_pool = TenantPool(_create_tenant, max_tenants=TENANT_POOL_SIZE, idle_ttl=TENANT_IDLE_TTL)
+
+
+def resolve_tenant(request_context: Optional[Any]) -> Optional[Tenant]:
+    """根据请求头中的凭据确定工具调用所属的租户.
+    
+    凭据通过 ``X-Jira-Username`` 和 ``X-Jira-Token`` 请求头传入，会话中首次
+    提供的凭据会被记住。stdio模式、在MCP请求之外直接调用或未提供凭据时
+    返回None，使用服务器配置的凭据。设置了 ``JIRA_REQUIRE_USER_CREDENTIALS=1``
+    时每个请求都必须带凭据，不沿用会话中记住的凭据，未带凭据时抛出ValueError。
+    """
+    credentials = None
+    if request_context is not None:
+        headers = getattr(request_context.request, "headers", None)
+        credentials = Credentials.from_headers(headers)
+        session = request_context.session
+        if credentials is not None:
+            _session_credentials[session] = credentials
+        elif not REQUIRE_USER_CREDENTIALS:
+            credentials = _session_credentials.get(session)
+    if credentials is None:
+        if REQUIRE_USER_CREDENTIALS:
+            raise ValueError("请通过 X-Jira-Username 和 X-Jira-Token 请求头提供JIRA凭据")
+        return None
+    return tenant_pool.get(credentials)
+
+
+def get_jira_client() -> AsyncJiraClient:
+    """获取当前调用方的JIRA客户端.
+    
+    带有调用方凭据的工具调用使用该租户的客户端；否则使用服务器凭据的
+    客户端。后者在首次调用时创建，创建过程加锁，多个线程同时首次调用时
+    也只会创建一个客户端。
+    """
+    tenant = _current_tenant.get()
+    if tenant is not None:
+        return tenant.client
     global jira_client
-    if jira_client is None:
-        auth = get_jira_auth()
-        jira_client = JIRA(server=jira_settings.server_url, basic_auth=auth)
+    if jira_client is not None:
+        return jira_client
+    with _jira_client_lock:
+        if jira_client is None:
+            jira_client = build_jira_client(get_jira_auth())
     return jira_client
 
 
-def format_issue(issue) -> Dict[str, Any]:
+def get_issue_cache() -> IssueCache:
+    """获取当前调用方的问题缓存."""
+    tenant = _current_tenant.get()
+    return tenant.issue_cache if tenant is not None else issue_cache
+
+
+def get_project_catalog() -> ProjectCatalog:
+    """获取当前调用方的项目目录."""
+    tenant = _current_tenant.get()
+    return tenant.project_catalog if tenant is not None else project_catalog
+
+
+def current_owner() -> str:
+    """当前调用方的租户标识，使用服务器凭据时为空字符串."""
+    tenant = _current_tenant.get()
+    return tenant.tenant_id if tenant is not None else ""
+
+
+async def _warm_up() -> None:
+    """后台预热：创建客户端，请求serverInfo建立连接并校验认证，加载字段索引.
+    
+    预热与MCP握手并行进行，第一次工具调用不再承担这些开销；预热失败不影响
+    服务，相应工作会在首次调用时照常进行。
+    """
+    try:
+        client = get_jira_client()
+        info = await client.get_json("/serverInfo")
+        _record_startup("server_info_seconds")
+        await ensure_field_index(client)
+        _record_startup("warmup_seconds")
+        logger.info(f"预热完成: JIRA {info.get('version', '')}, 启动耗时 {startup_report()}")
+    except Exception as e:
+        logger.warning(f"预热失败，将在首次调用时重试: {str(e)}")
+
+
+def startup_report() -> Dict[str, float]:
+    """返回启动耗时报告，包括第一次工具调用完成的时间."""
+    report = dict(startup_timings)
+    if metrics.first_call_at is not None:
+        report["first_response_seconds"] = round(metrics.first_call_at - _IMPORT_STARTED, 3)
+    return report
+
+
+async def ensure_field_index(client: AsyncJiraClient) -> None:
+    """加载或刷新字段索引，失败时退回原始自定义字段输出."""
+    try:
+        await field_index.ensure(client)
+    except Exception as e:
+        logger.warning(f"加载字段索引失败: {str(e)}")
+
+
+async def fetch_issue(
+    client: AsyncJiraClient,
+    issue_key: str,
+    fields: Optional[List[str]] = None,
+    expand: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """通过问题缓存获取问题的原始JSON.
+
+    缓存过期后只请求 ``updated`` 字段做校验，时间戳未变化则继续使用缓存。
+    """
+    cache = get_issue_cache()
+    fields = fields or resolve_fields(DEFAULT_PRESET)
+    key = cache.make_key(issue_key, fields, expand)
+    entry = await cache.get(key)
+    if entry is not None:
+        if cache.is_fresh(entry):
+            cache.hits += 1
+            return entry.issue
+        if entry.updated:
+            latest = await client.issue(issue_key, fields=["updated"])
+            if (latest.get("fields") or {}).get("updated") == entry.updated:
+                cache.hits += 1
+                await cache.touch(key)
+                return entry.issue
+    
+    cache.misses += 1
+    issue = await client.issue(issue_key, fields=fields, expand=expand)
+    await cache.put(key, issue)
+    return issue
+
+
+# 附件元数据请求只需要的字段
+ATTACHMENT_FIELDS = ["attachment", "updated"]
+
+
+async def get_issue_attachments_meta(
+    client: AsyncJiraClient, issue_key: str, refresh: bool = False
+) -> IssueAttachments:
+    """获取问题的附件元数据索引.
+    
+    只请求 ``attachment`` 和 ``updated`` 字段，并通过问题缓存按 ``updated``
+    时间戳校验，缓存有效时不发送请求。
+    """
+    if refresh:
+        cache = get_issue_cache()
+        await cache.discard(cache.make_key(issue_key, ATTACHMENT_FIELDS))
+    issue = await fetch_issue(client, issue_key, fields=ATTACHMENT_FIELDS)
+    return IssueAttachments(issue)
+
+
+async def find_attachment(
+    client: AsyncJiraClient,
+    issue_key: str,
+    attachment_id: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> Tuple[IssueAttachments, Optional[Dict[str, Any]]]:
+    """按附件ID或文件名查找附件元数据，缓存中找不到时强制刷新一次."""
+    meta = await get_issue_attachments_meta(client, issue_key)
+    attachment = meta.find(attachment_id=attachment_id, filename=filename)
+    if attachment is None:
+        # 缓存有效期内可能有新上传的附件
+        meta = await get_issue_attachments_meta(client, issue_key, refresh=True)
+        attachment = meta.find(attachment_id=attachment_id, filename=filename)
+    return meta, attachment
+
+
+def build_issue_fields(
+    project_key: Optional[str] = None,
+    summary: Optional[str] = None,
+    description: Optional[str] = None,
+    issue_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee: Optional[str] = None,
+    labels: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """构建创建/更新问题时提交的字段，只包含提供了值的字段."""
+    fields: Dict[str, Any] = {}
+    
+    if project_key:
+        fields["project"] = {"key": project_key}
+    
+    if summary:
+        fields["summary"] = summary
+        
+    if description:
+        fields["description"] = description
+        
+    if issue_type:
+        fields["issuetype"] = {"name": issue_type}
+        
+    if priority:
+        fields["priority"] = {"name": priority}
+        
+    if assignee:
+        fields["assignee"] = {"name": assignee}
+        
+    if labels:
+        fields["labels"] = labels
+    
+    return fields
+
+
+def _format_user(user: Dict[str, Any]) -> Dict[str, Any]:
+    """格式化用户字段."""
+    return {
+        "name": user.get("name"),
+        "display_name": user.get("displayName"),
+        "email": user.get("emailAddress", ""),
+    }
+
+
+def _format_attachment(attachment: Dict[str, Any]) -> Dict[str, Any]:
+    """格式化附件元数据."""
+    return {
+        "id": attachment.get("id"),
+        "filename": attachment.get("filename"),
+        "size": attachment.get("size"),
+        "content_type": attachment.get("mimeType"),
+        "created": attachment.get("created"),
+        "url": attachment.get("content"),
+    }
+
+
+@timed("stage_duration_seconds", stage="format_issue")
+def format_issue(issue: Dict[str, Any]) -> Dict[str, Any]:
     """格式化JIRA问题为JSON友好格式."""
-    fields = issue.fields
+    fields = issue.get("fields") or {}
     
     result = {
-        "id": issue.id,
-        "key": issue.key,
-        "self": issue.self,
-        "summary": fields.summary,
-        "description": fields.description or "",
-        "status": {
-            "id": fields.status.id,
-            "name": fields.status.name,
-            "description": fields.status.description,
-        },
-        "project": {
-            "id": fields.project.id,
-            "key": fields.project.key,
-            "name": fields.project.name,
-        },
-        "created": fields.created,
-        "updated": fields.updated,
+        "id": issue.get("id"),
+        "key": issue.get("key"),
+        "self": issue.get("self"),
     }
     
-    # 添加可选字段
-    if hasattr(fields, "assignee") and fields.assignee:
-        result["assignee"] = {
-            "name": fields.assignee.name,
-            "display_name": fields.assignee.displayName,
-            "email": getattr(fields.assignee, "emailAddress", ""),
+    # 基础字段：字段投影时只输出请求到的字段
+    if "summary" in fields:
+        result["summary"] = fields["summary"]
+    
+    if "description" in fields:
+        result["description"] = fields["description"] or ""
+    
+    if "status" in fields:
+        status = fields["status"] or {}
+        result["status"] = {
+            "id": status.get("id"),
+            "name": status.get("name"),
+            "description": status.get("description"),
         }
     
-    if hasattr(fields, "reporter") and fields.reporter:
-        result["reporter"] = {
-            "name": fields.reporter.name,
-            "display_name": fields.reporter.displayName,
-            "email": getattr(fields.reporter, "emailAddress", ""),
+    if "project" in fields:
+        project = fields["project"] or {}
+        result["project"] = {
+            "id": project.get("id"),
+            "key": project.get("key"),
+            "name": project.get("name"),
         }
     
-    if hasattr(fields, "issuetype") and fields.issuetype:
+    for field_name in ("created", "updated"):
+        if field_name in fields:
+            result[field_name] = fields[field_name]
+    
+    # 添加可选字段
+    if fields.get("assignee"):
+        result["assignee"] = _format_user(fields["assignee"])
+    
+    if fields.get("reporter"):
+        result["reporter"] = _format_user(fields["reporter"])
+    
+    if fields.get("issuetype"):
         result["issue_type"] = {
-            "id": fields.issuetype.id,
-            "name": fields.issuetype.name,
-            "description": fields.issuetype.description,
+            "id": fields["issuetype"].get("id"),
+            "name": fields["issuetype"].get("name"),
+            "description": fields["issuetype"].get("description"),
         }
     
-    if hasattr(fields, "priority") and fields.priority:
+    if fields.get("priority"):
         result["priority"] = {
-            "id": fields.priority.id,
-            "name": fields.priority.name,
+            "id": fields["priority"].get("id"),
+            "name": fields["priority"].get("name"),
         }
     
-    if hasattr(fields, "components") and fields.components:
+    if fields.get("components"):
         result["components"] = [
-            {"id": c.id, "name": c.name} for c in fields.components
+            {"id": c.get("id"), "name": c.get("name")} for c in fields["components"]
         ]
     
-    if hasattr(fields, "labels") and fields.labels:
-        result["labels"] = fields.labels
+    if fields.get("labels"):
+        result["labels"] = fields["labels"]
     
     # 处理附件 - JIRA API 使用 "attachment" 字段
-    if hasattr(fields, "attachment") and fields.attachment:
+    if fields.get("attachment"):
         result["attachments"] = [
-            {
-                "id": attachment.id,
-                "filename": attachment.filename,
-                "size": attachment.size,
-                "content_type": attachment.mimeType,
-                "created": attachment.created,
-                "url": attachment.content
-            }
-            for attachment in fields.attachment
+            _format_attachment(attachment) for attachment in fields["attachment"]
         ]
     
-    # 获取自定义字段
-    for field_name in dir(fields):
-        if field_name.startswith("customfield_"):
-            value = getattr(fields, field_name)
-            if value is not None:
-                result[field_name] = value
+    # 自定义字段：通过字段索引转换为可读名称和值
+    custom_fields = field_index.format_custom_fields(fields)
+    if custom_fields:
+        result["custom_fields"] = custom_fields
     
     return result
 
 
+def render_issue(
+    issue: Dict[str, Any],
+    fields: Optional[List[str]] = None,
+    expand: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """格式化问题，同一版本的问题复用上次格式化和编码的结果.
+
+    Args:
+        issue: 问题的原始JSON
+        fields: 请求该问题时使用的字段列表
+        expand: 请求该问题时使用的expand参数
+    """
+    key = rendered_cache.make_key(
+        issue,
+        fields or resolve_fields(DEFAULT_PRESET),
+        expand,
+        field_index.loaded_at,
+        owner=current_owner(),
+    )
+    if key is not None:
+        rendered = rendered_cache.get(key)
+        if rendered is not None:
+            return rendered
+    rendered = EncodedJSON(format_issue(issue))
+    if key is not None:
+        rendered_cache.put(key, rendered)
+    return rendered
+
+
+def shape_issues(
+    issues: List[Dict[str, Any]], compact: bool, max_tokens: Optional[int]
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """按精简模式和token预算处理格式化后的问题，返回问题列表和裁剪报告."""
+    if compact:
+        issues = [compact_issue(issue) for issue in issues]
+    budget = RESPONSE_MAX_TOKENS if max_tokens is None else max_tokens
+    if budget > 0:
+        return fit_to_budget(issues, budget)
+    return issues, None
+
+
 @mcp.tool(
     description="获取JIRA问题详情",
 )
-def get_issue(
+@instrument_tool
+async def get_issue(
     issue_key: str,
+    fields: str = DEFAULT_PRESET,
+    expand: Optional[str] = None,
+    compact: bool = False,
+    max_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
     """获取JIRA问题详情.
     
     Args:
         issue_key: JIRA问题键
+        fields: 字段预设(minimal/triage/full)或逗号分隔的字段ID
+        expand: 逗号分隔的expand参数，如 renderedFields,changelog
+        compact: 精简模式，用户、状态等嵌套对象只返回名称
+        max_tokens: 响应token预算，超出时截断长文本并去掉次要字段，0表示不限制
     
     Returns:
-        Dict[str, Any]: 问题详情
+        Dict[str, Any]: 问题详情，发生裁剪时在 ``truncation`` 中说明
     """
-    logger.info(f"获取问题: {issue_key}")
+    logger.info(f"获取问题: {issue_key}, fields={fields}")
     try:
         client = get_jira_client()
-        issue = client.issue(issue_key)
-        return format_issue(issue)
+        field_list = resolve_fields(fields)
+        expand_list = resolve_expand(expand)
+        issue = await fetch_issue(client, issue_key, fields=field_list, expand=expand_list)
+        await ensure_field_index(client)
+        (result,), truncation = shape_issues(
+            [render_issue(issue, field_list, expand_list)], compact, max_tokens
+        )
+        if truncation:
+            result["truncation"] = truncation
+        return result
     except Exception as e:
         logger.error(f"获取问题 {issue_key} 失败: {str(e)}")
         return {"error": str(e)}
@@ -156,15 +776,20 @@ def get_issue(
 @mcp.tool(
     description="获取JIRA问题附件",
 )
-def get_issue_attachment(
+@instrument_tool
+async def get_issue_attachment(
     issue_key: str,
     attachment_id: str,
+    offset: int = 0,
+    length: Optional[int] = None,
 ) -> Dict[str, Any]:
     """获取JIRA问题附件内容.
     
     Args:
         issue_key: JIRA问题键
         attachment_id: 附件ID
+        offset: 读取的起始字节偏移
+        length: 读取的字节数，默认读取到文件末尾（受单次返回上限限制）
     
     Returns:
         Dict[str, Any]: 附件内容
@@ -172,59 +797,31 @@ def get_issue_attachment(
     logger.info(f"获取问题附件: issue={issue_key}, attachment_id={attachment_id}")
     try:
         client = get_jira_client()
-        issue = client.issue(issue_key)
         
         # 查找指定ID的附件
-        attachment = None
-        
-        # 检查attachments字段
-        attachments = []
-        if hasattr(issue.fields, "attachments") and issue.fields.attachments:
-            attachments = issue.fields.attachments
-        elif hasattr(issue.fields, "attachment") and issue.fields.attachment:
-            attachments = issue.fields.attachment
-            
-        for att in attachments:
-            if att.id == attachment_id:
-                attachment = att
-                break
+        _, attachment = await find_attachment(client, issue_key, attachment_id=attachment_id)
         
         if not attachment:
             return {"error": f"未找到ID为 {attachment_id} 的附件"}
         
-        # 获取附件内容
-        content = attachment.get()
+        # 优先使用本地缓存
+        local_path = attachment_index.lookup(attachment)
         
-        # 确定返回类型：对于图片类型，返回Base64编码；对于文本类型，返回文本内容
-        mime_type = attachment.mimeType
-        filename = attachment.filename
+        mime_type = attachment.get("mimeType", "application/octet-stream")
+        filename = attachment.get("filename")
         
         result = {
-            "id": attachment.id,
+            "id": attachment.get("id"),
             "filename": filename,
-            "size": attachment.size,
+            "size": attachment.get("size"),
             "content_type": mime_type,
-            "created": attachment.created,
+            "created": attachment.get("created"),
         }
         
-        # 处理不同的内容类型
-        if mime_type.startswith("image/"):
-            # 对于图片，返回Base64编码
-            result["content"] = base64.b64encode(content).decode('utf-8')
-            result["encoding"] = "base64"
-        elif mime_type.startswith("text/"):
-            # 对于文本文件，直接返回文本内容
-            try:
-                result["content"] = content.decode('utf-8')
-                result["encoding"] = "text"
-            except UnicodeDecodeError:
-                # 如果解码失败，回退到Base64
-                result["content"] = base64.b64encode(content).decode('utf-8')
-                result["encoding"] = "base64"
-        else:
-            # 对于其他类型，返回Base64编码
-            result["content"] = base64.b64encode(content).decode('utf-8')
-            result["encoding"] = "base64"
+        # 读取请求的内容片段并按内容类型编码
+        result.update(
+            await read_attachment_slice(client, attachment, local_path, offset, length)
+        )
         
         return result
     except Exception as e:
@@ -235,10 +832,15 @@ def get_issue_attachment(
 @mcp.tool(
     description="搜索JIRA问题列表",
 )
-def search_issues(
+@instrument_tool
+async def search_issues(
     jql: str,
     max_results: int = 50,
-    start_at: int = 0
+    start_at: int = 0,
+    fields: str = DEFAULT_PRESET,
+    expand: Optional[str] = None,
+    compact: bool = False,
+    max_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
     """搜索JIRA问题.
     
@@ -246,30 +848,383 @@ def search_issues(
         jql: JQL查询字符串
         max_results: 最大返回结果数
         start_at: 起始索引
+        fields: 字段预设(minimal/triage/full)或逗号分隔的字段ID
+        expand: 逗号分隔的expand参数
+        compact: 精简模式，用户、状态等嵌套对象只返回名称
+        max_tokens: 响应token预算，超出时依次截断长文本、去掉次要字段、
+            丢弃末尾的问题，0表示不限制
     
     Returns:
-        Dict[str, Any]: 搜索结果
+        Dict[str, Any]: 搜索结果，发生裁剪时在 ``truncation`` 中说明
     """
-    logger.info(f"搜索问题: JQL={jql}, max_results={max_results}, start_at={start_at}")
+    logger.info(f"搜索问题: JQL={jql}, max_results={max_results}, start_at={start_at}, fields={fields}")
     try:
         client = get_jira_client()
-        issues = client.search_issues(jql_str=jql, maxResults=max_results, startAt=start_at)
+        field_list = resolve_fields(fields)
+        expand_list = resolve_expand(expand)
+        data = await client.search_issues(
+            jql,
+            start_at=start_at,
+            max_results=max_results,
+            fields=field_list,
+            expand=expand_list,
+        )
+        await ensure_field_index(client)
         
-        return {
-            "total": issues.total,
-            "issues": [format_issue(issue) for issue in issues],
+        issues, truncation = shape_issues(
+            [render_issue(issue, field_list, expand_list) for issue in data.get("issues", [])],
+            compact,
+            max_tokens,
+        )
+        result = {
+            "total": data.get("total", 0),
+            "issues": issues,
             "start_at": start_at,
             "max_results": max_results,
         }
+        if truncation:
+            if truncation.get("omitted_issues"):
+                truncation["next_start_at"] = start_at + len(issues)
+            result["truncation"] = truncation
+        return result
     except Exception as e:
         logger.error(f"搜索问题失败: {str(e)}")
         return {"error": str(e)}
 
 
+@mcp.tool(
+    description="搜索JIRA问题并自动分页获取全部结果",
+)
+@instrument_tool
+async def search_all_issues(
+    jql: str,
+    max_total: int = 1000,
+    page_size: int = 100,
+    fields: str = DEFAULT_PRESET,
+    expand: Optional[str] = None,
+) -> Dict[str, Any]:
+    """搜索JIRA问题并自动获取所有分页.
+    
+    第一页返回 ``total`` 后，剩余分页并行请求，每页到达后立即格式化，
+    不会同时持有所有原始问题数据。
+    
+    Args:
+        jql: JQL查询字符串
+        max_total: 最多返回的问题数
+        page_size: 每页请求的问题数
+        fields: 字段预设(minimal/triage/full)或逗号分隔的字段ID
+        expand: 逗号分隔的expand参数
+    
+    Returns:
+        Dict[str, Any]: 搜索结果
+    """
+    logger.info(f"自动分页搜索: JQL={jql}, max_total={max_total}, page_size={page_size}")
+    try:
+        client = get_jira_client()
+        field_list = resolve_fields(fields)
+        expand_list = resolve_expand(expand)
+        
+        first = await client.search_issues(
+            jql,
+            start_at=0,
+            max_results=min(page_size, max_total),
+            fields=field_list,
+            expand=expand_list,
+        )
+        await ensure_field_index(client)
+        total = first.get("total", 0)
+        limit = min(total, max_total)
+        # 服务端可能会限制每页大小，以实际返回的maxResults为准
+        step = first.get("maxResults") or page_size
+        pages = {
+            0: [render_issue(issue, field_list, expand_list) for issue in first.get("issues", [])]
+        }
+        del first
+        
+        semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+        
+        async def fetch_page(start_at: int):
+            async with semaphore:
+                data = await client.search_issues(
+                    jql,
+                    start_at=start_at,
+                    max_results=min(step, limit - start_at),
+                    fields=field_list,
+                    expand=expand_list,
+                )
+            pages[start_at] = [
+                render_issue(issue, field_list, expand_list) for issue in data.get("issues", [])
+            ]
+        
+        tasks = [
+            asyncio.ensure_future(fetch_page(start_at))
+            for start_at in range(step, limit, step)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        issues = [issue for start_at in sorted(pages) for issue in pages[start_at]]
+        return {
+            "total": total,
+            "returned": len(issues),
+            "truncated": len(issues) < total,
+            "pages": len(pages),
+            "issues": issues,
+        }
+    except Exception as e:
+        logger.error(f"自动分页搜索失败: {str(e)}")
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    description="批量获取多个JIRA问题",
+)
+@instrument_tool
+async def get_issues(
+    issue_keys: List[str],
+    fields: str = DEFAULT_PRESET,
+) -> Dict[str, Any]:
+    """批量获取多个JIRA问题.
+    
+    问题键按 ``key in (...)`` 分组搜索，各组并发请求，结果按输入顺序返回。
+    
+    Args:
+        issue_keys: JIRA问题键列表
+        fields: 字段预设(minimal/triage/full)或逗号分隔的字段ID
+    
+    Returns:
+        Dict[str, Any]: 问题列表及未找到（不存在或无权限）的问题键
+    """
+    logger.info(f"批量获取问题: {len(issue_keys)} 个, fields={fields}")
+    try:
+        client = get_jira_client()
+        cache = get_issue_cache()
+        field_list = resolve_fields(fields)
+        
+        # 去重并保持输入顺序
+        keys = list(dict.fromkeys(k.strip().upper() for k in issue_keys if k.strip()))
+        
+        # 优先使用缓存中的有效条目
+        found: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        cache_keys = {key: cache.make_key(key, field_list) for key in keys}
+        entries = await cache.get_many(list(cache_keys.values()))
+        for key in keys:
+            entry = entries.get(cache_keys[key])
+            if entry is not None and cache.is_fresh(entry):
+                cache.hits += 1
+                found[key] = entry.issue
+            else:
+                pending.append(key)
+        
+        semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+        
+        async def fetch_chunk(chunk: List[str]):
+            jql = "key in ({})".format(", ".join(f'"{k}"' for k in chunk))
+            # 服务端可能限制每页大小（如Cloud在返回全部字段时），按total继续分页
+            start_at = 0
+            while True:
+                async with semaphore:
+                    data = await client.search_issues(
+                        jql,
+                        start_at=start_at,
+                        max_results=len(chunk) - start_at,
+                        fields=field_list,
+                        validate_query=False,
+                    )
+                issues = data.get("issues") or []
+                for issue in issues:
+                    cache.misses += 1
+                    found[issue["key"].upper()] = issue
+                await cache.put_many([
+                    (cache.make_key(issue["key"], field_list), issue) for issue in issues
+                ])
+                start_at += len(issues)
+                if not issues or start_at >= min(data.get("total", 0), len(chunk)):
+                    break
+        
+        await asyncio.gather(*[
+            fetch_chunk(pending[i:i + BATCH_CHUNK_SIZE])
+            for i in range(0, len(pending), BATCH_CHUNK_SIZE)
+        ])
+        await ensure_field_index(client)
+        
+        return {
+            "issues": [render_issue(found[key], field_list) for key in keys if key in found],
+            "missing": [key for key in keys if key not in found],
+            "total": len(keys),
+        }
+    except Exception as e:
+        logger.error(f"批量获取问题失败: {str(e)}")
+        return {"error": str(e)}
+
+
+# JQL末尾的排序子句，增量查询使用自己的排序
+_ORDER_BY = re.compile(r"(?:^|\s+)ORDER\s+BY\s+.*$", re.IGNORECASE | re.DOTALL)
+
+
+def _parse_since(since: str) -> str:
+    """把 ``YYYY-MM-DD [HH:MM]`` 转换为JQL的分钟精度时间."""
+    for fmt in ("%Y-%m-%d %H:%M", "%Y/%m/%d %H:%M", "%Y-%m-%d", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(since.strip(), fmt).strftime("%Y/%m/%d %H:%M")
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的时间 {since}，请使用 YYYY-MM-DD 或 YYYY-MM-DD HH:MM")
+
+
+def _changelog_since(
+    issue: Dict[str, Any], watermark: Optional[str], tz: Optional[tzinfo] = None
+) -> List[Dict[str, Any]]:
+    """返回问题changelog中水位之后的字段变更.
+    
+    水位只精确到分钟，水位所在分钟内的变更可能在上一次查询中已经返回过。
+    """
+    changes = []
+    for history in (issue.get("changelog") or {}).get("histories") or []:
+        created = history.get("created") or ""
+        if watermark and created and jql_timestamp(created, tz) < watermark:
+            continue
+        author = (history.get("author") or {}).get("displayName")
+        for item in history.get("items") or []:
+            changes.append({
+                "field": item.get("field"),
+                "from": item.get("fromString"),
+                "to": item.get("toString"),
+                "author": author,
+                "created": created,
+            })
+    return changes
+
+
+@mcp.tool(
+    description="增量查询：返回游标之后有更新的JIRA问题，并返回新的游标",
+)
+@instrument_tool
+async def get_changes_since(
+    jql: str,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    max_results: int = 100,
+    fields: str = DEFAULT_PRESET,
+    expand: Optional[str] = None,
+) -> Dict[str, Any]:
+    """返回查询范围内自上次查询以来有更新的问题.
+    
+    首次调用不带 ``cursor``，从 ``since`` 指定的时间（未指定时从最早的问题）
+    开始按更新时间返回；之后每次传入上次返回的 ``cursor``，只会得到这之后
+    更新过的问题。游标保存在 ``~/.jira_mcp/cursors.db`` 中，服务器重启后
+    仍然有效；没有新变化时返回原游标。
+    
+    Args:
+        jql: 查询范围，如 ``project = ERP``，其中的 ORDER BY 子句会被忽略
+        cursor: 上次调用返回的游标
+        since: 首次调用时的起始时间，格式 YYYY-MM-DD 或 YYYY-MM-DD HH:MM
+        max_results: 本次最多返回的问题数，超出时 ``has_more`` 为true，
+            用新游标继续获取
+        fields: 字段预设(minimal/triage/full)或逗号分隔的字段ID
+        expand: 逗号分隔的expand参数，包含 changelog 时在每个问题的
+            ``changes`` 中返回游标之后的字段变更
+    
+    Returns:
+        Dict[str, Any]: 有更新的问题、新游标和是否还有更多结果
+    """
+    logger.info(f"增量查询: JQL={jql}, cursor={cursor}, since={since}")
+    try:
+        scope = " ".join(_ORDER_BY.sub("", jql).split())
+        owner = current_owner()
+        if cursor:
+            state = cursor_store.get(cursor)
+            if state is None:
+                return {"error": "游标不存在或已过期"}
+            if state.scope != scope or state.owner != owner:
+                return {"error": "游标与查询范围不匹配"}
+        else:
+            state = Cursor(scope=scope, owner=owner, watermark=_parse_since(since) if since else None)
+        
+        client = get_jira_client()
+        # 水位按JIRA用户的时区计算，与JQL解释时间的方式一致
+        tz = await client.user_timezone()
+        field_list = resolve_fields(fields)
+        if "*all" not in field_list and "updated" not in field_list:
+            field_list = field_list + ["updated"]
+        expand_list = resolve_expand(expand)
+        
+        clauses = [f"({scope})"] if scope else []
+        if state.watermark:
+            clauses.append(f'updated >= "{state.watermark}"')
+        query = " ".join(filter(None, [" AND ".join(clauses), "ORDER BY updated ASC, key ASC"]))
+        
+        # 按更新时间顺序分页，跳过水位所在分钟内已返回过的问题
+        changed: List[Dict[str, Any]] = []
+        has_more = False
+        start_at = 0
+        while True:
+            data = await client.search_issues(
+                query,
+                start_at=start_at,
+                max_results=min(max_results, 100),
+                fields=field_list,
+                expand=expand_list,
+            )
+            issues = data.get("issues") or []
+            for issue in issues:
+                if state.seen.get(issue["key"]) == (issue.get("fields") or {}).get("updated"):
+                    continue
+                if len(changed) >= max_results:
+                    has_more = True
+                    break
+                changed.append(issue)
+            start_at += len(issues)
+            if has_more or not issues or start_at >= data.get("total", 0):
+                break
+        
+        if not changed:
+            return {
+                "issues": [],
+                "count": 0,
+                "has_more": False,
+                "cursor": cursor or cursor_store.create(state),
+                "watermark": state.watermark,
+            }
+        
+        # 新水位为最后一个问题所在的分钟，记录该分钟内已返回的问题
+        watermark = jql_timestamp(changed[-1]["fields"]["updated"], tz)
+        seen = {k: u for k, u in state.seen.items() if jql_timestamp(u, tz) == watermark}
+        for issue in changed:
+            updated = issue["fields"]["updated"]
+            if jql_timestamp(updated, tz) == watermark:
+                seen[issue["key"]] = updated
+        new_cursor = cursor_store.create(Cursor(scope, owner, watermark, seen))
+        
+        await ensure_field_index(client)
+        issues = [render_issue(issue, field_list, expand_list) for issue in changed]
+        if expand_list and "changelog" in expand_list:
+            issues = [
+                dict(rendered, changes=_changelog_since(issue, state.watermark, tz))
+                for rendered, issue in zip(issues, changed)
+            ]
+        return {
+            "issues": issues,
+            "count": len(issues),
+            "has_more": has_more,
+            "cursor": new_cursor,
+            "watermark": watermark,
+        }
+    except Exception as e:
+        logger.error(f"增量查询失败: {str(e)}")
+        return {"error": str(e)}
+
+
 @mcp.tool(
     description="创建JIRA问题",
 )
-def create_issue(
+@instrument_tool
+async def create_issue(
     project_key: str,
     summary: str,
     description: str = "",
@@ -296,27 +1251,25 @@ def create_issue(
     
     try:
         # 构建问题字段
-        fields = {
-            "project": {"key": project_key},
-            "summary": summary,
-            "issuetype": {"name": issue_type},
-        }
-        
-        if description:
-            fields["description"] = description
-            
-        if priority:
-            fields["priority"] = {"name": priority}
-            
-        if assignee:
-            fields["assignee"] = {"name": assignee}
-            
-        if labels:
-            fields["labels"] = labels
+        fields = build_issue_fields(
+            project_key=project_key,
+            summary=summary,
+            description=description,
+            issue_type=issue_type,
+            priority=priority,
+            assignee=assignee,
+            labels=labels,
+        )
         
         # 创建问题
         client = get_jira_client()
-        issue = client.create_issue(fields=fields)
+        cache = get_issue_cache()
+        created = await client.create_issue(fields)
+        issue = await client.issue(created["key"], fields=resolve_fields(DEFAULT_PRESET))
+        await cache.put(
+            cache.make_key(issue["key"], resolve_fields(DEFAULT_PRESET)), issue
+        )
+        await ensure_field_index(client)
         return format_issue(issue)
     except Exception as e:
         logger.error(f"创建问题失败: {str(e)}")
@@ -326,7 +1279,8 @@ def create_issue(
 @mcp.tool(
     description="更新JIRA问题",
 )
-def update_issue(
+@instrument_tool
+async def update_issue(
     issue_key: str,
     summary: Optional[str] = None,
     description: Optional[str] = None,
@@ -334,9 +1288,12 @@ def update_issue(
     priority: Optional[str] = None,
     assignee: Optional[str] = None,
     labels: Optional[List[str]] = None,
+    return_issue: bool = True,
 ) -> Dict[str, Any]:
     """更新JIRA问题.
     
+    直接发送一次 ``PUT /issue/{key}``，不再预先获取问题。
+    
     Args:
         issue_key: 问题键
         summary: 问题概要
@@ -345,44 +1302,49 @@ def update_issue(
         priority: 优先级
         assignee: 经办人
         labels: 标签列表
+        return_issue: 是否返回更新后的字段；为False时只发送更新请求
     
     Returns:
-        Dict[str, Any]: 更新后的问题详情
+        Dict[str, Any]: 更新后的字段（仅包含本次修改的字段和updated）
     """
     logger.info(f"更新问题 {issue_key}")
     
     try:
         # 构建更新字段
-        fields = {}
-        
-        if summary:
-            fields["summary"] = summary
-            
-        if description:
-            fields["description"] = description
-            
-        if issue_type:
-            fields["issuetype"] = {"name": issue_type}
-            
-        if priority:
-            fields["priority"] = {"name": priority}
-            
-        if assignee:
-            fields["assignee"] = {"name": assignee}
-            
-        if labels:
-            fields["labels"] = labels
+        fields = build_issue_fields(
+            summary=summary,
+            description=description,
+            issue_type=issue_type,
+            priority=priority,
+            assignee=assignee,
+            labels=labels,
+        )
         
         if not fields:
             return {"error": "未提供任何更新字段"}
         
         # 更新问题
         client = get_jira_client()
-        issue = client.issue(issue_key)
-        issue.update(fields=fields)
+        cache = get_issue_cache()
+        updated_issue = await client.update_issue(issue_key, fields, return_issue=return_issue)
         
-        # 获取更新后的问题
-        updated_issue = client.issue(issue_key)
+        if not return_issue:
+            await cache.invalidate(issue_key)
+            return {"key": issue_key, "updated_fields": sorted(fields)}
+        
+        # 只获取本次修改的字段（JIRA Cloud会直接在更新响应中返回问题）
+        changed = sorted(fields) + ["updated"]
+        if updated_issue is None:
+            updated_issue = await client.issue(issue_key, fields=changed)
+        updated_fields = updated_issue.get("fields") or {}
+        updated_issue = dict(
+            updated_issue,
+            fields={name: updated_fields.get(name) for name in changed if name in updated_fields},
+        )
+        
+        # 用服务端返回的字段值写回缓存，字段集超出本次修改范围的条目会被删除
+        await cache.patch(issue_key, updated_issue["fields"])
+        await ensure_field_index(client)
         return format_issue(updated_issue)
     except Exception as e:
         logger.error(f"更新问题 {issue_key} 失败: {str(e)}")
@@ -390,30 +1352,187 @@ def update_issue(
 
 
 @mcp.tool(
-    description="获取JIRA项目列表",
+    description="批量创建JIRA问题",
 )
-def get_projects() -> Dict[str, Any]:
-    """获取所有项目列表.
+@instrument_tool
+async def create_issues(
+    issues: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """批量创建JIRA问题.
+    
+    使用 ``/rest/api/2/issue/bulk`` 接口，按服务端上限分组提交。
+    
+    Args:
+        issues: 问题列表，每项的键与 create_issue 的参数相同
+            (project_key, summary, description, issue_type, priority, assignee, labels)
     
     Returns:
-        Dict[str, Any]: 项目列表
+        Dict[str, Any]: 每个问题的创建结果
     """
-    logger.info("获取项目列表")
+    logger.info(f"批量创建问题: {len(issues)} 个")
+    
     try:
         client = get_jira_client()
-        projects = client.projects()
-        
-        result = [
-            {
-                "id": project.id,
-                "key": project.key,
-                "name": project.name,
-                "lead": getattr(project, "lead", {}).get("displayName", ""),
-            }
-            for project in projects
-        ]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(issues)
+        
+        # 构建字段，参数不完整的问题直接报告错误
+        pending = []
+        for index, item in enumerate(issues):
+            try:
+                item = dict(item)
+                item.setdefault("issue_type", "Task")
+                if not item.get("project_key") or not item.get("summary"):
+                    raise ValueError("缺少 project_key 或 summary")
+                pending.append((index, build_issue_fields(**item)))
+            except (TypeError, ValueError) as e:
+                results[index] = {"index": index, "error": str(e)}
+        
+        for i in range(0, len(pending), BULK_CREATE_CHUNK_SIZE):
+            chunk = pending[i:i + BULK_CREATE_CHUNK_SIZE]
+            try:
+                data = await client.create_issues_bulk([fields for _, fields in chunk])
+            except Exception as e:
+                for index, _ in chunk:
+                    results[index] = {"index": index, "error": str(e)}
+                continue
+            
+            # 失败项通过 failedElementNumber 标识，成功项按顺序返回
+            failures = {}
+            for error in data.get("errors") or []:
+                element_errors = error.get("elementErrors") or {}
+                messages = list(element_errors.get("errorMessages") or [])
+                messages.extend(
+                    f"{k}: {v}" for k, v in (element_errors.get("errors") or {}).items()
+                )
+                failures[error.get("failedElementNumber")] = "; ".join(messages) or "创建失败"
+            
+            created = iter(data.get("issues") or [])
+            for position, (index, _) in enumerate(chunk):
+                if position in failures:
+                    results[index] = {"index": index, "error": failures[position]}
+                    continue
+                issue = next(created, None)
+                if issue is None:
+                    results[index] = {"index": index, "error": "服务端未返回创建结果"}
+                else:
+                    results[index] = {
+                        "index": index,
+                        "id": issue.get("id"),
+                        "key": issue.get("key"),
+                        "self": issue.get("self"),
+                    }
+        
+        succeeded = sum(1 for r in results if r and "error" not in r)
+        return {
+            "total": len(issues),
+            "success": succeeded,
+            "failed": len(issues) - succeeded,
+            "results": results,
+        }
+    except Exception as e:
+        logger.error(f"批量创建问题失败: {str(e)}")
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    description="批量更新JIRA问题",
+)
+@instrument_tool
+async def update_issues(
+    updates: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """批量更新JIRA问题.
+    
+    各问题的更新请求并发执行，并发数受 UPDATE_CONCURRENCY 限制。
+    
+    Args:
+        updates: 更新列表，每项包含 issue_key 以及 update_issue 的可选字段
+            (summary, description, issue_type, priority, assignee, labels)
+    
+    Returns:
+        Dict[str, Any]: 每个问题的更新结果
+    """
+    logger.info(f"批量更新问题: {len(updates)} 个")
+    
+    try:
+        client = get_jira_client()
+        cache = get_issue_cache()
+        semaphore = asyncio.Semaphore(UPDATE_CONCURRENCY)
+        
+        async def update_one(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+            item = dict(item)
+            issue_key = item.pop("issue_key", None)
+            try:
+                if not issue_key:
+                    raise ValueError("缺少 issue_key")
+                item.pop("project_key", None)
+                fields = build_issue_fields(**item)
+                if not fields:
+                    raise ValueError("未提供任何更新字段")
+                async with semaphore:
+                    await client.update_issue(issue_key, fields)
+                await cache.invalidate(issue_key)
+                return {"index": index, "key": issue_key, "updated": sorted(fields)}
+            except Exception as e:
+                logger.error(f"更新问题 {issue_key} 失败: {str(e)}")
+                return {"index": index, "key": issue_key, "error": str(e)}
+        
+        results = await asyncio.gather(
+            *[update_one(index, item) for index, item in enumerate(updates)]
+        )
+        succeeded = sum(1 for r in results if "error" not in r)
+        return {
+            "total": len(updates),
+            "success": succeeded,
+            "failed": len(updates) - succeeded,
+            "results": results,
+        }
+    except Exception as e:
+        logger.error(f"批量更新问题失败: {str(e)}")
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    description="获取JIRA项目列表，支持按键或名称检索（前缀和模糊匹配）及分页",
+)
+@instrument_tool
+async def get_projects(
+    query: Optional[str] = None,
+    start_at: int = 0,
+    max_results: int = 50,
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """获取项目列表.
+    
+    项目列表来自带TTL的项目目录缓存，过期后在后台刷新。
+    
+    Args:
+        query: 按项目键或名称检索，结果按相关度排序：键完全匹配、键前缀、
+            名称前缀、名称中单词前缀、名称子串、名称模糊匹配
+        start_at: 起始索引
+        max_results: 最大返回结果数
+        refresh: 是否立即重新加载项目目录
+    
+    Returns:
+        Dict[str, Any]: 项目列表及匹配总数
+    """
+    logger.info(f"获取项目列表: query={query}, start_at={start_at}, max_results={max_results}")
+    try:
+        client = get_jira_client()
+        catalog = get_project_catalog()
+        await catalog.ensure(client, force=refresh)
         
-        return {"projects": result}
+        matches = catalog.search(query)
+        page = matches[start_at:start_at + max_results]
+        result = {
+            "projects": [project.summary() for project in page],
+            "total": len(matches),
+            "start_at": start_at,
+            "max_results": max_results,
+        }
+        if start_at + len(page) < len(matches):
+            result["next_start_at"] = start_at + len(page)
+        return result
     except Exception as e:
         logger.error(f"获取项目列表失败: {str(e)}")
         return {"error": str(e)}
@@ -422,11 +1541,14 @@ def get_projects() -> Dict[str, Any]:
 @mcp.tool(
     description="获取JIRA项目详情",
 )
-def get_project(
+@instrument_tool
+async def get_project(
     project_key: str
 ) -> Dict[str, Any]:
     """获取项目详情.
     
+    项目目录已加载且包含该项目的完整信息时直接返回，否则请求JIRA。
+    
     Args:
         project_key: 项目键
     
@@ -436,15 +1558,23 @@ def get_project(
     logger.info(f"获取项目: {project_key}")
     try:
         client = get_jira_client()
-        project = client.project(project_key)
+        catalog = get_project_catalog()
+        if catalog.loaded:
+            # 目录过期时在后台刷新，本次仍使用已有数据
+            await catalog.ensure(client)
+            cached = catalog.get(project_key)
+            if cached is not None and cached.detailed:
+                return cached.detail()
+        
+        project = await client.project(project_key)
         
         return {
-            "id": project.id,
-            "key": project.key,
-            "name": project.name,
-            "lead": getattr(project, "lead", {}).get("displayName", ""),
-            "description": getattr(project, "description", ""),
-            "url": project.self,
+            "id": project.get("id"),
+            "key": project.get("key"),
+            "name": project.get("name"),
+            "lead": (project.get("lead") or {}).get("displayName", ""),
+            "description": project.get("description", ""),
+            "url": project.get("self"),
         }
     except Exception as e:
         logger.error(f"获取项目 {project_key} 失败: {str(e)}")
@@ -454,7 +1584,8 @@ def get_project(
 @mcp.tool(
     description="调试JIRA问题字段",
 )
-def debug_issue_fields(
+@instrument_tool
+async def debug_issue_fields(
     issue_key: str,
 ) -> Dict[str, Any]:
     """查看JIRA问题的字段结构，用于调试.
@@ -468,14 +1599,10 @@ def debug_issue_fields(
     logger.info(f"调试问题字段: {issue_key}")
     try:
         client = get_jira_client()
-        issue = client.issue(issue_key)
+        issue = await client.issue(issue_key)
         
         fields = []
-        for field_name in dir(issue.fields):
-            if field_name.startswith('_') or callable(getattr(issue.fields, field_name)):
-                continue
-                
-            value = getattr(issue.fields, field_name)
+        for field_name, value in (issue.get("fields") or {}).items():
             field_type = type(value).__name__
             
             if field_name in ('attachment', 'attachments'):
@@ -483,11 +1610,11 @@ def debug_issue_fields(
                     attachment_info = []
                     for att in value:
                         attachment_info.append({
-                            "id": getattr(att, "id", None),
-                            "filename": getattr(att, "filename", None),
-                            "size": getattr(att, "size", None),
-                            "content_type": getattr(att, "mimeType", None),
-                            "created": getattr(att, "created", None),
+                            "id": att.get("id"),
+                            "filename": att.get("filename"),
+                            "size": att.get("size"),
+                            "content_type": att.get("mimeType"),
+                            "created": att.get("created"),
                         })
                     fields.append({"name": field_name, "type": field_type, "value": attachment_info})
                 else:
@@ -498,8 +1625,8 @@ def debug_issue_fields(
                 fields.append({"name": field_name, "type": field_type, "preview": simple_value})
         
         return {
-            "id": issue.id,
-            "key": issue.key,
+            "id": issue.get("id"),
+            "key": issue.get("key"),
             "fields": sorted(fields, key=lambda x: x["name"])
         }
     except Exception as e:
@@ -510,10 +1637,13 @@ def debug_issue_fields(
 @mcp.tool(
     description="根据问题ID和文件名获取JIRA附件",
 )
-def get_attachment_by_filename(
+@instrument_tool
+async def get_attachment_by_filename(
     issue_key: str,
     filename: str,
     save_to_disk: bool = True,
+    offset: int = 0,
+    length: Optional[int] = None,
 ) -> Dict[str, Any]:
     """根据问题ID和文件名获取JIRA附件.
     
@@ -521,6 +1651,8 @@ def get_attachment_by_filename(
         issue_key: JIRA问题键
         filename: 附件文件名
         save_to_disk: 是否保存到本地磁盘
+        offset: 读取的起始字节偏移
+        length: 读取的字节数，默认读取到文件末尾（受单次返回上限限制）
     
     Returns:
         Dict[str, Any]: 附件内容
@@ -530,25 +1662,12 @@ def get_attachment_by_filename(
         # 使用JIRA REST API直接获取问题附件
         client = get_jira_client()
         
-        # 获取问题详情
-        issue_url = f"{jira_settings.server_url}/rest/api/2/issue/{issue_key}"
-        response = client._session.get(issue_url)
-        if response.status_code != 200:
-            return {"error": f"获取问题失败: {response.text}"}
-            
-        issue_data = response.json()
+        # 查找指定文件名的附件（只请求附件字段）
+        meta, attachment = await find_attachment(client, issue_key, filename=filename)
         
         # 检查附件
-        attachments = issue_data.get("fields", {}).get("attachment", [])
-        if not attachments:
+        if not meta.attachments:
             return {"error": f"问题 {issue_key} 没有附件"}
-            
-        # 查找指定文件名的附件
-        attachment = None
-        for att in attachments:
-            if att.get("filename") == filename:
-                attachment = att
-                break
                 
         if not attachment:
             return {"error": f"未找到名为 {filename} 的附件"}
@@ -558,47 +1677,33 @@ def get_attachment_by_filename(
         if not attachment_url:
             return {"error": "附件URL不存在"}
             
-        # 下载附件
-        response = client._session.get(attachment_url)
-        if response.status_code != 200:
-            return {"error": f"下载附件失败: {response.text}"}
-            
-        content = response.content
+        # 下载附件：保存到磁盘时流式写入并登记到附件索引，已有有效副本则直接读取
+        local_path = None
+        cached = False
+        if save_to_disk:
+            local_path, cached = await ensure_local_attachment(client, issue_key, attachment)
+        else:
+            local_path = attachment_index.lookup(attachment)
+            cached = local_path is not None
         mime_type = attachment.get("mimeType", "application/octet-stream")
         
         result = {
             "id": attachment.get("id"),
             "filename": filename,
-            "size": len(content),
+            "size": os.path.getsize(local_path) if local_path else attachment.get("size"),
             "content_type": mime_type,
             "created": attachment.get("created"),
+            "cached": cached,
         }
         
         # 如果要保存到磁盘
         if save_to_disk:
-            file_path = get_attachment_path(issue_key, filename)
-            with open(file_path, "wb") as f:
-                f.write(content)
-            result["local_path"] = file_path
-        
-        # 处理不同的内容类型
-        if mime_type.startswith("image/"):
-            # 对于图片，返回Base64编码
-            result["content"] = base64.b64encode(content).decode('utf-8')
-            result["encoding"] = "base64"
-        elif mime_type.startswith("text/"):
-            # 对于文本文件，直接返回文本内容
-            try:
-                result["content"] = content.decode('utf-8')
-                result["encoding"] = "text"
-            except UnicodeDecodeError:
-                # 如果解码失败，回退到Base64
-                result["content"] = base64.b64encode(content).decode('utf-8')
-                result["encoding"] = "base64"
-        else:
-            # 对于其他类型，返回Base64编码
-            result["content"] = base64.b64encode(content).decode('utf-8')
-            result["encoding"] = "base64"
+            result["local_path"] = local_path
+        
+        # 读取请求的内容片段并按内容类型编码
+        result.update(
+            await read_attachment_slice(client, attachment, local_path, offset, length)
+        )
         
         return result
     except Exception as e:
@@ -609,24 +1714,32 @@ def get_attachment_by_filename(
 @mcp.tool(
     description="获取JIRA问题及其附件",
 )
-def getIssues(
+@instrument_tool
+async def getIssues(
     issue_key: str,
+    compact: bool = False,
+    max_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
     """获取JIRA问题及其附件信息.
     
     Args:
         issue_key: JIRA问题键
+        compact: 精简模式，用户、状态等嵌套对象只返回名称
+        max_tokens: 响应token预算，0表示不限制
     
     Returns:
-        Dict[str, Any]: 问题详情及附件信息
+        Dict[str, Any]: 问题详情及附件信息，发生裁剪时在 ``truncation`` 中说明
     """
     logger.info(f"获取问题及附件: {issue_key}")
     try:
         client = get_jira_client()
-        issue = client.issue(issue_key)
+        issue = await fetch_issue(client, issue_key)
+        await ensure_field_index(client)
         
         # 使用format_issue函数来获取JSON可序列化的问题数据
-        issue_data = format_issue(issue)
+        (issue_data,), truncation = shape_issues([render_issue(issue)], compact, max_tokens)
+        if truncation:
+            issue_data["truncation"] = truncation
         
         # 确保附件列表为JSON可序列化对象
         return issue_data
@@ -638,7 +1751,8 @@ def getIssues(
 @mcp.tool(
     description="下载JIRA问题的所有附件到本地",
 )
-def download_all_attachments(
+@instrument_tool
+async def download_all_attachments(
     issue_key: str,
 ) -> Dict[str, Any]:
     """下载JIRA问题的所有附件到本地.
@@ -652,15 +1766,9 @@ def download_all_attachments(
     logger.info(f"下载问题所有附件: {issue_key}")
     try:
         client = get_jira_client()
-        issue = client.issue(issue_key)
-        
-        downloads = []
-        failed = []
         
         # 获取附件列表
-        attachments = []
-        if hasattr(issue.fields, "attachment") and issue.fields.attachment:
-            attachments = issue.fields.attachment
+        attachments = (await get_issue_attachments_meta(client, issue_key)).attachments
         
         if not attachments:
             return {
@@ -674,31 +1782,35 @@ def download_all_attachments(
         issue_dir = os.path.join(ATTACHMENTS_DIR, issue_key)
         os.makedirs(issue_dir, exist_ok=True)
         
-        # 下载每个附件
-        for attachment in attachments:
+        semaphore = asyncio.Semaphore(ATTACHMENT_CONCURRENCY)
+        
+        async def download_one(attachment: Dict[str, Any]):
             try:
-                file_path = os.path.join(issue_dir, attachment.filename)
-                
-                # 下载内容
-                content = attachment.get()
+                # 本地已有有效副本时跳过下载，否则流式下载到临时文件后重命名
+                async with semaphore:
+                    file_path, cached = await ensure_local_attachment(
+                        client, issue_key, attachment
+                    )
                 
-                # 保存到文件
-                with open(file_path, "wb") as f:
-                    f.write(content)
-                
-                downloads.append({
-                    "id": attachment.id,
-                    "filename": attachment.filename,
+                return {
+                    "id": attachment["id"],
+                    "filename": attachment["filename"],
                     "size": os.path.getsize(file_path),
-                    "content_type": attachment.mimeType,
-                    "local_path": file_path
-                })
+                    "content_type": attachment.get("mimeType"),
+                    "local_path": file_path,
+                    "cached": cached,
+                }, None
             except Exception as e:
-                logger.error(f"下载附件 {attachment.filename} 失败: {str(e)}")
-                failed.append({
-                    "filename": attachment.filename,
+                logger.error(f"下载附件 {attachment['filename']} 失败: {str(e)}")
+                return None, {
+                    "filename": attachment["filename"],
                     "error": str(e)
-                })
+                }
+        
+        # 并发下载所有附件，结果保持附件原有顺序
+        results = await asyncio.gather(*[download_one(a) for a in attachments])
+        downloads = [ok for ok, _ in results if ok]
+        failed = [err for _, err in results if err]
         
         return {
             "issue_key": issue_key,
@@ -717,7 +1829,8 @@ def download_all_attachments(
 @mcp.tool(
     description="获取JIRA问题的所有附件",
 )
-def get_issue_attachments(
+@instrument_tool
+async def get_issue_attachments(
     issue_key: str,
     download: bool = False
 ) -> Dict[str, Any]:
@@ -733,29 +1846,28 @@ def get_issue_attachments(
     logger.info(f"获取问题附件列表: {issue_key}, download={download}")
     
     if download:
-        return download_all_attachments(issue_key)
+        return await download_all_attachments(issue_key)
     
     try:
         client = get_jira_client()
-        issue = client.issue(issue_key)
+        meta = await get_issue_attachments_meta(client, issue_key)
         
         attachments = []
-        if hasattr(issue.fields, "attachment") and issue.fields.attachment:
-            for attachment in issue.fields.attachment:
-                # 检查附件是否已存在于本地
-                local_path = get_attachment_path(issue_key, attachment.filename)
-                exists_locally = os.path.exists(local_path)
-                
-                attachments.append({
-                    "id": attachment.id,
-                    "filename": attachment.filename,
-                    "size": attachment.size,
-                    "content_type": attachment.mimeType,
-                    "created": str(attachment.created),  # 确保日期是字符串
-                    "url": str(attachment.content),  # 确保URL是字符串
-                    "local_path": local_path if exists_locally else None,
-                    "exists_locally": exists_locally
-                })
+        for attachment in meta.attachments:
+            # 检查附件索引中是否有有效的本地副本
+            local_path = attachment_index.lookup(attachment)
+            exists_locally = local_path is not None
+            
+            attachments.append({
+                "id": attachment["id"],
+                "filename": attachment["filename"],
+                "size": attachment.get("size"),
+                "content_type": attachment.get("mimeType"),
+                "created": attachment.get("created"),
+                "url": attachment.get("content"),
+                "local_path": local_path if exists_locally else None,
+                "exists_locally": exists_locally
+            })
         
         return {
             "issue_key": issue_key,
@@ -768,11 +1880,186 @@ def get_issue_attachments(
         return {"error": str(e)}
 
 
+@mcp.tool(
+    description="在本地镜像中检索JIRA问题（全文检索和简单过滤，不访问JIRA）",
+)
+@instrument_tool
+async def search_local_issues(
+    text: Optional[str] = None,
+    project: Optional[str] = None,
+    status: Optional[str] = None,
+    assignee: Optional[str] = None,
+    issue_type: Optional[str] = None,
+    label: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """在本地镜像中检索问题.
+    
+    Args:
+        text: 在概要和描述中全文检索的关键词，多个词以空格分隔
+        project: 项目键
+        status: 状态名
+        assignee: 经办人显示名
+        issue_type: 问题类型名
+        label: 标签
+        limit: 最大返回结果数
+    
+    Returns:
+        Dict[str, Any]: 检索结果及各项目镜像的同步状态
+    """
+    logger.info(f"本地检索问题: text={text}, project={project}, status={status}")
+    if not issue_mirror.enabled:
+        return {"error": "本地镜像未启用，请设置 JIRA_MIRROR_PROJECTS 环境变量"}
+    if _current_tenant.get() is not None:
+        return {"error": "本地镜像使用服务器凭据同步，不对使用个人凭据的调用开放"}
+    
+    try:
+        # 同步在其他线程写入镜像时等待锁，不阻塞事件循环
+        issues = await asyncio.to_thread(
+            issue_mirror.search,
+            text=text,
+            project=project,
+            status=status,
+            assignee=assignee,
+            issue_type=issue_type,
+            label=label,
+            limit=limit,
+        )
+        return {
+            "total": len(issues),
+            "issues": [format_issue(issue) for issue in issues],
+            "mirror": await asyncio.to_thread(issue_mirror.status),
+        }
+    except Exception as e:
+        logger.error(f"本地检索问题失败: {str(e)}")
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    description="立即增量同步本地JIRA镜像",
+)
+@instrument_tool
+async def sync_local_mirror() -> Dict[str, Any]:
+    """立即增量同步本地镜像中配置的项目.
+    
+    Returns:
+        Dict[str, Any]: 各项目的同步结果和同步状态
+    """
+    logger.info("同步本地镜像")
+    if not issue_mirror.enabled:
+        return {"error": "本地镜像未启用，请设置 JIRA_MIRROR_PROJECTS 环境变量"}
+    if _current_tenant.get() is not None:
+        return {"error": "本地镜像使用服务器凭据同步，不对使用个人凭据的调用开放"}
+    
+    try:
+        result = await issue_mirror.sync(get_jira_client())
+        return {"result": result, "mirror": await asyncio.to_thread(issue_mirror.status)}
+    except Exception as e:
+        logger.error(f"同步本地镜像失败: {str(e)}")
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    description="获取JIRA问题缓存和附件缓存的统计",
+)
+@instrument_tool
+async def cache_stats() -> Dict[str, Any]:
+    """获取问题缓存和附件缓存的统计，用于调整缓存大小和TTL.
+    
+    问题缓存、项目目录和请求调度器的统计属于当前调用方（使用个人凭据时
+    为该租户）。
+    
+    Returns:
+        Dict[str, Any]: 缓存统计
+    """
+    tenant = _current_tenant.get()
+    client = tenant.client if tenant is not None else jira_client
+    result = {
+        # 共享缓存的统计需要查询SQLite
+        "issue_cache": await asyncio.to_thread(get_issue_cache().stats),
+        "rendered_cache": rendered_cache.stats(),
+        "project_catalog": get_project_catalog().stats(),
+        "json_backend": JSON_BACKEND,
+        "attachment_cache": attachment_index.stats(),
+        "tenants": tenant_pool.stats(),
+    }
+    if client is not None:
+        result["scheduler"] = client.scheduler.stats()
+        result["coalesced_requests"] = client.flights.stats()
+    return result
+
+
+def _collect_gauges() -> Dict[str, float]:
+    """把各缓存和调度器的统计导出为gauge指标."""
+    stats = issue_cache.stats()
+    gauges = {
+        "issue_cache_size": stats["size"],
+        "issue_cache_hits": stats["hits"],
+        "issue_cache_misses": stats["misses"],
+        "issue_cache_hit_rate": stats["hit_rate"],
+        "rendered_cache_size": rendered_cache.stats()["size"],
+        "rendered_cache_hits": rendered_cache.hits,
+    }
+    attachment_stats = attachment_index.stats()
+    gauges["attachment_cache_files"] = attachment_stats["count"]
+    gauges["attachment_cache_bytes"] = attachment_stats["bytes"]
+    if jira_client is not None:
+        scheduler_stats = jira_client.scheduler.stats()
+        gauges["jira_retries"] = scheduler_stats["retries"]
+        gauges["jira_throttled"] = scheduler_stats["throttled"]
+        for name, limit in scheduler_stats["concurrency_limits"].items():
+            gauges[f"jira_concurrency_limit_{name}"] = limit
+        gauges["jira_coalesced_requests"] = jira_client.flights.stats()["shared"]
+    gauges["tenants"] = tenant_pool.stats()["tenants"]
+    if worker_index is not None:
+        gauges["worker_index"] = worker_index
+    return gauges
+
+
+metrics.add_collector(_collect_gauges)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """SSE模式下以Prometheus文本格式输出指标."""
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@mcp.tool(
+    description="获取服务器运行指标：工具耗时、JIRA请求次数和流量、缓存命中率、附件下载吞吐",
+)
+@instrument_tool
+async def server_stats() -> Dict[str, Any]:
+    """获取服务器运行指标，与SSE模式下 ``/metrics`` 输出的数值一致.
+    
+    Returns:
+        Dict[str, Any]: 计数器、延迟直方图摘要(毫秒)和gauge
+    """
+    snapshot = metrics.snapshot()
+    counters = snapshot["counters"]
+    seconds = counters.get("attachment_download_seconds_total", {}).get("total", 0)
+    downloaded = counters.get("attachment_download_bytes_total", {}).get("total", 0)
+    snapshot["attachment_throughput_bytes_per_second"] = (
+        round(downloaded / seconds, 1) if seconds else None
+    )
+    snapshot["startup"] = startup_report()
+    return snapshot
+
+
+_record_startup("import_seconds")
+
+
 def main():
     """主函数."""
     parser = argparse.ArgumentParser(description="Run the JIRA MCP Server")
     parser.add_argument("--config", "-c", help="Path to config file")
     parser.add_argument("--transport", "-t", choices=["sse", "stdio"], default="stdio")
+    parser.add_argument(
+        "--workers", "-w", type=int, default=int(os.getenv("MCP_SERVER_WORKERS", "1")),
+        help="SSE模式下的worker进程数",
+    )
     
     args = parser.parse_args()
     
@@ -789,7 +2076,10 @@ def main():
         
         # 运行MCP服务器
         logger.info(f"Starting JIRA MCP Server with {args.transport} transport")
-        mcp.run(transport=args.transport)
+        if args.transport == "sse" and args.workers > 1:
+            run_sse_workers(args.workers, mcp.settings.host, mcp.settings.port)
+        else:
+            mcp.run(transport=args.transport)
     except Exception as e:
         logger.error(f"Error starting JIRA MCP Server: {str(e)}")
         raise
@@ -0,0 +1,179 @@
+"""多进程共享的缓存层."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tag TEXT,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_tag ON entries(namespace, tag);
+CREATE INDEX IF NOT EXISTS idx_entries_stored ON entries(namespace, stored_at);
+"""
+
+
+class SharedCache:
+    """基于SQLite(WAL)的键值缓存，供同一台机器上的多个worker进程共享.
+
+    条目按命名空间隔离，值以JSON保存，时间戳使用墙上时钟以便跨进程比较。
+    ``tag`` 用于按问题键批量查找或删除同一问题的多个字段集条目。
+
+    各方法都是同步的，其他进程写入时可能等待数据库锁，异步代码应通过
+    ``asyncio.to_thread`` 调用。
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 5000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # WAL模式下读写互不阻塞，多个进程可以同时读取
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """返回 ``(值, 写入时间)``，不存在时返回None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row["value"]), row["stored_at"]
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Tuple[Any, float]]:
+        """批量查找，返回 ``{键: (值, 写入时间)}``，不存在的键不出现在结果中."""
+        found: Dict[str, Tuple[Any, float]] = {}
+        with self._lock:
+            # 每条语句的参数个数有上限，分批查询
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self.conn.execute(
+                    "SELECT key, value, stored_at FROM entries WHERE namespace = ? "
+                    "AND key IN ({})".format(", ".join("?" * len(batch))),
+                    (namespace, *batch),
+                ).fetchall()
+                for row in rows:
+                    found[row["key"]] = (json.loads(row["value"]), row["stored_at"])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, namespace: str, key: str, value: Any, tag: Optional[str] = None) -> None:
+        self.set_many(namespace, [(key, value, tag)])
+
+    def set_many(
+        self, namespace: str, items: List[Tuple[str, Any, Optional[str]]]
+    ) -> None:
+        """在一个事务中写入多个 ``(键, 值, tag)``."""
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (namespace, key, tag, json.dumps(value, ensure_ascii=False), now)
+            for key, value, tag in items
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries (namespace, key, tag, value, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+            before = self._writes
+            self._writes += len(rows)
+            # 每写入一定次数清理一次超出上限的旧条目
+            if self._writes // 100 != before // 100:
+                self._prune(namespace)
+
+    def touch(self, namespace: str, key: str) -> None:
+        """续期条目."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE entries SET stored_at = ? WHERE namespace = ? AND key = ?",
+                (time.time(), namespace, key),
+            )
+            self.conn.commit()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            self.conn.commit()
+
+    def tagged(self, namespace: str, tag: str) -> List[Tuple[str, Any]]:
+        """返回带有指定tag的所有 ``(键, 值)``."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key, value FROM entries WHERE namespace = ? AND tag = ?",
+                (namespace, tag),
+            ).fetchall()
+        return [(row["key"], json.loads(row["value"])) for row in rows]
+
+    def delete_tag(self, namespace: str, tag: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND tag = ?", (namespace, tag)
+            )
+            self.conn.commit()
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self.conn.commit()
+
+    def _prune(self, namespace: str) -> None:
+        """按写入时间删除超出上限的最旧条目."""
+        count = self.conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries "
+                "WHERE namespace = ? ORDER BY stored_at LIMIT ?)",
+                (namespace, excess),
+            )
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT namespace, COUNT(*) AS n FROM entries GROUP BY namespace"
+            ).fetchall()
+        return {
+            "path": self.db_path,
+            "entries": {row["namespace"]: row["n"] for row in rows},
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
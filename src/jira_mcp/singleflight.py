@@ -0,0 +1,59 @@
+"""相同请求的并发合并（single-flight）."""
+
+import asyncio
+import copy
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """合并键相同的并发调用，只执行一次，所有调用方共享结果.
+
+    第一个调用方发起请求，之后到达的调用方等待同一个任务并各自得到结果的
+    深拷贝，避免调用方修改结果时互相影响。任务完成后立即移除，不做缓存。
+    请求以独立任务运行，个别调用方被取消不会中断其他调用方共享的请求。
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """按键合并执行 ``fn``.
+
+        Args:
+            key: 规范化后的请求键
+            fn: 实际执行请求的协程函数
+
+        Returns:
+            Any: 请求结果，共享调用方得到的是深拷贝
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+            self.executed += 1
+            return await asyncio.shield(task)
+
+        self.shared += 1
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 所有调用方都被取消时，读取异常以免出现未处理异常的警告
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"合并请求失败: {key}")
+
+    def stats(self) -> Dict[str, Any]:
+        """返回合并统计."""
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
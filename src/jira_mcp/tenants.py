@@ -0,0 +1,126 @@
+"""多租户凭据：按调用方凭据缓存JIRA客户端和问题缓存."""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .cache import IssueCache
+from .client import AsyncJiraClient
+from .projects import ProjectCatalog
+
+logger = logging.getLogger(__name__)
+
+# 调用方通过这两个HTTP头传入自己的JIRA凭据
+USERNAME_HEADER = "x-jira-username"
+TOKEN_HEADER = "x-jira-token"
+
+
+@dataclass(frozen=True)
+class Credentials:
+    """调用方的JIRA凭据."""
+    username: str
+    secret: str = field(repr=False)
+
+    @property
+    def tenant_id(self) -> str:
+        """凭据的摘要，用作租户标识和缓存命名空间，不会泄露密钥."""
+        digest = hashlib.sha256(f"{self.username}\0{self.secret}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def from_headers(cls, headers: Optional[Mapping[str, str]]) -> Optional["Credentials"]:
+        """从请求头读取凭据，未提供时返回None."""
+        if not headers:
+            return None
+        username = headers.get(USERNAME_HEADER)
+        secret = headers.get(TOKEN_HEADER)
+        if not username or not secret:
+            return None
+        return cls(username=username, secret=secret)
+
+
+@dataclass
+class Tenant:
+    """一组凭据独占的客户端和缓存.
+
+    每个租户有独立的连接池、请求调度器、问题缓存和项目目录，不同用户的
+    权限不同，这些数据不能共享。格式化缓存按租户标识区分条目，只有实例级
+    的字段元数据由所有租户共用。
+    """
+    tenant_id: str
+    client: AsyncJiraClient
+    issue_cache: IssueCache
+    project_catalog: ProjectCatalog
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class TenantPool:
+    """按凭据缓存租户，LRU淘汰并回收空闲租户.
+
+    被淘汰的客户端延迟 ``close_delay`` 秒关闭，让仍在进行中的请求完成。
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Credentials], Tenant],
+        max_tenants: int = 200,
+        idle_ttl: float = 900.0,
+        close_delay: float = 60.0,
+    ):
+        self.factory = factory
+        self.max_tenants = max_tenants
+        self.idle_ttl = idle_ttl
+        self.close_delay = close_delay
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()
+        self._closing: List[asyncio.Task] = []
+        self.created = 0
+        self.evictions = 0
+
+    def get(self, credentials: Credentials) -> Tenant:
+        """返回凭据对应的租户，不存在时创建."""
+        tenant_id = credentials.tenant_id
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            tenant = self.factory(credentials)
+            self._tenants[tenant_id] = tenant
+            self.created += 1
+            logger.info(f"创建租户 {tenant_id} (用户 {credentials.username})")
+        self._tenants.move_to_end(tenant_id)
+        tenant.last_used = time.monotonic()
+        self._evict()
+        return tenant
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._tenants:
+            tenant_id, tenant = next(iter(self._tenants.items()))
+            if len(self._tenants) <= self.max_tenants and now - tenant.last_used < self.idle_ttl:
+                break
+            del self._tenants[tenant_id]
+            self.evictions += 1
+            logger.info(f"回收租户 {tenant_id}")
+            self._close_later(tenant)
+
+    def _close_later(self, tenant: Tenant) -> None:
+        async def close() -> None:
+            await asyncio.sleep(self.close_delay)
+            await tenant.client.aclose()
+
+        try:
+            task = asyncio.get_running_loop().create_task(close())
+        except RuntimeError:
+            return
+        self._closing = [t for t in self._closing if not t.done()] + [task]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tenants": len(self._tenants),
+            "max_tenants": self.max_tenants,
+            "idle_ttl": self.idle_ttl,
+            "created": self.created,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,202 @@
+"""多进程SSE部署：多个worker共享监听端口，按会话亲和转发消息."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import httpx
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# worker的消息路径中带有worker编号：/messages/<编号>/?session_id=...
+_MESSAGE_PATH = re.compile(r"^/messages/(\d+)/")
+
+# 不转发的逐跳头（RFC 7230 6.1），以及由HTTP客户端按转发的内容重新生成的头
+_HOP_BY_HOP = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+    "content-length",
+})
+
+
+def message_path(index: int) -> str:
+    return f"/messages/{index}/"
+
+
+def forwarded_headers(items: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """返回转发时保留的头：去掉逐跳头和 ``Connection`` 中列出的头."""
+    items = list(items)
+    excluded = set(_HOP_BY_HOP)
+    for name, value in items:
+        if name.lower() == "connection":
+            excluded.update(token.strip().lower() for token in value.split(","))
+    return [(name, value) for name, value in items if name.lower() not in excluded]
+
+
+def _worker_socket(socket_dir: str, index: int) -> str:
+    return os.path.join(socket_dir, f"worker-{index}.sock")
+
+
+class SessionAffinityMiddleware:
+    """把属于其他worker会话的消息转发给该worker.
+
+    SSE会话的事件流保持在建立连接的worker上，客户端随后POST的消息由内核
+    分配给任意worker。消息路径中带有会话所属worker的编号，不属于本worker
+    时通过该worker的Unix socket原样转发，除逐跳头外的请求头（包括调用方的
+    JIRA凭据）和响应头都保留。
+    """
+
+    def __init__(self, app: ASGIApp, index: int, socket_dir: str):
+        self.app = app
+        self.index = index
+        self.socket_dir = socket_dir
+        self._clients: Dict[int, httpx.AsyncClient] = {}
+
+    def _client(self, target: int) -> httpx.AsyncClient:
+        client = self._clients.get(target)
+        if client is None:
+            transport = httpx.AsyncHTTPTransport(uds=_worker_socket(self.socket_dir, target))
+            client = httpx.AsyncClient(transport=transport, base_url="http://worker")
+            self._clients[target] = client
+        return client
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            match = _MESSAGE_PATH.match(scope["path"])
+            if match and int(match.group(1)) != self.index:
+                await self._forward(int(match.group(1)), scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    async def _forward(self, target: int, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        body = await request.body()
+        url = scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        try:
+            upstream = await self._client(target).request(
+                request.method,
+                url,
+                content=body,
+                headers=forwarded_headers(request.headers.items()),
+            )
+            # httpx已解码响应体，不再转发 Content-Encoding
+            response = Response(
+                upstream.content,
+                status_code=upstream.status_code,
+                headers={
+                    name: value
+                    for name, value in forwarded_headers(upstream.headers.items())
+                    if name.lower() != "content-encoding"
+                },
+            )
+        except httpx.TransportError as e:
+            logger.warning(f"转发消息到worker {target} 失败: {str(e)}")
+            response = Response("Worker unavailable", status_code=502)
+        await response(scope, receive, send)
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker_main(index: int, sock: socket.socket, socket_dir: str) -> None:
+    """worker进程入口."""
+    from . import server
+
+    server.worker_index = index
+    asyncio.run(_serve(server, index, sock, socket_dir))
+
+
+async def _serve(server, index: int, sock: socket.socket, socket_dir: str) -> None:
+    import uvicorn
+
+    mcp = server.mcp
+    mcp.settings.message_path = message_path(index)
+    app = SessionAffinityMiddleware(mcp.sse_app(), index, socket_dir)
+
+    private = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    private.bind(_worker_socket(socket_dir, index))
+
+    config = uvicorn.Config(app, log_level=mcp.settings.log_level.lower())
+    logger.info(f"worker {index} 已启动 (pid {os.getpid()})")
+    await uvicorn.Server(config).serve(sockets=[sock, private])
+
+
+def run_sse_workers(workers: int, host: str, port: int) -> None:
+    """启动并看护多个SSE worker进程.
+
+    所有worker继承同一个监听socket，由内核分配连接；问题缓存和字段元数据
+    通过共享缓存层在worker之间复用。worker异常退出时自动重启。
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("多worker模式需要Unix domain socket支持")
+
+    sock = _bind(host, port)
+    socket_dir = tempfile.mkdtemp(prefix="jira-mcp-workers-")
+    # worker进程在导入时读取该变量，启用共享缓存层
+    os.environ["JIRA_SHARED_CACHE"] = "1"
+
+    ctx = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.Process] = []
+
+    def start(index: int) -> multiprocessing.Process:
+        process = ctx.Process(
+            target=_worker_main, args=(index, sock, socket_dir), name=f"jira-mcp-worker-{index}"
+        )
+        process.start()
+        return process
+
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(f"在 {host}:{port} 启动 {workers} 个SSE worker")
+    try:
+        processes = [start(i) for i in range(workers)]
+        while not stopping:
+            for index, process in enumerate(processes):
+                if not process.is_alive() and not stopping:
+                    logger.warning(f"worker {index} 已退出 (exit {process.exitcode})，重新启动")
+                    stale = _worker_socket(socket_dir, index)
+                    if os.path.exists(stale):
+                        os.unlink(stale)
+                    processes[index] = start(index)
+            time.sleep(0.5)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=10)
+        sock.close()
+        shutil.rmtree(socket_dir, ignore_errors=True)
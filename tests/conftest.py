@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    """异步测试只在asyncio上运行."""
+    return "asyncio"
@@ -0,0 +1,68 @@
+"""本地附件副本的测试."""
+
+import os
+
+import pytest
+
+from jira_mcp import server
+from jira_mcp.attachments import AttachmentIndex
+
+
+class FakeClient:
+    def __init__(self, contents):
+        self.contents = contents
+        self.downloads = []
+
+    async def download_to_file(self, url, path, digest=None):
+        self.downloads.append(url)
+        data = self.contents[url]
+        with open(path, "wb") as f:
+            f.write(data)
+        if digest is not None:
+            digest.update(data)
+        return len(data)
+
+
+def make_attachment(attachment_id, filename, content):
+    return {
+        "id": attachment_id,
+        "filename": filename,
+        "size": len(content),
+        "created": "2024-01-01T08:00:00.000+0000",
+        "content": f"http://jira.example.com/secure/attachment/{attachment_id}/{filename}",
+    }
+
+
+@pytest.fixture(autouse=True)
+def attachments_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "ATTACHMENTS_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        server, "attachment_index", AttachmentIndex(os.path.join(tmp_path, "attachments.db"))
+    )
+    return tmp_path
+
+
+@pytest.mark.anyio
+async def test_same_named_attachments_do_not_collide(attachments_dir):
+    first = make_attachment("101", "screenshot.png", b"first")
+    second = make_attachment("102", "screenshot.png", b"second version")
+    client = FakeClient({first["content"]: b"first", second["content"]: b"second version"})
+
+    first_path, first_cached = await server.ensure_local_attachment(client, "PROJ-1", first)
+    second_path, second_cached = await server.ensure_local_attachment(client, "PROJ-1", second)
+
+    assert first_path == os.path.join(attachments_dir, "PROJ-1", "101_screenshot.png")
+    assert second_path == os.path.join(attachments_dir, "PROJ-1", "102_screenshot.png")
+    assert not first_cached and not second_cached
+
+    # 两个副本都保持有效，再次获取时不会重新下载
+    assert await server.ensure_local_attachment(client, "PROJ-1", first) == (first_path, True)
+    assert await server.ensure_local_attachment(client, "PROJ-1", second) == (second_path, True)
+    assert len(client.downloads) == 2
+    with open(first_path, "rb") as f:
+        assert f.read() == b"first"
+
+
+def test_attachment_path_stays_in_issue_dir(attachments_dir):
+    path = server.get_attachment_path("PROJ-1", {"id": "7", "filename": "../../evil.txt"})
+    assert path == os.path.join(attachments_dir, "PROJ-1", "7_evil.txt")
@@ -0,0 +1,103 @@
+"""精简模式与响应预算的测试."""
+
+import copy
+
+from jira_mcp.budget import MIN_TEXT_CHARS, compact_issue, estimate_tokens, fit_to_budget
+
+
+def make_issue(number, description_chars=4000):
+    return {
+        "key": f"PROJ-{number}",
+        "id": str(10000 + number),
+        "self": f"https://jira.example.com/rest/api/2/issue/{10000 + number}",
+        "summary": f"问题 {number}",
+        "description": "x" * description_chars,
+        "labels": ["backend"],
+        "components": [{"id": "1", "name": "core"}],
+        "attachments": [{"id": "1", "filename": "log.txt", "size": 10}],
+        "custom_fields": {"Notes": "y" * description_chars, "Empty": None},
+        "assignee": None,
+    }
+
+
+def test_within_budget_is_unchanged():
+    issues = [make_issue(1, description_chars=10)]
+    result, report = fit_to_budget(issues, 10000)
+    assert result is issues
+    assert report is None
+
+
+def test_input_is_not_modified():
+    issues = [make_issue(i) for i in range(3)]
+    before = copy.deepcopy(issues)
+    fit_to_budget(issues, 500)
+    assert issues == before
+
+
+def test_low_value_fields_dropped_before_text_is_truncated():
+    issues = [make_issue(1, description_chars=1000)]
+    stripped = {k: v for k, v in issues[0].items() if k not in ("self", "id", "assignee")}
+    # 预算恰好容纳去掉低价值字段后的问题和报告预留
+    budget = estimate_tokens([stripped]) + 128
+    issues[0]["self"] += "/" + "s" * 1000
+
+    result, report = fit_to_budget(issues, budget)
+
+    assert result == [stripped]
+    assert report["dropped_fields"] == ["id", "self", "assignee"]
+    assert "text_truncated_to" not in report
+
+
+def test_long_text_is_truncated_with_marker():
+    issues = [make_issue(1, description_chars=20000)]
+    result, report = fit_to_budget(issues, 2000)
+
+    cap = report["text_truncated_to"]
+    assert MIN_TEXT_CHARS <= cap < 20000
+    assert result[0]["description"] == "x" * cap + "…"
+    assert report["truncated_text"]["description"] == 1
+    assert not report["over_budget"]
+
+
+def test_attachments_replaced_by_count():
+    issues = [make_issue(i, description_chars=MIN_TEXT_CHARS) for i in range(20)]
+    result, report = fit_to_budget(issues, 1500)
+
+    assert "attachments" in report["dropped_fields"]
+    assert all("attachments" not in issue for issue in result)
+    assert all(issue["attachment_count"] == 1 for issue in result)
+
+
+def test_issues_dropped_from_end_but_one_kept():
+    issues = [make_issue(i) for i in range(10)]
+    result, report = fit_to_budget(issues, 1)
+
+    assert [issue["key"] for issue in result] == ["PROJ-0"]
+    assert report["omitted_issues"] == 9
+    assert report["over_budget"]
+
+
+def test_result_is_deterministic():
+    issues = [make_issue(i) for i in range(5)]
+    assert fit_to_budget(issues, 800) == fit_to_budget(issues, 800)
+
+
+def test_compact_issue_flattens_nested_values():
+    issue = {
+        "key": "PROJ-1",
+        "self": "https://jira.example.com/rest/api/2/issue/1",
+        "status": {"id": "1", "name": "Open"},
+        "assignee": {"name": "alice", "display_name": "Alice"},
+        "project": {"id": "1", "key": "PROJ"},
+        "components": [{"id": "1", "name": "core"}],
+        "custom_fields": {"Empty": "", "Team": "core"},
+        "labels": [],
+    }
+    assert compact_issue(issue) == {
+        "key": "PROJ-1",
+        "status": "Open",
+        "assignee": "Alice",
+        "project": "PROJ",
+        "components": ["core"],
+        "custom_fields": {"Team": "core"},
+    }
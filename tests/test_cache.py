@@ -0,0 +1,191 @@
+"""IssueCache 和 RenderedIssueCache 的测试."""
+
+import os
+
+import pytest
+
+from jira_mcp.cache import IssueCache, RenderedIssueCache
+from jira_mcp.shared import SharedCache
+
+
+def make_issue(key="PROJ-1", updated="2024-01-01T00:00:00.000+0000", **fields):
+    return {"key": key, "fields": dict(fields, updated=updated)}
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return SharedCache(os.path.join(tmp_path, "shared.db"))
+
+
+@pytest.mark.anyio
+async def test_put_get_and_lru_eviction():
+    cache = IssueCache(max_size=2)
+    keys = [IssueCache.make_key(f"PROJ-{i}") for i in range(3)]
+    await cache.put(keys[0], make_issue("PROJ-0"))
+    await cache.put(keys[1], make_issue("PROJ-1"))
+    # 访问后PROJ-0变为最近使用，写入第三个条目时淘汰PROJ-1
+    assert await cache.get(keys[0]) is not None
+    await cache.put(keys[2], make_issue("PROJ-2"))
+
+    assert await cache.get(keys[1]) is None
+    assert await cache.get(keys[0]) is not None
+    assert cache.evictions == 1
+
+
+def test_make_key_normalises_case_and_order():
+    assert IssueCache.make_key("proj-1", ["b", "a"], ["changelog"]) == IssueCache.make_key(
+        "PROJ-1", ["a", "b"], ["changelog"]
+    )
+
+
+@pytest.mark.anyio
+async def test_zero_size_disables_cache():
+    cache = IssueCache(max_size=0)
+    key = IssueCache.make_key("PROJ-1")
+    await cache.put(key, make_issue())
+    assert await cache.get(key) is None
+
+
+@pytest.mark.anyio
+async def test_expired_entry_is_kept_until_touched():
+    cache = IssueCache(ttl=0)
+    key = IssueCache.make_key("PROJ-1")
+    await cache.put(key, make_issue())
+
+    entry = await cache.get(key)
+    assert entry is not None and not cache.is_fresh(entry)
+    cache.ttl = 60
+    await cache.touch(key)
+    assert cache.is_fresh(await cache.get(key))
+    assert cache.revalidated == 1
+
+
+@pytest.mark.anyio
+async def test_patch_updates_only_covered_field_sets():
+    cache = IssueCache()
+    narrow = IssueCache.make_key("PROJ-1", ["summary", "updated"])
+    full = IssueCache.make_key("PROJ-1", ["*all"])
+    other = IssueCache.make_key("PROJ-1", ["status", "updated"])
+    await cache.put(narrow, make_issue(summary="old"))
+    await cache.put(full, make_issue(summary="old", status="Open"))
+    await cache.put(other, make_issue(status="Open"))
+
+    await cache.patch("proj-1", {"summary": "new", "updated": "2024-01-02T00:00:00.000+0000"})
+
+    entry = await cache.get(narrow)
+    assert entry.issue["fields"]["summary"] == "new"
+    assert entry.updated == "2024-01-02T00:00:00.000+0000"
+    # 其他字段可能随修改变化，不能带着新的updated继续通过校验
+    assert await cache.get(full) is None
+    assert await cache.get(other) is None
+
+
+@pytest.mark.anyio
+async def test_patch_without_updated_drops_entries():
+    cache = IssueCache()
+    key = IssueCache.make_key("PROJ-1", ["summary"])
+    await cache.put(key, make_issue(summary="old"))
+
+    await cache.patch("PROJ-1", {"summary": "new"})
+
+    assert await cache.get(key) is None
+
+
+@pytest.mark.anyio
+async def test_patch_does_not_mutate_stored_issue():
+    cache = IssueCache()
+    key = IssueCache.make_key("PROJ-1", ["summary", "updated"])
+    original = make_issue(summary="old")
+    await cache.put(key, original)
+
+    await cache.patch("PROJ-1", {"summary": "new", "updated": "b"})
+
+    assert original["fields"]["summary"] == "old"
+
+
+@pytest.mark.anyio
+async def test_patch_drops_expanded_entries():
+    cache = IssueCache()
+    expanded = IssueCache.make_key("PROJ-1", ["summary"], ["changelog"])
+    await cache.put(expanded, make_issue(summary="old"))
+
+    await cache.patch("PROJ-1", {"summary": "new"})
+
+    assert await cache.get(expanded) is None
+
+
+@pytest.mark.anyio
+async def test_patch_writes_through_to_shared_cache(shared):
+    key = IssueCache.make_key("PROJ-1", ["summary", "updated"])
+    expanded = IssueCache.make_key("PROJ-1", ["summary"], ["changelog"])
+    full = IssueCache.make_key("PROJ-1", ["*all"])
+    writer = IssueCache(shared=shared)
+    await writer.put(key, make_issue(summary="old"))
+    await writer.put(expanded, make_issue(summary="old"))
+    await writer.put(full, make_issue(summary="old"))
+
+    await writer.patch("PROJ-1", {"summary": "new", "updated": "b"})
+
+    # 另一个进程的本地缓存为空，从共享缓存读到更新后的字段
+    reader = IssueCache(shared=shared)
+    assert (await reader.get(key)).issue["fields"]["summary"] == "new"
+    assert await reader.get(expanded) is None
+    assert await reader.get(full) is None
+
+
+@pytest.mark.anyio
+async def test_invalidate_removes_all_field_sets(shared):
+    cache = IssueCache(shared=shared)
+    keys = [IssueCache.make_key("PROJ-1", ["summary"]), IssueCache.make_key("PROJ-1")]
+    for key in keys:
+        await cache.put(key, make_issue())
+
+    await cache.invalidate("PROJ-1")
+
+    assert all([await cache.get(key) is None for key in keys])
+
+
+@pytest.mark.anyio
+async def test_namespaces_are_isolated_in_shared_cache(shared):
+    key = IssueCache.make_key("PROJ-1")
+    await IssueCache(shared=shared, namespace="issue:a").put(key, make_issue(summary="a"))
+
+    assert await IssueCache(shared=shared, namespace="issue:b").get(key) is None
+
+
+@pytest.mark.anyio
+async def test_put_many_writes_one_transaction(shared, monkeypatch):
+    writer = IssueCache(shared=shared)
+    keys = [IssueCache.make_key(f"PROJ-{i}") for i in range(50)]
+    batches = []
+    set_many = shared.set_many
+
+    def counting_set_many(namespace, items):
+        batches.append(len(items))
+        set_many(namespace, items)
+
+    monkeypatch.setattr(shared, "set_many", counting_set_many)
+
+    await writer.put_many([(key, make_issue(key[0])) for key in keys])
+
+    assert batches == [50]
+    found = await IssueCache(shared=shared).get_many(keys + [IssueCache.make_key("PROJ-X")])
+    assert sorted(found) == sorted(keys)
+    assert found[keys[7]].issue["key"] == "PROJ-7"
+
+
+def test_shared_prune_limits_entries(tmp_path):
+    shared = SharedCache(os.path.join(tmp_path, "shared.db"), max_entries=10)
+    shared.set_many("issue", [(f"k{i}", i, None) for i in range(150)])
+
+    assert shared.stats()["entries"] == {"issue": 10}
+
+
+def test_rendered_key_requires_updated():
+    assert RenderedIssueCache.make_key({"key": "PROJ-1", "fields": {}}, None, None, 0.0) is None
+
+
+def test_rendered_key_changes_with_updated():
+    first = RenderedIssueCache.make_key(make_issue(updated="a"), ["summary"], None, 0.0)
+    second = RenderedIssueCache.make_key(make_issue(updated="b"), ["summary"], None, 0.0)
+    assert first != second
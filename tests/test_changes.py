@@ -0,0 +1,116 @@
+"""增量查询水位和JQL处理的测试."""
+
+import os
+import re
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from jira_mcp import server
+from jira_mcp.cursors import CursorStore
+from jira_mcp.mirror import jql_timestamp, parse_jira_time
+
+SHANGHAI = ZoneInfo("Asia/Shanghai")
+_SINCE = re.compile(r'updated >= "([^"]+)"')
+
+
+def make_issue(number, updated):
+    return {"key": f"PROJ-{number}", "fields": {"summary": f"issue {number}", "updated": updated}}
+
+
+class FakeClient:
+    """按JIRA的方式解释JQL中的时间：不带时区，按用户时区理解."""
+
+    def __init__(self, issues, tz=None):
+        self.issues = issues
+        self.tz = tz
+        self.jql = []
+
+    async def user_timezone(self):
+        return self.tz
+
+    async def search_issues(self, jql, start_at=0, max_results=50, fields=None, expand=None):
+        self.jql.append(jql)
+        matched = self.issues
+        since = _SINCE.search(jql)
+        if since:
+            moment = datetime.strptime(since.group(1), "%Y/%m/%d %H:%M")
+            moment = moment.replace(tzinfo=self.tz or timezone.utc)
+            matched = [i for i in matched if parse_jira_time(i["fields"]["updated"]) >= moment]
+        matched = sorted(matched, key=lambda i: (parse_jira_time(i["fields"]["updated"]), i["key"]))
+        return {"issues": matched[start_at:start_at + max_results], "total": len(matched)}
+
+
+@pytest.fixture(autouse=True)
+def cursors(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "cursor_store", CursorStore(os.path.join(tmp_path, "cursors.db")))
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(server, "get_jira_client", lambda: client)
+    return client
+
+
+def keys(result):
+    return [issue["key"] for issue in result["issues"]]
+
+
+def test_jql_timestamp_converts_to_user_timezone():
+    assert jql_timestamp("2024-02-05T08:00:00.000+0000") == "2024/02/05 08:00"
+    assert jql_timestamp("2024-02-05T08:00:00.000+0000", SHANGHAI) == "2024/02/05 16:00"
+    assert jql_timestamp("2024-02-05T10:00:00.000+0800", timezone.utc) == "2024/02/05 02:00"
+    assert jql_timestamp("2024-02-05T23:30:00+0000", SHANGHAI) == "2024/02/06 07:30"
+
+
+@pytest.mark.parametrize("jql, scope", [
+    ("ORDER BY updated DESC", ""),
+    ("order by created", ""),
+    ("project = PROJ ORDER BY created DESC", "project = PROJ"),
+    ("project = PROJ\norder by created", "project = PROJ"),
+    ("summary ~ border", "summary ~ border"),
+])
+def test_order_by_is_stripped(jql, scope):
+    assert " ".join(server._ORDER_BY.sub("", jql).split()) == scope
+
+
+@pytest.mark.anyio
+async def test_watermark_does_not_replay_when_user_timezone_is_ahead(monkeypatch):
+    client = use_client(monkeypatch, FakeClient([
+        make_issue(1, "2024-02-05T01:00:00.000+0000"),
+        make_issue(2, "2024-02-05T05:00:00.000+0000"),
+        make_issue(3, "2024-02-05T08:00:00.000+0000"),
+    ], tz=SHANGHAI))
+
+    first = await server.get_changes_since("project = PROJ")
+    assert keys(first) == ["PROJ-1", "PROJ-2", "PROJ-3"]
+    assert first["watermark"] == "2024/02/05 16:00"
+
+    second = await server.get_changes_since("project = PROJ", cursor=first["cursor"])
+    assert second["count"] == 0
+    assert second["cursor"] == first["cursor"]
+    assert 'updated >= "2024/02/05 16:00"' in client.jql[-1]
+
+
+@pytest.mark.anyio
+async def test_watermark_does_not_skip_when_user_timezone_is_behind(monkeypatch):
+    client = use_client(monkeypatch, FakeClient([
+        make_issue(1, "2024-02-05T10:00:00.000+0800"),
+    ], tz=timezone.utc))
+
+    first = await server.get_changes_since("project = PROJ")
+    assert first["watermark"] == "2024/02/05 02:00"
+
+    client.issues.append(make_issue(2, "2024-02-05T11:00:00.000+0800"))
+    second = await server.get_changes_since("project = PROJ", cursor=first["cursor"])
+    assert keys(second) == ["PROJ-2"]
+
+
+@pytest.mark.anyio
+async def test_jql_with_only_order_by(monkeypatch):
+    client = use_client(monkeypatch, FakeClient([make_issue(1, "2024-02-05T01:00:00.000+0000")]))
+
+    result = await server.get_changes_since("ORDER BY updated DESC")
+
+    assert keys(result) == ["PROJ-1"]
+    assert client.jql == ["ORDER BY updated ASC, key ASC"]
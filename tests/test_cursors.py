@@ -0,0 +1,54 @@
+"""增量查询游标存储的测试."""
+
+import os
+import time
+
+from jira_mcp.cursors import Cursor, CursorStore
+
+
+def make_store(tmp_path, ttl=3600):
+    return CursorStore(os.path.join(tmp_path, "cursors", "cursors.db"), ttl=ttl)
+
+
+def test_roundtrip(tmp_path):
+    store = make_store(tmp_path)
+    cursor = Cursor(
+        scope="project = PROJ",
+        owner="tenant",
+        watermark="2024-01-01 08:00",
+        seen={"PROJ-1": "2024-01-01T08:00:10.000+0000"},
+    )
+    cursor_id = store.create(cursor)
+
+    assert store.get(cursor_id) == cursor
+
+
+def test_persists_across_connections(tmp_path):
+    cursor_id = make_store(tmp_path).create(Cursor(scope="project = PROJ", owner=""))
+
+    found = make_store(tmp_path).get(cursor_id)
+    assert found is not None
+    assert found.watermark is None and found.seen == {}
+
+
+def test_unknown_cursor(tmp_path):
+    assert make_store(tmp_path).get("missing") is None
+
+
+def test_cursors_are_immutable(tmp_path):
+    store = make_store(tmp_path)
+    first = store.create(Cursor(scope="s", owner="o", watermark="2024-01-01 08:00"))
+    second = store.create(Cursor(scope="s", owner="o", watermark="2024-01-01 09:00"))
+
+    assert first != second
+    assert store.get(first).watermark == "2024-01-01 08:00"
+
+
+def test_idle_cursors_are_pruned(tmp_path):
+    store = make_store(tmp_path, ttl=0.05)
+    stale = store.create(Cursor(scope="s", owner="o"))
+    time.sleep(0.1)
+    fresh = store.create(Cursor(scope="s", owner="o"))
+
+    assert store.get(stale) is None
+    assert store.get(fresh) is not None
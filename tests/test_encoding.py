@@ -0,0 +1,49 @@
+"""工具结果JSON编码的测试."""
+
+import json
+
+import pytest
+
+from jira_mcp import server
+from jira_mcp.encoding import EncodedJSON, dumps
+
+
+def test_encoded_json_is_spliced():
+    issue = EncodedJSON({"key": "PROJ-1", "summary": "登录"})
+    value = {"issues": [issue, {"key": "PROJ-2"}], "total": 2}
+
+    assert json.loads(dumps(value)) == {
+        "issues": [{"key": "PROJ-1", "summary": "登录"}, {"key": "PROJ-2"}],
+        "total": 2,
+    }
+    assert issue.text in dumps(value)
+
+
+def test_encoded_json_is_read_only():
+    issue = EncodedJSON({"key": "PROJ-1"})
+    with pytest.raises(TypeError):
+        issue["key"] = "PROJ-2"
+    copy = dict(issue)
+    copy["key"] = "PROJ-2"
+    assert issue["key"] == "PROJ-1"
+
+
+def test_non_json_values_fall_back_to_str():
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+
+    assert json.loads(dumps({"big": 2 ** 70, "other": Opaque()})) == {
+        "big": 2 ** 70,
+        "other": "opaque",
+    }
+
+
+@pytest.mark.anyio
+async def test_call_tool_returns_compact_json():
+    content = await server.mcp.call_tool("cache_stats", {})
+
+    assert len(content) == 1
+    text = content[0].text
+    assert ": " not in text and "\n" not in text
+    assert "json_backend" in json.loads(text)
@@ -0,0 +1,56 @@
+"""批量获取问题的测试."""
+
+import re
+
+import pytest
+
+from jira_mcp import server
+from jira_mcp.cache import IssueCache
+
+_KEYS = re.compile(r'"([^"]+)"')
+
+
+class FakeClient:
+    """按问题键搜索，每页最多返回 ``page_cap`` 个问题."""
+
+    def __init__(self, existing, page_cap=50):
+        self.existing = existing
+        self.page_cap = page_cap
+        self.requests = []
+
+    async def search_issues(self, jql, start_at=0, max_results=50, fields=None, **kwargs):
+        self.requests.append((start_at, max_results))
+        matched = [k for k in _KEYS.findall(jql) if k in self.existing]
+        page_size = min(max_results, self.page_cap)
+        issues = [
+            {"key": key, "fields": {"summary": key, "updated": "2024-01-01T08:00:00.000+0000"}}
+            for key in matched[start_at:start_at + page_size]
+        ]
+        return {"issues": issues, "startAt": start_at, "maxResults": page_size, "total": len(matched)}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient({f"P-{i}" for i in range(1, 81)})
+    monkeypatch.setattr(server, "get_jira_client", lambda: client)
+    monkeypatch.setattr(server, "issue_cache", IssueCache())
+    return client
+
+
+@pytest.mark.anyio
+async def test_capped_page_size_does_not_report_missing(client):
+    keys = [f"P-{i}" for i in range(1, 81)] + ["P-999"]
+
+    result = await server.get_issues(keys, fields="minimal")
+
+    assert [issue["key"] for issue in result["issues"]] == keys[:80]
+    assert result["missing"] == ["P-999"]
+    assert client.requests == [(0, 81), (50, 31)]
+
+
+@pytest.mark.anyio
+async def test_chunk_with_missing_keys_stops_at_total(client):
+    result = await server.get_issues(["P-1", "P-404", "P-2"], fields="minimal")
+
+    assert result["missing"] == ["P-404"]
+    assert client.requests == [(0, 3)]
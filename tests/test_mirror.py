@@ -0,0 +1,178 @@
+"""本地镜像的测试."""
+
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from jira_mcp.mirror import IssueMirror, parse_jira_time
+
+_SINCE = re.compile(r'updated >= "([^"]+)"')
+
+
+def make_issue(number, summary, description="", updated="2024-01-01T08:00:00.000+0000"):
+    return {
+        "key": f"PROJ-{number}",
+        "fields": {
+            "summary": summary,
+            "description": description,
+            "status": {"name": "Open"},
+            "project": {"key": "PROJ"},
+            "labels": ["backend"],
+            "updated": updated,
+        },
+    }
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return IssueMirror(os.path.join(tmp_path, "mirror.db"), ["proj"])
+
+
+def keys(issues):
+    return [issue["key"] for issue in issues]
+
+
+def test_full_text_search(mirror):
+    mirror.upsert([
+        make_issue(1, "登录页面超时", "用户登录失败"),
+        make_issue(2, "search index rebuild", "nightly job"),
+    ])
+
+    assert keys(mirror.search(text="登录页面")) == ["PROJ-1"]
+    assert keys(mirror.search(text="rebuild")) == ["PROJ-2"]
+    assert keys(mirror.search(text="nightly", label="backend")) == ["PROJ-2"]
+
+
+def test_update_replaces_indexed_text(mirror):
+    mirror.upsert([make_issue(1, "old summary text")])
+    mirror.upsert([make_issue(1, "new summary text", updated="2024-01-02T08:00:00.000+0000")])
+
+    assert mirror.search(text="old summary") == []
+    assert keys(mirror.search(text="new summary")) == ["PROJ-1"]
+    assert mirror.conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0] == 1
+    # 外部内容索引与表一致
+    mirror.conn.execute("INSERT INTO issues_fts (issues_fts) VALUES ('integrity-check')")
+
+
+def test_upsert_keeps_row_id(mirror):
+    mirror.upsert([make_issue(1, "first")])
+    before = mirror.conn.execute("SELECT id FROM issues WHERE key = 'PROJ-1'").fetchone()[0]
+    mirror.upsert([make_issue(1, "second")])
+
+    after = mirror.conn.execute("SELECT id FROM issues WHERE key = 'PROJ-1'").fetchone()[0]
+    assert before == after
+
+
+def test_old_schema_is_rebuilt(tmp_path):
+    path = os.path.join(tmp_path, "mirror.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE issues (key TEXT PRIMARY KEY, project TEXT NOT NULL, data TEXT NOT NULL);
+        CREATE VIRTUAL TABLE issues_fts USING fts5(key UNINDEXED, summary, description);
+        CREATE TABLE sync_state (project TEXT PRIMARY KEY, watermark TEXT, last_sync REAL);
+        INSERT INTO sync_state VALUES ('PROJ', '2024/01/01 08:00', 0);
+    """)
+    conn.commit()
+    conn.close()
+
+    mirror = IssueMirror(path, ["PROJ"])
+    # 旧数据被清除，下次同步从头开始
+    assert mirror.watermark("PROJ") is None
+    mirror.upsert([make_issue(1, "migrated issue")])
+    assert keys(mirror.search(text="migrated")) == ["PROJ-1"]
+
+
+class FakeClient:
+    """按JIRA的方式执行 ``updated >= "..."`` 条件，按更新时间和键排序."""
+
+    def __init__(self, issues, tz=None):
+        self.issues = issues
+        self.tz = tz
+        self.jql = []
+        # 每次搜索后调用，用于模拟同步期间的更新
+        self.after_search = None
+
+    async def user_timezone(self):
+        return self.tz
+
+    async def search_issues(self, jql, start_at=0, max_results=50, fields=None):
+        self.jql.append(jql)
+        matched = self.issues
+        since = _SINCE.search(jql)
+        if since:
+            moment = datetime.strptime(since.group(1), "%Y/%m/%d %H:%M")
+            moment = moment.replace(tzinfo=self.tz or timezone.utc)
+            matched = [i for i in matched if parse_jira_time(i["fields"]["updated"]) >= moment]
+        matched = sorted(matched, key=lambda i: (parse_jira_time(i["fields"]["updated"]), i["key"]))
+        page = matched[start_at:start_at + max_results]
+        if self.after_search is not None:
+            self.after_search(len(self.jql))
+        return {"issues": page, "total": len(matched)}
+
+
+@pytest.mark.anyio
+async def test_sync_project_pages_and_records_watermark(mirror):
+    issues = [
+        make_issue(i, f"issue {i}", updated=f"2024-01-01T08:{i:02d}:00.000+0000")
+        for i in range(1, 6)
+    ]
+    client = FakeClient(issues)
+
+    assert await mirror.sync_project(client, "PROJ", page_size=2) == 5
+
+    # 每页从水位重新查询，水位所在分钟内已写入的问题不重复计数
+    assert 'updated >= "2024/01/01 08:02"' in client.jql[1]
+    assert mirror.watermark("PROJ") == "2024/01/01 08:05"
+    assert len(mirror.search(project="proj")) == 5
+
+    await mirror.sync_project(client, "PROJ", page_size=2)
+    assert 'updated >= "2024/01/01 08:05"' in client.jql[-1]
+
+
+@pytest.mark.anyio
+async def test_sync_does_not_lose_issues_updated_during_sync(mirror):
+    issues = [
+        make_issue(i, f"issue {i}", updated=f"2024-01-01T08:{i:02d}:00.000+0000")
+        for i in range(1, 6)
+    ]
+    client = FakeClient(issues)
+
+    def update_second(searches):
+        # 第一页返回后PROJ-2被更新，移到结果末尾
+        if searches == 1:
+            issues[1] = make_issue(2, "issue 2 edited", updated="2024-01-01T09:00:00.000+0000")
+
+    client.after_search = update_second
+
+    await mirror.sync_project(client, "PROJ", page_size=2)
+
+    assert sorted(keys(mirror.search(project="PROJ"))) == [f"PROJ-{i}" for i in range(1, 6)]
+    assert keys(mirror.search(text="edited")) == ["PROJ-2"]
+    assert mirror.watermark("PROJ") == "2024/01/01 09:00"
+
+
+@pytest.mark.anyio
+async def test_sync_pages_through_a_crowded_minute(mirror):
+    client = FakeClient([
+        make_issue(i, f"issue {i}", updated=f"2024-01-01T08:00:{i:02d}.000+0000")
+        for i in range(1, 8)
+    ])
+
+    assert await mirror.sync_project(client, "PROJ", page_size=2) == 7
+    assert len(mirror.search(project="PROJ")) == 7
+
+
+@pytest.mark.anyio
+async def test_sync_watermark_uses_user_timezone(mirror):
+    client = FakeClient(
+        [make_issue(1, "issue", updated="2024-01-01T20:30:00.000+0000")],
+        tz=ZoneInfo("Asia/Shanghai"),
+    )
+
+    await mirror.sync_project(client, "PROJ")
+
+    assert mirror.watermark("PROJ") == "2024/01/02 04:30"
@@ -0,0 +1,130 @@
+"""请求调度器的测试."""
+
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from jira_mcp.ratelimit import (
+    AdaptiveLimiter,
+    RequestScheduler,
+    _parse_retry_after,
+    endpoint_class,
+)
+
+URL = "https://jira.example.com/rest/api/2/search"
+
+
+def response(status, headers=None):
+    return httpx.Response(status, headers=headers, request=httpx.Request("POST", URL))
+
+
+def sender(*responses):
+    """依次返回给定响应的发送函数，异常实例会被抛出."""
+    queue = list(responses)
+    calls = []
+
+    async def send():
+        calls.append(time.monotonic())
+        item = queue.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    return send, calls
+
+
+def make_scheduler(**kwargs):
+    kwargs.setdefault("rate", 0)
+    kwargs.setdefault("backoff_base", 0)
+    return RequestScheduler(**kwargs)
+
+
+def test_parse_retry_after_seconds_and_date():
+    assert _parse_retry_after("3") == 3.0
+    assert _parse_retry_after("-1") == 0.0
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after("soon") is None
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < _parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+
+
+def test_endpoint_class():
+    assert endpoint_class(URL) == "search"
+    assert endpoint_class("https://jira.example.com/secure/attachment/1/a.txt") == "attachment"
+    assert endpoint_class("https://jira.example.com/rest/api/2/issue/PROJ-1") == "issue"
+
+
+@pytest.mark.anyio
+async def test_retries_after_429_and_honours_retry_after():
+    scheduler = make_scheduler()
+    send, calls = sender(response(429, {"Retry-After": "0.2"}), response(200))
+
+    result = await scheduler.send(URL, send)
+
+    assert result.status_code == 200
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.2
+    assert scheduler.retries == 1
+    assert scheduler.throttled == 1
+
+
+@pytest.mark.anyio
+async def test_throttle_halves_concurrency_for_endpoint_class():
+    scheduler = make_scheduler(initial_concurrency=8)
+    send, _ = sender(response(503, {"Retry-After": "0"}), response(200))
+
+    await scheduler.send(URL, send)
+
+    limits = scheduler.stats()["concurrency_limits"]
+    assert 4 <= limits["search"] < 5
+    assert limits["issue"] == 8
+
+
+@pytest.mark.anyio
+async def test_returns_last_response_when_retries_exhausted():
+    scheduler = make_scheduler(max_retries=2)
+    send, calls = sender(*[response(429, {"Retry-After": "0"}) for _ in range(3)])
+
+    result = await scheduler.send(URL, send)
+
+    assert result.status_code == 429
+    assert len(calls) == 3
+
+
+@pytest.mark.anyio
+async def test_transport_errors_retried_only_when_idempotent():
+    scheduler = make_scheduler()
+    send, calls = sender(httpx.ConnectError("refused"), response(200))
+    assert (await scheduler.send(URL, send)).status_code == 200
+    assert len(calls) == 2
+
+    send, calls = sender(httpx.ConnectError("refused"), response(200))
+    with pytest.raises(httpx.ConnectError):
+        await scheduler.send(URL, send, idempotent=False)
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_exhausted_rate_limit_pauses_bucket():
+    scheduler = make_scheduler()
+    reset = (datetime.now(timezone.utc) + timedelta(seconds=30)).isoformat()
+    send, _ = sender(response(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}))
+
+    await scheduler.send(URL, send)
+
+    assert scheduler.bucket.paused_until - time.monotonic() > 25
+
+
+def test_adaptive_limiter_aimd():
+    limiter = AdaptiveLimiter(initial=4, maximum=5)
+    limiter.on_throttle()
+    assert limiter.limit == 2
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 5
+    for _ in range(10):
+        limiter.on_throttle()
+    assert limiter.limit == 1
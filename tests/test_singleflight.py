@@ -0,0 +1,85 @@
+"""并发请求合并的测试."""
+
+import asyncio
+
+import pytest
+
+from jira_mcp.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_execute_once():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"fields": {"summary": "a"}}
+
+    results = await asyncio.gather(*[flight.do("PROJ-1", fetch) for _ in range(5)])
+
+    assert calls == 1
+    assert flight.executed == 1 and flight.shared == 4
+    assert all(result == {"fields": {"summary": "a"}} for result in results)
+    # 共享调用方得到各自的副本
+    results[1]["fields"]["summary"] = "changed"
+    assert results[2]["fields"]["summary"] == "a"
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.anyio
+async def test_different_keys_are_not_merged():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return 1
+
+    await asyncio.gather(flight.do("a", fetch), flight.do("b", fetch))
+    assert flight.executed == 2
+
+
+@pytest.mark.anyio
+async def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        *[flight.do("PROJ-1", fail) for _ in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.anyio
+async def test_cancelling_one_caller_does_not_cancel_others():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("PROJ-1", fetch))
+    second = asyncio.ensure_future(flight.do("PROJ-1", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.anyio
+async def test_completed_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("PROJ-1", fetch) == 1
+    assert await flight.do("PROJ-1", fetch) == 2
@@ -0,0 +1,84 @@
+"""按调用方凭据选择租户的测试."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from jira_mcp import server
+from jira_mcp.tenants import Credentials
+
+ALICE = {"x-jira-username": "alice", "x-jira-token": "alice-token"}
+
+
+class Session:
+    """MCP会话的替身（需要支持弱引用）."""
+
+
+def request_context(session, headers=None):
+    return SimpleNamespace(request=SimpleNamespace(headers=headers or {}), session=session)
+
+
+@pytest.fixture(autouse=True)
+def server_url(monkeypatch):
+    monkeypatch.setattr(server.jira_settings, "server_url", "http://jira.example.com")
+
+
+def test_credentials_from_headers():
+    credentials = Credentials.from_headers(ALICE)
+    assert credentials.username == "alice"
+    assert "alice-token" not in repr(credentials)
+    assert Credentials.from_headers({"x-jira-username": "alice"}) is None
+    assert Credentials.from_headers(None) is None
+
+
+def test_tenant_id_depends_on_secret():
+    first = Credentials("alice", "a").tenant_id
+    assert first == Credentials("alice", "a").tenant_id
+    assert first != Credentials("alice", "b").tenant_id
+
+
+def test_session_remembers_credentials(monkeypatch):
+    monkeypatch.setattr(server, "REQUIRE_USER_CREDENTIALS", False)
+    session = Session()
+    tenant = server.resolve_tenant(request_context(session, ALICE))
+
+    assert server.resolve_tenant(request_context(session)) is tenant
+    assert server.resolve_tenant(request_context(Session())) is None
+    assert server.resolve_tenant(None) is None
+
+
+def test_required_credentials_must_be_on_every_request(monkeypatch):
+    monkeypatch.setattr(server, "REQUIRE_USER_CREDENTIALS", True)
+    session = Session()
+    assert server.resolve_tenant(request_context(session, ALICE)) is not None
+
+    with pytest.raises(ValueError):
+        server.resolve_tenant(request_context(session))
+    with pytest.raises(ValueError):
+        server.resolve_tenant(None)
+
+
+def test_rendered_issues_are_not_shared_between_tenants():
+    def issue(assignee):
+        return {
+            "key": "PROJ-1",
+            "fields": {"updated": "2024-01-01T00:00:00.000+0000", "assignee": assignee},
+        }
+
+    alice = server.tenant_pool.get(Credentials("alice", "a"))
+    bob = server.tenant_pool.get(Credentials("bob", "b"))
+    visible = issue({"name": "carol", "displayName": "Carol", "emailAddress": "carol@example.com"})
+    hidden = issue({"name": "carol", "displayName": "Carol"})
+
+    token = server._current_tenant.set(alice)
+    try:
+        assert server.render_issue(visible)["assignee"]["email"] == "carol@example.com"
+    finally:
+        server._current_tenant.reset(token)
+    token = server._current_tenant.set(bob)
+    try:
+        assert not server.render_issue(hidden)["assignee"].get("email")
+        # 同一租户内同一版本的问题复用格式化结果
+        assert server.render_issue(hidden) is server.render_issue(hidden)
+    finally:
+        server._current_tenant.reset(token)
@@ -0,0 +1,147 @@
+"""多worker部署中的消息转发和调用方凭据的测试."""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from fake_jira import FakeJiraConfig, create_app
+from jira_mcp.workers import forwarded_headers
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+ALICE = {"X-Jira-Username": "alice", "X-Jira-Token": "alice-token"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_forwarded_headers_drop_hop_by_hop():
+    headers = [
+        ("Host", "127.0.0.1:8000"),
+        ("Connection", "keep-alive, X-Trace"),
+        ("X-Trace", "1"),
+        ("Content-Length", "12"),
+        ("Transfer-Encoding", "chunked"),
+        ("Content-Type", "application/json"),
+        ("X-Jira-Username", "alice"),
+        ("X-Jira-Token", "alice-token"),
+        ("Authorization", "Bearer abc"),
+    ]
+    assert forwarded_headers(headers) == [
+        ("Content-Type", "application/json"),
+        ("X-Jira-Username", "alice"),
+        ("X-Jira-Token", "alice-token"),
+        ("Authorization", "Bearer abc"),
+    ]
+
+
+@pytest.fixture(scope="module")
+def fake_jira():
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    app = create_app(
+        FakeJiraConfig(projects=["WORK"], issues_per_project=50, attachments_per_issue=0), url
+    )
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("JIRA替身启动超时")
+        time.sleep(0.05)
+    yield url, app.state.jira
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+@pytest.fixture(scope="module")
+def workers_server(fake_jira, tmp_path_factory):
+    """要求调用方凭据、以3个worker运行的SSE服务器."""
+    jira_url, _ = fake_jira
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "HOME": str(tmp_path_factory.mktemp("home")),
+        "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")])),
+        "MCP_SERVER_PORT": str(port),
+        "JIRA_SERVER_URL": jira_url,
+        "JIRA_USERNAME": "serviceacct",
+        "JIRA_PASSWORD": "serviceacct",
+        "JIRA_REQUIRE_USER_CREDENTIALS": "1",
+        "JIRA_ISSUE_CACHE_SIZE": "0",
+        "JIRA_RATE_LIMIT": "0",
+        "JIRA_MIRROR_PROJECTS": "",
+    })
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "jira_mcp", "-t", "sse", "-w", "3"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            httpx.get(f"{url}/metrics", timeout=1.0)
+            break
+        except httpx.TransportError:
+            if time.monotonic() > deadline or proc.poll() is not None:
+                proc.terminate()
+                raise RuntimeError("MCP服务器启动失败")
+            time.sleep(0.1)
+    yield url
+    proc.terminate()
+    proc.wait(timeout=15)
+
+
+async def call_tools(url: str, headers, keys):
+    """在一个新会话中依次获取问题，返回每次调用的结果."""
+    results = []
+    async with sse_client(f"{url}/sse", headers=headers) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for key in keys:
+                result = await session.call_tool("get_issue", {"issue_key": key, "fields": "minimal"})
+                results.append(json.loads(result.content[0].text))
+    return results
+
+
+@pytest.mark.anyio
+async def test_forwarded_messages_keep_caller_credentials(fake_jira, workers_server):
+    _, jira = fake_jira
+    jira.auth_users.clear()
+    # 每个会话的消息使用新连接，由内核分配给任意worker，大部分需要转发
+    sessions = [
+        call_tools(workers_server, ALICE, [f"WORK-{s * 4 + i + 1}" for i in range(4)])
+        for s in range(6)
+    ]
+    results = [r for batch in await asyncio.gather(*sessions) for r in batch]
+
+    assert all("error" not in result for result in results), results
+    assert len(jira.auth_users) >= len(results)
+    assert set(jira.auth_users) == {"alice"}
+
+
+@pytest.mark.anyio
+async def test_calls_without_credentials_are_rejected(fake_jira, workers_server):
+    _, jira = fake_jira
+    jira.auth_users.clear()
+
+    results = await call_tools(workers_server, None, ["WORK-1", "WORK-2"])
+
+    assert all("JIRA凭据" in result.get("error", "") for result in results)
+    assert jira.auth_users == []